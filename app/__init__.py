@@ -1,26 +1,59 @@
 """Flask application factory."""
 import logging
 from flask import Flask
-from flask_smorest import Api
-from app.config import Config
-from app.extensions import (
-    db,
-    supabase_client,
-    redis_client,
-)
-from app.middleware import setup_middleware
+from werkzeug.local import LocalProxy
+from app.config import Config, config
 from app.monitoring import setup_monitoring
 
+# Process roles: what each kind of process needs from the app
+ROLES = ("web", "worker", "migrations")
 
-def create_app(config_class=Config):
-    """Create and configure Flask application."""
+
+def create_app(config_class=Config, role=None):
+    """Create and configure Flask application.
+
+    config_class may also be a name from app.config.config, e.g. "testing".
+    role ("web", "worker" or "migrations", default APP_ROLE) decides which
+    subsystems are set up, so workers and Alembic skip the HTTP stack and
+    migrations skip Supabase, Redis and Celery entirely.
+    """
+    if isinstance(config_class, str):
+        config_class = config[config_class]
     app = Flask(__name__)
     app.config.from_object(config_class)
+    role = role or app.config.get("APP_ROLE", "web")
+    if role not in ROLES:
+        raise ValueError(f"Unknown app role: {role}")
+    app.config["APP_ROLE"] = role
+
+    # SQLAlchemy is only needed by migrations, Flask-Admin or opted-in models
+    if role == "migrations" or app.config.get("SQLALCHEMY_ENABLED") or app.config.get("FLASK_ADMIN_ENABLED"):
+        from app.extensions import db
+        db.init_app(app)
+
+    if role == "migrations":
+        configure_logging(app)
+        return app
 
     # Initialize extensions
-    db.init_app(app)
+    from app.extensions import init_celery, redis_client, supabase_client
     supabase_client.init_app(app)
     redis_client.init_app(app)
+
+    if role == "worker":
+        from app.extensions import make_celery
+        app.celery = make_celery(app)
+        setup_monitoring(app)
+        configure_logging(app)
+        return app
+
+    # Web: Celery is configured when a task is first imported or enqueued,
+    # and app.celery only imports it when used
+    init_celery(app)
+    app.celery = LocalProxy(_get_celery)
+
+    from app.utils.jwks import jwks
+    jwks.init_app(app)
     
     # Initialize rate limiter with Redis storage
     from flask_limiter import Limiter
@@ -32,26 +65,39 @@ def create_app(config_class=Config):
         # Convert string to list if needed
         default_limits = [limit.strip() for limit in str(default_limits).split(",")]
     
+    storage_uri = app.config.get("RATELIMIT_STORAGE_URL", "memory://")
+    storage_options = {}
+    if storage_uri.startswith("hybrid+"):
+        from app.utils import rate_limit  # noqa: F401  registers hybrid+redis:// with limits
+        storage_options = {
+            "sync_interval": app.config.get("RATELIMIT_SYNC_INTERVAL", 1.0),
+            "sync_batch": app.config.get("RATELIMIT_SYNC_BATCH", 100),
+            "sync_timeout": app.config.get("RATELIMIT_SYNC_TIMEOUT", 0.05),
+            "idle_timeout": app.config.get("RATELIMIT_IDLE_TIMEOUT", 60.0),
+        }
+
     limiter = Limiter(
         app=app,
         key_func=get_remote_address,
         default_limits=default_limits if app.config.get("RATELIMIT_ENABLED", True) else [],
-        storage_uri=app.config.get("RATELIMIT_STORAGE_URL", "memory://"),
+        storage_uri=storage_uri,
+        storage_options=storage_options,
     )
     app.limiter = limiter  # Make limiter accessible via app
-    
-    # Initialize Celery
-    from app.extensions import make_celery
-    celery_app = make_celery(app)
-    app.celery = celery_app  # Make celery accessible via app
 
     # Setup monitoring
     setup_monitoring(app)
 
+    # Setup Prometheus metrics
+    from app.metrics import setup_metrics
+    setup_metrics(app)
+
     # Setup middleware
+    from app.middleware import setup_middleware
     setup_middleware(app)
 
     # Initialize Flask-Smorest API
+    from flask_smorest import Api
     api = Api(app)
     app.api = api  # Store api on app for easy access
     
@@ -78,32 +124,37 @@ def create_app(config_class=Config):
         from app.admin import setup_admin
         setup_admin(app)
 
+    # Register CLI commands
+    from app.cli import register_cli
+    register_cli(app)
+
     # Configure logging
     configure_logging(app)
 
     return app
 
 
+def _get_celery():
+    """The shared Celery instance, created on first use."""
+    from app.extensions import celery
+    return celery
+
+
 def configure_logging(app):
-    """Configure structured logging."""
+    """Configure structured logging.
+
+    Records are formatted as JSON (orjson when available) and written by a
+    background thread, so request threads never block on the log stream.
+    """
     if not app.debug:
-        try:
-            from python_json_logger import jsonlogger
-            handler = logging.StreamHandler()
-            formatter = jsonlogger.JsonFormatter()
-            handler.setFormatter(formatter)
-            app.logger.addHandler(handler)
-            app.logger.setLevel(logging.INFO)
-        except ImportError:
-            # Fallback to standard logging if python-json-logger is not installed
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-            handler.setFormatter(formatter)
-            app.logger.addHandler(handler)
-            app.logger.setLevel(logging.INFO)
+        from app.logs import json_formatter, setup_async_logging
+
+        handler = logging.StreamHandler()
+        formatter = json_formatter()
+        handler.setFormatter(formatter)
+        setup_async_logging(app, handler)
+        app.logger.setLevel(logging.INFO)
+        if not formatter.__class__.__module__.startswith("pythonjsonlogger"):
             app.logger.warning("python-json-logger not installed, using standard logging")
     else:
         app.logger.setLevel(logging.DEBUG)
-
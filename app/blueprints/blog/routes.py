@@ -1,65 +1,213 @@
 """Blog routes."""
-from flask import render_template, abort as flask_abort, request, jsonify
+from flask import (
+    render_template,
+    abort as flask_abort,
+    request,
+    jsonify,
+    url_for,
+    current_app,
+    make_response,
+)
 from app.blueprints.blog import blog_bp
-from app.services.blog_service import BlogService
-from app.extensions import supabase_client
+from app.services.blog_service import (
+    get_blog_service,
+    record_view,
+    refresh_content,
+    BLOG_TAG,
+    LISTINGS_TAG,
+    PAGES_TAG,
+    post_tag,
+)
+from app.services.search_service import search_posts
+from app.utils.cache import cached_response
+from app.utils.http import make_etag, parse_timestamp, is_not_modified, not_modified, set_validators
+
+
+@blog_bp.before_request
+def _refresh_content():
+    """Rescan local content (when used) so edits invalidate cached pages."""
+    try:
+        refresh_content()
+    except Exception as e:
+        current_app.logger.warning(f"Failed to refresh blog content: {e}")
+
+
+@blog_bp.before_request
+def _track_view():
+    """Count post views, including page cache hits, for cache warming."""
+    if request.endpoint in ("blog.post", "blog.api_get_post"):
+        record_view(request.view_args["slug"])
+
+
+def _page_limit() -> int:
+    """Read the page size from the query string, clamped to a sane range."""
+    limit = request.args.get("limit", 10, type=int)
+    return max(1, min(limit, int(current_app.config.get("BLOG_MAX_PAGE_SIZE", 50))))
+
+
+def _validators(kind: str, validators: dict) -> tuple:
+    """Turn cached resource validators into (ETag, Last-Modified) for one representation."""
+    return make_etag(kind, validators["etag"]), parse_timestamp(validators.get("last_modified"))
 
 
 @blog_bp.route("/")
+@cached_response(ttl_config="BLOG_PAGE_CACHE_TTL", tags=[BLOG_TAG, PAGES_TAG, LISTINGS_TAG])
 def index():
     """List all blog posts."""
+    cursor = request.args.get("cursor")
+    limit = 10
     try:
-        blog_service = BlogService(supabase_client.get_client())
-        posts = blog_service.list_posts()
-        return render_template("blog/index.html", posts=posts)
+        blog_service = get_blog_service()
+        cached_validators = blog_service.get_listing_validators(limit, cursor)
+        if cached_validators:
+            etag, last_modified = _validators("html", cached_validators)
+            if is_not_modified(etag, last_modified):
+                return not_modified(etag, last_modified)
+
+        page = blog_service.list_posts_page(limit=limit, cursor=cursor)
+        validators = blog_service.listing_validators(page, limit, cursor, cached_validators)
+    except ValueError:
+        flask_abort(400)
     except Exception as e:
         current_app.logger.error(f"Error listing blog posts: {e}")
         flask_abort(500)
 
+    etag, last_modified = _validators("html", validators)
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    next_url = None
+    if page["next_cursor"]:
+        next_url = url_for("blog.index", cursor=page["next_cursor"])
+    response = make_response(
+        render_template("blog/index.html", posts=page["posts"], next_url=next_url)
+    )
+    return set_validators(response, etag, last_modified)
+
 
 @blog_bp.route("/<slug>")
+@cached_response(
+    ttl_config="BLOG_PAGE_CACHE_TTL",
+    # Listing changes refresh the page's "More posts" section
+    tags=lambda slug: [BLOG_TAG, PAGES_TAG, LISTINGS_TAG, post_tag(slug)],
+)
 def post(slug):
     """Display a single blog post."""
     try:
-        blog_service = BlogService(supabase_client.get_client())
-        post_data = blog_service.get_post_by_slug(slug)
-        
-        if not post_data:
-            flask_abort(404)
-        
-        return render_template("blog/post.html", post=post_data)
+        blog_service = get_blog_service()
+        cached_validators = blog_service.get_post_page_validators(slug)
+        if cached_validators:
+            etag, last_modified = _validators("html", cached_validators)
+            if is_not_modified(etag, last_modified):
+                return not_modified(etag, last_modified)
+
+        page = blog_service.get_post_page(
+            slug,
+            related=current_app.config.get("BLOG_RELATED_POSTS", 5),
+            concurrent=current_app.config.get("BLOG_FANOUT_ENABLED", True),
+        )
     except Exception as e:
-        from flask import current_app
         current_app.logger.error(f"Error fetching blog post: {e}")
         flask_abort(500)
 
+    if not page:
+        flask_abort(404)
+    post_data = page["post"]
+
+    validators = blog_service.post_page_validators(page, cached_validators)
+    etag, last_modified = _validators("html", validators)
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    response = make_response(
+        render_template("blog/post.html", post=post_data, related=page["related"])
+    )
+    return set_validators(response, etag, last_modified)
+
 
 @blog_bp.route("/api/posts")
 def api_list_posts():
-    """API endpoint to list blog posts."""
+    """API endpoint to list blog posts.
+
+    Pages are chained with the opaque cursor returned in the ``X-Next-Cursor``
+    header (and a ``Link: rel="next"`` header) while the body stays a list.
+    """
+    cursor = request.args.get("cursor")
     try:
-        blog_service = BlogService(supabase_client.get_client())
-        posts = blog_service.list_posts()
-        return jsonify(posts)
+        blog_service = get_blog_service()
+        limit = _page_limit()
+        cached_validators = blog_service.get_listing_validators(limit, cursor)
+        if cached_validators:
+            etag, last_modified = _validators("json", cached_validators)
+            if is_not_modified(etag, last_modified):
+                return not_modified(etag, last_modified)
+
+        page = blog_service.list_posts_page(limit=limit, cursor=cursor)
+        validators = blog_service.listing_validators(page, limit, cursor, cached_validators)
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
     except Exception as e:
-        from flask import current_app
         current_app.logger.error(f"Error listing blog posts: {e}")
         return jsonify({"error": "Failed to fetch posts"}), 500
 
+    etag, last_modified = _validators("json", validators)
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    response = jsonify(page["posts"])
+    if page["next_cursor"]:
+        next_url = url_for("blog.api_list_posts", cursor=page["next_cursor"], limit=limit)
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return set_validators(response, etag, last_modified)
+
 
 @blog_bp.route("/api/posts/<slug>")
 def api_get_post(slug):
     """API endpoint to get a single blog post."""
     try:
-        blog_service = BlogService(supabase_client.get_client())
+        blog_service = get_blog_service()
+        cached_validators = blog_service.get_post_validators(slug)
+        if cached_validators:
+            etag, last_modified = _validators("json", cached_validators)
+            if is_not_modified(etag, last_modified):
+                return not_modified(etag, last_modified)
+
         post_data = blog_service.get_post_by_slug(slug)
-        
-        if not post_data:
-            return jsonify({"error": "Post not found"}), 404
-        
-        return jsonify(post_data)
     except Exception as e:
-        from flask import current_app
         current_app.logger.error(f"Error fetching blog post: {e}")
         return jsonify({"error": "Failed to fetch post"}), 500
 
+    if not post_data:
+        return jsonify({"error": "Post not found"}), 404
+
+    validators = blog_service.post_validators(post_data, cached_validators)
+    etag, last_modified = _validators("json", validators)
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    return set_validators(jsonify(post_data), etag, last_modified)
+
+
+@blog_bp.route("/api/search")
+def api_search():
+    """API endpoint to search blog posts, best matches first."""
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Query parameter 'q' is required"}), 400
+
+    limit = _page_limit()
+    offset = max(0, request.args.get("offset", 0, type=int))
+    try:
+        results = search_posts(query, limit=limit, offset=offset)
+    except Exception as e:
+        current_app.logger.error(f"Error searching blog posts: {e}")
+        return jsonify({"error": "Search failed"}), 500
+
+    return jsonify({
+        "query": query,
+        "results": results["results"],
+        "total": results["total"],
+        "limit": limit,
+        "offset": offset,
+    })
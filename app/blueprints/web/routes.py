@@ -1,6 +1,8 @@
 """Web routes for SSR."""
 from flask import render_template, current_app
 from app.blueprints.web import web_bp
+from app.extensions import supabase_client
+from app.utils.task_stats import queue_status
 
 
 @web_bp.route("/")
@@ -14,3 +16,18 @@ def health():
     """Health check endpoint."""
     return {"status": "healthy", "service": current_app.config.get("API_TITLE")}
 
+
+@web_bp.route("/health/upstream")
+def upstream_health():
+    """Supabase connection pool reuse counters for this worker."""
+    return {"supabase": supabase_client.pool_stats()}
+
+
+@web_bp.route("/health/queues")
+def queue_health():
+    """Celery backlog per queue, with throughput and wait and run times from the last sample."""
+    try:
+        return {"queues": queue_status(current_app.config.get("CELERY_MONITORED_QUEUES", ["celery"]))}
+    except Exception as e:
+        current_app.logger.warning(f"Queue status error: {e}")
+        return {"error": "Queue status unavailable"}, 503
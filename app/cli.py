@@ -0,0 +1,44 @@
+"""Flask CLI commands."""
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+blog_cli = AppGroup("blog", help="Blog maintenance commands.")
+
+
+@blog_cli.command("export")
+@click.option("--output", "-o", default=None, help="Output directory (defaults to BLOG_STATIC_DIR).")
+@click.option("--page-size", default=10, show_default=True, help="Posts on the exported listing page.")
+@click.option("--force", is_flag=True, help="Re-render every page, ignoring the manifest.")
+def export_command(output, page_size, force):
+    """Pre-render the blog to static, precompressed HTML."""
+    from app.services.static_export import export_static_blog
+
+    output = output or current_app.config["BLOG_STATIC_DIR"]
+    result = export_static_blog(output, force=force, page_size=page_size)
+    click.echo(
+        f"Exported {result['posts']} posts to {output}: {result['rendered']} rendered, "
+        f"{result['removed']} removed, {result['listing_pages']} listing pages written"
+    )
+
+
+@blog_cli.command("warm-cache")
+@click.option("--newest", type=int, default=None, help="Newest posts to warm (BLOG_WARM_NEWEST).")
+@click.option("--popular", type=int, default=None, help="Most viewed posts to warm (BLOG_WARM_POPULAR).")
+@click.option("--rate", type=float, default=None, help="Max posts fetched per second (BLOG_WARM_RATE).")
+@click.option("--async", "run_async", is_flag=True, help="Queue the task on Celery instead of running it here.")
+def warm_cache_command(newest, popular, rate, run_async):
+    """Warm blog caches, e.g. right after a deploy."""
+    from app.tasks.cache_tasks import warm_blog_cache
+
+    if run_async:
+        result = warm_blog_cache.delay(newest=newest, popular=popular, rate=rate)
+        click.echo(f"Queued cache warm-up task {result.id}")
+        return
+    result = warm_blog_cache(newest=newest, popular=popular, rate=rate)
+    click.echo(f"Warmed {result['warmed']} posts ({result['cold']} cold of {result['requested']})")
+
+
+def register_cli(app):
+    """Register CLI command groups on the app."""
+    app.cli.add_command(blog_cli)
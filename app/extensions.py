@@ -1,24 +1,75 @@
-"""Flask extensions initialization."""
-from flask_sqlalchemy import SQLAlchemy
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
-from supabase import create_client, Client
-import redis
-from celery import Celery
+"""Flask extensions initialization.
 
+Heavy libraries (supabase, SQLAlchemy, Celery, redis, httpx) are imported on
+first use, so each process role only pays for what it touches: ``db`` and
+``celery`` are created when first accessed (see ``__getattr__``).
+"""
+from __future__ import annotations
 
-# SQLAlchemy
-db = SQLAlchemy()
+import importlib
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+    import redis
+    from supabase import Client
+
+# Loaded on first use by the web role; preload_lazy_modules imports them up front
+LAZY_MODULES = (
+    "httpx",
+    "redis",
+    "supabase",
+    "app.tasks.example_tasks",
+    "app.tasks.cache_tasks",
+    "app.tasks.monitoring_tasks",
+)
+
+_lazy_lock = threading.RLock()
+_celery_app = None
+
+
+def __getattr__(name):
+    """Create ``db`` and ``celery`` on first access."""
+    with _lazy_lock:
+        if name in globals():
+            return globals()[name]
+        if name == "db":
+            from flask_sqlalchemy import SQLAlchemy
+            globals()["db"] = SQLAlchemy()
+            return globals()["db"]
+        if name == "celery":
+            from celery import Celery
+            celery = Celery(__name__)
+            if _celery_app is not None:
+                _configure_celery(celery, _celery_app)
+            globals()["celery"] = celery
+            return celery
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Supabase Client
 class SupabaseClient:
-    """Supabase client wrapper."""
+    """Supabase client wrapper.
+
+    The anon and service-role clients are created once per process and share
+    one pooled ``httpx`` client, so PostgREST, Storage and Auth calls reuse
+    keep-alive (and HTTP/2) connections. Clients inherited across a fork are
+    dropped and rebuilt in the child so workers never share sockets.
+    """
     def __init__(self):
         self.client: Client | None = None
         self.url: str | None = None
         self.key: str | None = None
         self.service_role_key: str | None = None
         self.jwt_secret: str | None = None
+        self.http_options: dict = {}
+        self._service_client: Client | None = None
+        self._http_client: httpx.Client | None = None
+        self._pid: int | None = None
+        self._lock = threading.RLock()
+        self._stats = {"requests": 0, "connections_opened": 0, "tls_handshakes": 0}
 
     def init_app(self, app):
         """Initialize Supabase client with app configuration."""
@@ -26,23 +77,123 @@ class SupabaseClient:
         self.key = app.config.get("SUPABASE_KEY")
         self.service_role_key = app.config.get("SUPABASE_SERVICE_ROLE_KEY")
         self.jwt_secret = app.config.get("SUPABASE_JWT_SECRET")
-        
-        if self.url and self.key:
-            self.client = create_client(self.url, self.key)
-        else:
+        self.http_options = {
+            "max_connections": app.config.get("SUPABASE_HTTP_MAX_CONNECTIONS", 100),
+            "max_keepalive_connections": app.config.get("SUPABASE_HTTP_MAX_KEEPALIVE", 20),
+            "keepalive_expiry": app.config.get("SUPABASE_HTTP_KEEPALIVE_EXPIRY", 30),
+            "http2": app.config.get("SUPABASE_HTTP2", True),
+            "timeout": app.config.get("SUPABASE_HTTP_TIMEOUT", 10),
+        }
+        self.reset()
+
+        # The client itself is created on first use
+        if not (self.url and self.key):
             app.logger.warning("Supabase credentials not configured")
 
+    def reset(self):
+        """Close pooled connections and drop clients (e.g. after a fork)."""
+        with self._lock:
+            # A forked child must not close the parent's sockets
+            if self._http_client is not None and self._pid == os.getpid():
+                self._http_client.close()
+            self.client = None
+            self._service_client = None
+            self._http_client = None
+            self._pid = os.getpid()
+            self._stats = {"requests": 0, "connections_opened": 0, "tls_handshakes": 0}
+
+    def _check_fork(self):
+        """Rebuild clients in a forked child instead of reusing the parent's sockets."""
+        if self._pid != os.getpid():
+            self.reset()
+
+    def get_http_client(self) -> httpx.Client:
+        """Get the pooled HTTP client shared by all Supabase clients in this process."""
+        self._check_fork()
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    import httpx
+
+                    options = self.http_options
+                    self._http_client = httpx.Client(
+                        limits=httpx.Limits(
+                            max_connections=options.get("max_connections", 100),
+                            max_keepalive_connections=options.get("max_keepalive_connections", 20),
+                            keepalive_expiry=options.get("keepalive_expiry", 30),
+                        ),
+                        http2=options.get("http2", True),
+                        timeout=options.get("timeout", 10),
+                        follow_redirects=True,
+                        event_hooks={
+                            "request": [self._on_request],
+                            "response": [self._on_response],
+                        },
+                    )
+        return self._http_client
+
+    def _on_request(self, request: httpx.Request):
+        """Count requests and attach a trace hook that counts new connections."""
+        self._stats["requests"] += 1
+        request.extensions["trace"] = self._on_trace
+        request.extensions["started"] = time.perf_counter()
+
+    def _on_response(self, response: httpx.Response):
+        """Record upstream latency (until response headers) in the metrics."""
+        from app.metrics import observe_upstream
+
+        request = response.request
+        started = request.extensions.get("started")
+        if started is not None:
+            observe_upstream(
+                request.method, request.url.path, response.status_code, time.perf_counter() - started
+            )
+
+    def _on_trace(self, event_name: str, info: dict):
+        """Count connection setup events reported by httpcore."""
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+        elif event_name == "connection.start_tls.complete":
+            self._stats["tls_handshakes"] += 1
+
+    def pool_stats(self) -> dict:
+        """Return connection reuse counters for this process."""
+        stats = dict(self._stats)
+        requests = stats["requests"]
+        stats["reuse_ratio"] = (
+            round(1 - stats["connections_opened"] / requests, 4) if requests else None
+        )
+        stats["pid"] = os.getpid()
+        return stats
+
+    def _create_client(self, url: str, key: str) -> Client:
+        """Create a Supabase client on the shared connection pool."""
+        from supabase import ClientOptions, create_client
+
+        options = ClientOptions(httpx_client=self.get_http_client())
+        return create_client(url, key, options=options)
+
     def get_client(self) -> Client:
         """Get Supabase client instance."""
+        self._check_fork()
         if not self.client:
-            raise RuntimeError("Supabase client not initialized")
+            if not self.url or not self.key:
+                raise RuntimeError("Supabase client not initialized")
+            with self._lock:
+                if not self.client:
+                    self.client = self._create_client(self.url, self.key)
         return self.client
 
     def get_service_client(self) -> Client:
         """Get Supabase client with service role key."""
         if not self.url or not self.service_role_key:
             raise RuntimeError("Supabase service role key not configured")
-        return create_client(self.url, self.service_role_key)
+        self._check_fork()
+        if not self._service_client:
+            with self._lock:
+                if not self._service_client:
+                    self._service_client = self._create_client(self.url, self.service_role_key)
+        return self._service_client
 
 
 supabase_client = SupabaseClient()
@@ -58,9 +209,12 @@ class RedisClient:
         """Initialize Redis clients with app configuration."""
         cache_url = app.config.get("REDIS_CACHE_URL")
         celery_url = app.config.get("REDIS_URL")
-        
+        if cache_url or celery_url:
+            import redis
+
         if cache_url:
-            self.cache_client = redis.from_url(cache_url, decode_responses=True)
+            # Cache values are binary (see app.utils.serialization)
+            self.cache_client = redis.from_url(cache_url, decode_responses=False)
         if celery_url:
             self.celery_client = redis.from_url(celery_url, decode_responses=True)
 
@@ -76,17 +230,50 @@ class RedisClient:
             raise RuntimeError("Redis Celery client not initialized")
         return self.celery_client
 
+    def reset(self):
+        """Give this process fresh connection pools (e.g. after a fork).
+
+        The inherited sockets are dropped, never shut down, so the
+        parent's connections keep working.
+        """
+        for client in (self.cache_client, self.celery_client):
+            if client is not None:
+                client.connection_pool.reset()
+
 
 redis_client = RedisClient()
 
 # Rate Limiter (will be initialized in app factory)
 limiter = None
 
-# Celery
-celery = Celery(__name__)
+def init_celery(app):
+    """Bind Celery to app, configuring it now or when ``celery`` is first used."""
+    global _celery_app
+    with _lazy_lock:
+        _celery_app = app
+        if "celery" in globals():
+            _configure_celery(globals()["celery"], app)
+
+
+def preload_lazy_modules():
+    """Import the supabase client, Celery and the task modules now.
+
+    Called in a preforking server's master (see ``gunicorn.conf.py``), so the
+    modules are imported once and shared copy-on-write by every worker
+    instead of being imported again by each one on its first request.
+    """
+    for name in LAZY_MODULES:
+        importlib.import_module(name)
+
 
 def make_celery(app):
     """Create Celery app with Flask context."""
+    init_celery(app)
+    return __getattr__("celery")
+
+
+def _configure_celery(celery, app):
+    """Apply app configuration and the Flask-context task base to celery."""
     celery.conf.update(
         broker_url=app.config["CELERY_BROKER_URL"],
         result_backend=app.config["CELERY_RESULT_BACKEND"],
@@ -95,7 +282,20 @@ def make_celery(app):
         result_serializer="json",
         timezone="UTC",
         enable_utc=True,
+        beat_schedule={
+            "warm-blog-cache": {
+                "task": "tasks.warm_blog_cache",
+                "schedule": app.config.get("BLOG_WARM_INTERVAL", 600),
+            },
+            "sample-queue-depth": {
+                "task": "tasks.sample_queue_depth",
+                "schedule": app.config.get("CELERY_QUEUE_SAMPLE_INTERVAL", 15),
+            },
+        },
     )
+    if app.config.get("METRICS_ENABLED", True):
+        from app.metrics import setup_task_publish_metrics
+        setup_task_publish_metrics()
 
     class ContextTask(celery.Task):
         """Make celery tasks work with Flask app context."""
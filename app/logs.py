@@ -0,0 +1,99 @@
+"""Non-blocking structured logging and the sampled access log."""
+import atexit
+import copy
+import logging
+import os
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+
+def json_formatter() -> logging.Formatter:
+    """Fastest available JSON formatter, or a plain one without python-json-logger."""
+    fields = "%(asctime)s %(name)s %(levelname)s %(message)s"
+    try:
+        from pythonjsonlogger.orjson import OrjsonFormatter
+        return OrjsonFormatter(fields)
+    except ImportError:
+        pass
+    try:
+        from pythonjsonlogger.json import JsonFormatter
+        return JsonFormatter(fields)
+    except ImportError:
+        return logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+class AsyncQueueHandler(QueueHandler):
+    """Hand records to a background thread that formats and writes them.
+
+    The request thread only resolves the message and enqueues; a full queue
+    drops the record instead of blocking. The listener is restarted in a
+    forked child, where the parent's thread does not exist.
+    """
+
+    def __init__(self, handlers, maxsize: int = 10000):
+        super().__init__(queue.Queue(maxsize))
+        self.handlers = list(handlers)
+        self.dropped = 0
+        self._listener: QueueListener | None = None
+        self._pid: int | None = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def start(self):
+        """Start the listener thread for this process."""
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.queue.maxsize)
+            self._listener = QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        """Flush pending records and stop the listener."""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+            self._pid = None
+
+    def prepare(self, record):
+        """Resolve the message now; leave JSON formatting to the listener."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        """Queue a record, dropping it if the listener can't keep up."""
+        if self._pid != os.getpid():
+            self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_async_logging(app, handler: logging.Handler) -> AsyncQueueHandler:
+    """Route app logs through a queue to handler (once per logger)."""
+    for existing in app.logger.handlers:
+        if isinstance(existing, AsyncQueueHandler):
+            return existing
+    queue_handler = AsyncQueueHandler([handler], app.config.get("LOG_QUEUE_SIZE", 10000))
+    queue_handler.start()
+    app.logger.addHandler(queue_handler)
+    return queue_handler
+
+
+def should_log_request(status_code: int, duration_ms: float | None, config) -> bool:
+    """Sample successful requests; always keep client and server errors and slow requests."""
+    if status_code >= 400:
+        return True
+    if duration_ms is not None and duration_ms >= config.get("LOG_SLOW_REQUEST_MS", 1000):
+        return True
+    rate = float(config.get("LOG_SAMPLE_RATE", 1.0))
+    return rate >= 1.0 or random.random() < rate
@@ -0,0 +1,245 @@
+"""Prometheus metrics.
+
+Under gunicorn every worker is a separate process, so set
+``PROMETHEUS_MULTIPROC_DIR`` (before the app is imported) to a shared, empty
+directory; ``/metrics`` then aggregates the per-process files and
+``gunicorn.conf.py`` cleans up after exited workers.
+"""
+import json
+import os
+import time
+from datetime import datetime
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "endpoint", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    ["method", "endpoint"],
+    multiprocess_mode="livesum",
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by tier and result",
+    ["tier", "result"],
+)
+UPSTREAM_LATENCY = Histogram(
+    "supabase_request_duration_seconds",
+    "Supabase HTTP latency until response headers",
+    ["service", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0),
+)
+TASK_QUEUE_WAIT = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time from publishing a Celery task (or its ETA) until a worker starts it",
+    ["task", "queue"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+TASK_RETRIES = Counter(
+    "celery_task_retries_total",
+    "Celery task retries",
+    ["task"],
+)
+TASK_FAILURES = Counter(
+    "celery_task_failures_total",
+    "Celery tasks that raised",
+    ["task", "exception"],
+)
+TASK_PAYLOAD = Histogram(
+    "celery_task_payload_bytes",
+    "Size of published Celery task arguments (JSON)",
+    ["task"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+QUEUE_DEPTH = Gauge(
+    "celery_queue_depth",
+    "Messages waiting in a Celery broker queue, as last sampled",
+    ["queue"],
+    multiprocess_mode="mostrecent",
+)
+
+# Message header carrying the publish time (epoch seconds)
+PUBLISHED_AT_HEADER = "published_at"
+
+# Supabase API path prefix -> service label
+_UPSTREAM_SERVICES = {
+    "rest": "postgrest",
+    "storage": "storage",
+    "auth": "auth",
+    "functions": "functions",
+    "realtime": "realtime",
+}
+
+
+def record_cache(tier: str, hit: bool, count: int = 1):
+    """Count cache lookups for a tier (l1, redis or page)."""
+    if count:
+        CACHE_REQUESTS.labels(tier, "hit" if hit else "miss").inc(count)
+
+
+def observe_upstream(method: str, path: str, status, seconds: float):
+    """Record the latency of one Supabase HTTP call."""
+    prefix = path.lstrip("/").split("/", 1)[0]
+    service = _UPSTREAM_SERVICES.get(prefix, "other")
+    UPSTREAM_LATENCY.labels(service, method, str(status)).observe(seconds)
+
+
+def metrics_registry():
+    """Registry to export: aggregated across processes in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def setup_metrics(app):
+    """Track request metrics and expose them on /metrics."""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    @app.before_request
+    def start_metrics():
+        g.metrics_labels = (request.method, request.endpoint or "unmatched")
+        g.metrics_start = time.perf_counter()
+        REQUESTS_IN_PROGRESS.labels(*g.metrics_labels).inc()
+
+    @app.after_request
+    def observe_request(response):
+        labels = g.get("metrics_labels")
+        if labels:
+            REQUEST_LATENCY.labels(*labels, str(response.status_code)).observe(
+                time.perf_counter() - g.metrics_start
+            )
+        return response
+
+    @app.teardown_request
+    def end_metrics(exc):
+        labels = g.pop("metrics_labels", None)
+        if labels:
+            REQUESTS_IN_PROGRESS.labels(*labels).dec()
+
+    def metrics():
+        """Prometheus scrape endpoint."""
+        return generate_latest(metrics_registry()), 200, {"Content-Type": CONTENT_TYPE_LATEST}
+
+    app.add_url_rule("/metrics", "metrics", metrics)
+    if getattr(app, "limiter", None) is not None:
+        app.limiter.exempt(metrics)
+
+
+def observe_task_publish(sender=None, body=None, headers=None, **kwargs):
+    """Stamp a task message with its publish time and record its payload size."""
+    if headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+    try:
+        size = len(json.dumps(body, default=str))
+    except (TypeError, ValueError):
+        return
+    TASK_PAYLOAD.labels(sender or "unknown").observe(size)
+
+
+def setup_task_publish_metrics():
+    """Instrument task publishing in this process (web and worker alike)."""
+    from celery.signals import before_task_publish
+
+    before_task_publish.connect(observe_task_publish, weak=False, dispatch_uid="task-publish-metrics")
+
+
+def task_queue_wait(request) -> float | None:
+    """Seconds a task waited between publish (or its ETA) and starting, if stamped."""
+    published_at = request.get(PUBLISHED_AT_HEADER) or (request.headers or {}).get(PUBLISHED_AT_HEADER)
+    if published_at is None:
+        return None
+    ready_at = float(published_at)
+    if request.eta:
+        # Scheduled tasks are not late while they wait for their ETA
+        eta = request.eta if isinstance(request.eta, datetime) else datetime.fromisoformat(request.eta)
+        ready_at = max(ready_at, eta.timestamp())
+    return max(0.0, time.time() - ready_at)
+
+
+def task_queue(request) -> str:
+    """Queue a task was delivered from."""
+    return (request.delivery_info or {}).get("routing_key") or "celery"
+
+
+def setup_celery_metrics(celery_app, port: int | None = None):
+    """Record Celery task wait and run times, retries and failures.
+
+    Each finished task is also added to its queue's counters in Redis (see
+    ``app.utils.task_stats``) for ``/health/queues``. The metrics are served
+    from the worker on port when given.
+    """
+    from celery.signals import (
+        task_failure,
+        task_postrun,
+        task_prerun,
+        task_retry,
+        worker_process_shutdown,
+        worker_ready,
+    )
+    from app.utils.task_stats import record_task
+
+    started = {}
+
+    @task_prerun.connect(weak=False)
+    def task_started(task_id=None, task=None, **kwargs):
+        wait = queue = None
+        if task is not None:
+            queue = task_queue(task.request)
+            wait = task_queue_wait(task.request)
+            if wait is not None:
+                TASK_QUEUE_WAIT.labels(task.name, queue).observe(wait)
+        started[task_id] = (time.perf_counter(), queue, wait)
+
+    @task_postrun.connect(weak=False)
+    def task_finished(task_id=None, task=None, state=None, **kwargs):
+        start = started.pop(task_id, None)
+        if start is not None and task is not None:
+            runtime = time.perf_counter() - start[0]
+            TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(runtime)
+            if start[1] is not None:
+                record_task(start[1], state or "UNKNOWN", runtime, start[2])
+
+    @task_retry.connect(weak=False)
+    def task_retried(sender=None, **kwargs):
+        TASK_RETRIES.labels(getattr(sender, "name", "unknown")).inc()
+
+    @task_failure.connect(weak=False)
+    def task_failed(sender=None, exception=None, **kwargs):
+        TASK_FAILURES.labels(getattr(sender, "name", "unknown"), type(exception).__name__).inc()
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        @worker_process_shutdown.connect(weak=False)
+        def process_exited(**kwargs):
+            multiprocess.mark_process_dead(os.getpid())
+
+    if port:
+        @worker_ready.connect(weak=False)
+        def serve_metrics(**kwargs):
+            from prometheus_client import start_http_server
+            start_http_server(port, registry=metrics_registry())
@@ -1,22 +1,57 @@
 """Flask middleware setup."""
+import hashlib
+import logging
+import time
 from functools import wraps
-from flask import request, jsonify, g
+from flask import request, jsonify, g, current_app
 import jwt
 from app.extensions import supabase_client
+from app.logs import should_log_request
+from app.utils.cache import LRUCache
+from app.utils.jwks import jwks
+from app.utils.timing import (
+    request_timings,
+    server_timing_header,
+    setup_template_timing,
+    start_request,
+    timed,
+)
 
+# Signing algorithms Supabase uses for asymmetric JWT signing keys
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
 
-def verify_supabase_jwt(token: str) -> dict | None:
-    """Verify Supabase JWT token."""
+_token_cache: LRUCache | None = None
+
+
+def _get_token_cache() -> LRUCache:
+    """Get the per-worker cache of verified token claims."""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = LRUCache(current_app.config.get("AUTH_TOKEN_CACHE_SIZE", 4096))
+    return _token_cache
+
+
+def _decode_supabase_jwt(token: str) -> dict | None:
+    """Verify the token signature and claims."""
     try:
-        jwt_secret = supabase_client.jwt_secret
-        if not jwt_secret:
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+        if algorithm == "HS256":
+            # Legacy shared-secret signing
+            key = supabase_client.jwt_secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            signing_key = jwks.get_key(header.get("kid"))
+            key = signing_key.key if signing_key else None
+        else:
             return None
-        
-        # Supabase uses HS256 algorithm
+        if not key:
+            return None
+
         payload = jwt.decode(
             token,
-            jwt_secret,
-            algorithms=["HS256"],
+            key,
+            algorithms=[algorithm],
+            audience=current_app.config.get("SUPABASE_JWT_AUDIENCE") or None,
             options={"verify_exp": True}
         )
         return payload
@@ -26,6 +61,26 @@ def verify_supabase_jwt(token: str) -> dict | None:
         return None
 
 
+def verify_supabase_jwt(token: str) -> dict | None:
+    """Verify Supabase JWT token, reusing the claims of recently verified tokens."""
+    token_cache = _get_token_cache()
+    digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    payload: dict | None = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
+    payload = _decode_supabase_jwt(token)
+    if payload and payload.get("exp"):
+        # Never keep claims past the token's own expiry
+        ttl = min(
+            payload["exp"] - time.time(),
+            current_app.config.get("AUTH_TOKEN_CACHE_TTL", 300),
+        )
+        if ttl > 0:
+            token_cache.set(digest, payload, ttl=ttl)
+    return payload
+
+
 def require_auth(f):
     """Decorator to require Supabase JWT authentication."""
     @wraps(f)
@@ -42,7 +97,8 @@ def require_auth(f):
         except ValueError:
             return jsonify({"error": "Invalid authorization header format"}), 401
         
-        payload = verify_supabase_jwt(token)
+        with timed("auth"):
+            payload = verify_supabase_jwt(token)
         if not payload:
             return jsonify({"error": "Invalid or expired token"}), 401
         
@@ -58,23 +114,17 @@ def require_auth(f):
 
 def setup_middleware(app):
     """Setup application middleware."""
+    setup_template_timing(app)
+    access_logger = logging.getLogger(f"{app.logger.name}.access")
+
     @app.before_request
     def before_request():
         """Execute before each request."""
+        start_request()
+
         # Add request ID for tracing
         import uuid
         g.request_id = str(uuid.uuid4())
-        
-        # Log request
-        app.logger.info(
-            "Request started",
-            extra={
-                "request_id": g.request_id,
-                "method": request.method,
-                "path": request.path,
-                "remote_addr": request.remote_addr,
-            }
-        )
 
     @app.after_request
     def after_request(response):
@@ -82,17 +132,29 @@ def setup_middleware(app):
         # Add request ID to response headers
         if hasattr(g, "request_id"):
             response.headers["X-Request-ID"] = g.request_id
-        
-        # Log response
-        app.logger.info(
-            "Request completed",
-            extra={
-                "request_id": getattr(g, "request_id", None),
-                "status_code": response.status_code,
-                "method": request.method,
-                "path": request.path,
-            }
-        )
+
+        # Where the time went, for the client and the log
+        if app.config.get("SERVER_TIMING_ENABLED", True):
+            response.headers["Server-Timing"] = server_timing_header()
+        timings = request_timings()
+        duration_ms = timings.pop("total", None)
+
+        # One access line per request; successful fast requests may be sampled
+        if should_log_request(response.status_code, duration_ms, app.config):
+            slow = duration_ms is not None and duration_ms >= app.config.get("LOG_SLOW_REQUEST_MS", 1000)
+            access_logger.log(
+                logging.WARNING if response.status_code >= 500 or slow else logging.INFO,
+                "Request completed",
+                extra={
+                    "request_id": getattr(g, "request_id", None),
+                    "status_code": response.status_code,
+                    "method": request.method,
+                    "path": request.path,
+                    "remote_addr": request.remote_addr,
+                    "duration_ms": duration_ms,
+                    **{f"{phase}_ms": duration for phase, duration in timings.items()},
+                }
+            )
         
         return response
 
@@ -2,6 +2,9 @@
 import os
 from flask import current_app
 
+# Span exporter owned by this process, re-created after a fork
+_span_export = None
+
 
 def setup_monitoring(app):
     """Setup monitoring tools."""
@@ -44,23 +47,45 @@ def setup_opentelemetry(app):
     """Setup OpenTelemetry tracing."""
     try:
         from opentelemetry import trace
-        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
         from opentelemetry.sdk.trace.export import BatchSpanProcessor
         from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
         from opentelemetry.instrumentation.flask import FlaskInstrumentor
         from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
         from opentelemetry.instrumentation.redis import RedisInstrumentor
-        
-        # Set up tracer provider
-        trace.set_tracer_provider(TracerProvider())
-        tracer = trace.get_tracer(__name__)
-        
-        # Add OTLP exporter
-        otlp_exporter = OTLPSpanExporter(
-            endpoint=app.config.get("OTEL_EXPORTER_OTLP_ENDPOINT"),
-        )
-        span_processor = BatchSpanProcessor(otlp_exporter)
-        trace.get_tracer_provider().add_span_processor(span_processor)
+
+        class ForkSafeSpanProcessor(SpanProcessor):
+            """Batch-export spans through an exporter that can be rebuilt per process."""
+
+            def __init__(self, endpoint):
+                self.endpoint = endpoint
+                self.delegate = None
+                self.reset()
+
+            def reset(self):
+                # The inherited exporter's HTTP session and batch thread belong to the parent
+                self.delegate = BatchSpanProcessor(OTLPSpanExporter(endpoint=self.endpoint))
+
+            def on_start(self, span, parent_context=None):
+                self.delegate.on_start(span, parent_context=parent_context)
+
+            def on_end(self, span):
+                self.delegate.on_end(span)
+
+            def shutdown(self):
+                self.delegate.shutdown()
+
+            def force_flush(self, timeout_millis=30000):
+                return self.delegate.force_flush(timeout_millis)
+
+        global _span_export
+        if _span_export is None:
+            # Set up tracer provider
+            trace.set_tracer_provider(TracerProvider())
+
+            # Add OTLP exporter
+            _span_export = ForkSafeSpanProcessor(app.config.get("OTEL_EXPORTER_OTLP_ENDPOINT"))
+            trace.get_tracer_provider().add_span_processor(_span_export)
         
         # Instrument Flask
         FlaskInstrumentor().instrument_app(app)
@@ -77,3 +102,8 @@ def setup_opentelemetry(app):
     except Exception as e:
         app.logger.error(f"Failed to initialize OpenTelemetry: {e}")
 
+
+def reset_opentelemetry():
+    """Re-create the span exporter in this process (call after a fork)."""
+    if _span_export is not None:
+        _span_export.reset()
@@ -1,65 +1,809 @@
 """Blog service for managing Markdown-backed content."""
+import base64
+import hashlib
+import html as html_lib
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+import bleach  # type: ignore[import-untyped]
 import markdown
-from typing import List, Dict, Optional
-from supabase import Client
+from typing import TYPE_CHECKING, Any, Callable, List, Dict, Optional, Tuple, cast
+from flask import current_app
+from app.extensions import redis_client, supabase_client
+from app.utils.cache import (
+    LRUCache,
+    cache_key,
+    cached,
+    get_cache,
+    get_many,
+    invalidate_tags,
+    set_cache,
+)
+from app.utils.http import make_etag
+from app.utils.timing import timed
+
+if TYPE_CHECKING:
+    from supabase import Client
+    from app.services.content_sources import FilesystemContentSource
+
+# Cache tags: every blog entry carries BLOG_TAG, listings carry
+# LISTINGS_TAG, a post page carries its post_tag(slug) and cached
+# full-page responses also carry PAGES_TAG.
+BLOG_TAG = "blog"
+LISTINGS_TAG = "blog:listings"
+PAGES_TAG = "blog:pages"
+
+MARKDOWN_EXTENSIONS = ("fenced_code", "tables", "toc")
+
+# Sorted set of post view counts, used to pick posts for cache warming
+POPULAR_KEY = "blog:popular"
+
+# Columns needed to render listings; excludes the post body
+LISTING_COLUMNS = "id,title,slug,excerpt,author,created_at,updated_at,tags"
+
+# Markup kept when sanitising rendered Markdown
+ALLOWED_TAGS = [
+    "a", "abbr", "blockquote", "br", "code", "div", "em", "h1", "h2", "h3", "h4",
+    "h5", "h6", "hr", "img", "li", "ol", "p", "pre", "span", "strong", "table",
+    "tbody", "td", "th", "thead", "tr", "ul",
+]
+ALLOWED_ATTRIBUTES = {
+    "a": ["href", "title"],
+    "abbr": ["title"],
+    "img": ["src", "alt", "title"],
+    "code": ["class"],
+    "div": ["class"],
+    "span": ["class"],
+    **{f"h{level}": ["id"] for level in range(1, 7)},
+}
+
+# Columns written by process_blog_post when a post is published
+RENDERED_COLUMNS = ("html_content", "toc", "word_count", "reading_time", "content_hash", "rendered_at")
+
+READING_WPM = 200
+EXCERPT_LENGTH = 200
+
+# Rendered HTML only changes with the source, the extension set or the
+# Markdown and bleach versions, so all of them go into the cache key.
+_RENDER_KEY_PREFIX = "blog:html:" + hashlib.sha256(
+    f"{markdown.__version__}:{bleach.__version__}:{','.join(MARKDOWN_EXTENSIONS)}".encode()
+).hexdigest()[:12]
+
+_TAG_RE = re.compile(r"<[^>]*>")
+
+_blog_service = None
+_fanout_executor: ThreadPoolExecutor | None = None
+_fanout_pid: int | None = None
+_render_cache: LRUCache | None = None
+_render_stats = {"redis_hits": 0, "renders": 0}
+_markdown_local = threading.local()
+
+
+def get_blog_service() -> "BlogService":
+    """Get this worker's BlogService for the configured content backend.
+
+    ``BLOG_CONTENT_BACKEND=filesystem`` serves posts from ``BLOG_CONTENT_DIR``
+    without any network calls; the default binds to the pooled Supabase client.
+    """
+    global _blog_service
+    if current_app.config.get("BLOG_CONTENT_BACKEND", "supabase") == "filesystem":
+        from app.services.content_sources import get_content_source
+        source = get_content_source()
+        if _blog_service is None or _blog_service.content_source is not source:
+            source.on_change(_on_content_change)
+            # Posts and bodies come from the content source, never Supabase
+            _blog_service = BlogService(None, content_source=source)  # type: ignore[arg-type]
+        return _blog_service
+    client = supabase_client.get_client()
+    if (
+        _blog_service is None
+        or _blog_service.supabase is not client
+        or _blog_service.content_source is not None
+    ):
+        _blog_service = BlogService(client)
+    return _blog_service
+
+
+def _get_fanout_executor() -> ThreadPoolExecutor:
+    """Get this process's pool for concurrent upstream calls (rebuilt after a fork)."""
+    global _fanout_executor, _fanout_pid
+    if _fanout_executor is None or _fanout_pid != os.getpid():
+        _fanout_executor = ThreadPoolExecutor(
+            max_workers=current_app.config.get("BLOG_FETCH_CONCURRENCY", 16),
+            thread_name_prefix="blog-fanout",
+        )
+        _fanout_pid = os.getpid()
+    return _fanout_executor
+
+
+def fan_out(calls: Dict[str, tuple]) -> Dict[str, object]:
+    """Run independent calls concurrently, each in the app context.
+
+    ``calls`` maps a name to ``(function, *args)``; returns name -> result,
+    or the exception the call raised. Under gevent the pool's threads are
+    greenlets, so the waits cost no OS threads.
+    """
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+
+    def run(function, *args):
+        with app.app_context():
+            return function(*args)
+
+    executor = _get_fanout_executor()
+    # Worker threads have no request context, so time the fan-out as a whole
+    with timed("fanout"):
+        futures = {name: executor.submit(run, *call) for name, call in calls.items()}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = e
+    return results
+
+
+def refresh_content():
+    """Pick up on-disk content changes before cached responses are served."""
+    if current_app.config.get("BLOG_CONTENT_BACKEND", "supabase") == "filesystem":
+        get_blog_service().content_source.refresh()
+
+
+def _on_content_change(slugs):
+    """Invalidate cached data for posts changed on disk."""
+    for slug in slugs:
+        invalidate_post(slug)
+
+
+def post_tag(slug: str) -> str:
+    """Cache tag for a single post."""
+    return f"blog:post:{slug}"
+
+
+def invalidate_post(slug: str | None = None):
+    """Invalidate cached listings and, when given, one post's cached data and pages."""
+    tags = [LISTINGS_TAG]
+    if slug:
+        tags.append(post_tag(slug))
+    invalidate_tags(*tags)
+
+
+def purge_pages():
+    """Purge every cached full-page blog response (e.g. after a template change)."""
+    invalidate_tags(PAGES_TAG)
+
+
+def record_view(slug: str):
+    """Count a post view for cache warming (one ZINCRBY)."""
+    try:
+        with timed("cache"):
+            redis_client.get_cache().zincrby(POPULAR_KEY, 1, slug)
+    except Exception as e:
+        current_app.logger.warning(f"Failed to record blog view: {e}")
+
+
+def popular_slugs(limit: int) -> List[str]:
+    """Most viewed post slugs, most popular first."""
+    if limit <= 0:
+        return []
+    try:
+        slugs = cast(list, redis_client.get_cache().zrevrange(POPULAR_KEY, 0, limit - 1))
+        return [slug.decode() if isinstance(slug, bytes) else slug for slug in slugs]
+    except Exception as e:
+        current_app.logger.warning(f"Failed to read popular blog posts: {e}")
+        return []
+
+
+def decay_popularity(factor: float = 0.5, keep: int = 1000):
+    """Scale down view counts so popularity follows recent traffic, keeping the top posts."""
+    try:
+        pipe = redis_client.get_cache().pipeline(transaction=False)
+        pipe.zunionstore(POPULAR_KEY, {POPULAR_KEY: factor})
+        pipe.zremrangebyrank(POPULAR_KEY, 0, -keep - 1)
+        pipe.execute()
+    except Exception as e:
+        current_app.logger.warning(f"Failed to decay blog popularity: {e}")
+
+
+def encode_cursor(post: Dict) -> str:
+    """Encode an opaque cursor pointing after post in (created_at, id) order."""
+    raw = json.dumps([post["created_at"], post["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """Decode a cursor into (created_at, id), raising ValueError if invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(padded))
+        # Both values end up in a PostgREST filter, so only accept well-formed ones
+        datetime.fromisoformat(created_at)
+        uuid.UUID(post_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return created_at, post_id
+
+
+def _keyset_filter(created_at: str, post_id: str) -> str:
+    """PostgREST filter for rows after (created_at, id) in descending order."""
+    return f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{post_id})'
+
+
+def related_posts(recent: List[Dict], slug: str, count: int) -> List[Dict]:
+    """The "More posts" of a post page: the first ``count`` of ``recent`` other than ``slug``."""
+    return [post for post in recent if post["slug"] != slug][:count]
+
+
+def _post_etag_parts(post: Dict) -> tuple:
+    """ETag inputs for one post: its id, update time and rendered body."""
+    body = post.get("html_content") or post.get("content") or ""
+    return post.get("id"), post.get("updated_at"), hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def sanitize_html(html: str) -> str:
+    """Strip markup Markdown output must not carry (scripts, handlers, styles)."""
+    cleaned: str = bleach.clean(html, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True)
+    return cleaned
+
+
+def content_hash(markdown_content: str) -> str:
+    """Hash of a post's Markdown source, stored with its pre-rendered HTML."""
+    return hashlib.sha256(markdown_content.encode("utf-8")).hexdigest()
+
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    """Shorten plain text to about length characters on a word boundary."""
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0].rstrip(",.;:") + "…"
+
+
+def prerender_markdown(markdown_content: str) -> Dict:
+    """Render and sanitise a post body, with the fields derived from it.
+
+    Needs no app context, so bulk jobs can run it in a process pool.
+    """
+    md = _get_markdown().reset()
+    html = sanitize_html(md.convert(markdown_content))
+    text = _html_text(html)
+    words = len(text.split())
+    return {
+        "html_content": html,
+        "toc": sanitize_html(md.toc) if md.toc_tokens else None,
+        "word_count": words,
+        "reading_time": max(1, math.ceil(words / READING_WPM)),
+        "excerpt": make_excerpt(text),
+        "content_hash": content_hash(markdown_content),
+        "rendered_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _html_text(html: str) -> str:
+    """Plain text of sanitised HTML (dropping its tags is enough once sanitised)."""
+    return html_lib.unescape(_TAG_RE.sub(" ", html))
+
+
+def _rendered_values(row: Dict, rendered: Dict) -> Dict:
+    """Columns to store from a prerender result.
+
+    The excerpt is written when the row has none, or when its excerpt is the
+    one generated from the previously rendered body, so it follows content
+    changes; an excerpt written by hand is kept.
+    """
+    values = {column: rendered[column] for column in RENDERED_COLUMNS}
+    excerpt = row.get("excerpt")
+    previous_html = row.get("html_content")
+    if not excerpt or (previous_html and excerpt == make_excerpt(_html_text(previous_html))):
+        values["excerpt"] = rendered["excerpt"]
+    return values
+
+
+def render_cache_key(markdown_content: str) -> str:
+    """Build the cache key for rendered Markdown."""
+    digest = hashlib.sha256(markdown_content.encode("utf-8")).hexdigest()
+    return f"{_RENDER_KEY_PREFIX}:{digest}"
+
+
+def render_cache_stats() -> Dict:
+    """Return rendered Markdown cache counters for this worker."""
+    l1 = _render_cache.stats() if _render_cache is not None else {}
+    return {"l1": l1, **_render_stats}
+
+
+def _get_render_cache() -> LRUCache:
+    """Get the per-worker rendered Markdown LRU."""
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = LRUCache(current_app.config.get("BLOG_RENDER_CACHE_SIZE", 256))
+    return _render_cache
+
+
+def _get_markdown() -> markdown.Markdown:
+    """Get a Markdown instance reused by the current thread."""
+    md = getattr(_markdown_local, "md", None)
+    if md is None:
+        md = markdown.Markdown(extensions=list(MARKDOWN_EXTENSIONS))
+        _markdown_local.md = md
+    return md
 
 
 class BlogService:
     """Service for blog operations."""
     
-    def __init__(self, supabase: Client):
-        """Initialize blog service."""
+    def __init__(self, supabase: "Client", content_source: Optional["FilesystemContentSource"] = None):
+        """Initialize blog service.
+
+        When ``content_source`` is given (see ``app.services.content_sources``)
+        posts and bodies are read from it instead of Supabase.
+        """
         self.supabase = supabase
+        self.content_source = content_source
         self.table = "blog_posts"
         self.bucket = "blog-content"
     
+    @cached(
+        key_prefix="blog:list_posts",
+        ttl_config="BLOG_CACHE_TTL",
+        tags=[BLOG_TAG, LISTINGS_TAG],
+        method=True,
+        l1=True,
+    )
     def list_posts(self, limit: int = 10, offset: int = 0) -> List[Dict]:
         """List all blog posts."""
         try:
-            response = self.supabase.table(self.table)\
-                .select("*")\
-                .eq("published", True)\
-                .order("created_at", desc=True)\
-                .limit(limit)\
-                .offset(offset)\
-                .execute()
-            
             posts = []
-            for post in response.data:
-                posts.append(self._format_post(post))
+            for post in self._select_rows(LISTING_COLUMNS, limit, offset=offset):
+                posts.append(self._format_post(post, summary=True))
             
             return posts
         except Exception as e:
             raise Exception(f"Failed to list posts: {str(e)}")
+
+    @cached(
+        key_prefix="blog:list_posts_page",
+        ttl_config="BLOG_CACHE_TTL",
+        tags=[BLOG_TAG, LISTINGS_TAG],
+        method=True,
+        l1=True,
+    )
+    def list_posts_page(self, limit: int = 10, cursor: Optional[str] = None) -> Dict:
+        """List blog posts after cursor, newest first, using keyset pagination."""
+        # Validate before the try block so callers can tell bad input apart
+        after = decode_cursor(cursor) if cursor else None
+        try:
+            # Fetch one extra row to know whether there is a next page
+            rows = self._select_rows(LISTING_COLUMNS, limit + 1, after=after)
+            posts = [self._format_post(post, summary=True) for post in rows[:limit]]
+            next_cursor = encode_cursor(posts[-1]) if len(rows) > limit else None
+            return {"posts": posts, "next_cursor": next_cursor}
+        except Exception as e:
+            raise Exception(f"Failed to list posts: {str(e)}")
     
+    @cached(
+        key_prefix="blog:post",
+        ttl_config="BLOG_CACHE_TTL",
+        tags=lambda self, slug: [BLOG_TAG, post_tag(slug)],
+        method=True,
+    )
     def get_post_by_slug(self, slug: str) -> Optional[Dict]:
         """Get a blog post by slug."""
+        if self.content_source is not None:
+            row = self.content_source.get_row(slug)
+            return self.render_post(row) if row else None
         try:
-            response = self.supabase.table(self.table)\
-                .select("*")\
-                .eq("slug", slug)\
-                .eq("published", True)\
-                .single()\
-                .execute()
+            with timed("db"):
+                response = self.supabase.table(self.table)\
+                    .select("*")\
+                    .eq("slug", slug)\
+                    .eq("published", True)\
+                    .maybe_single()\
+                    .execute()
             
-            if not response.data:
+            if not response or not response.data:
                 return None
             
-            post = self._format_post(response.data)
-            
-            # Fetch markdown content from storage if needed
-            if post.get("content_storage_path"):
-                content = self._fetch_content_from_storage(post["content_storage_path"])
-                if content:
-                    post["html_content"] = self._render_markdown(content)
-            
-            return post
+            return self.render_post(cast(Dict, response.data))
         except Exception as e:
             raise Exception(f"Failed to get post: {str(e)}")
     
-    def _format_post(self, post: Dict) -> Dict:
-        """Format post data."""
-        return {
+    def get_post_page(self, slug: str, related: int = 5, concurrent: bool = True) -> Optional[Dict]:
+        """Get a post and up to ``related`` other recent posts for its page.
+
+        The post (row, then body) and the recent listing don't depend on each
+        other, so by default they are fetched concurrently. Returns
+        ``{"post": ..., "related": [...]}``, or None if the post doesn't exist;
+        a failed listing only leaves ``related`` empty.
+        """
+        calls: Dict[str, Tuple[Callable, Any]] = {"post": (self.get_post_by_slug, slug)}
+        if related > 0:
+            calls["recent"] = (self.list_posts_page, related + 1)
+        if concurrent and len(calls) > 1:
+            results: Dict[str, Any] = fan_out(calls)
+        else:
+            results = {}
+            for name, (function, *args) in calls.items():
+                try:
+                    results[name] = function(*args)
+                except Exception as e:
+                    results[name] = e
+
+        if isinstance(results["post"], Exception):
+            raise results["post"]
+        if not results["post"]:
+            return None
+        recent = results.get("recent")
+        if isinstance(recent, Exception):
+            current_app.logger.warning(f"Failed to list related blog posts: {recent}")
+            recent = None
+        recent_posts = (recent or {}).get("posts", [])
+        return {"post": results["post"], "related": related_posts(recent_posts, slug, related)}
+
+    def get_rows_by_slugs(self, slugs: List[str]) -> List[Dict]:
+        """Get published post rows for several slugs in one query."""
+        if not slugs:
+            return []
+        if self.content_source is not None:
+            rows = [self.content_source.get_row(slug) for slug in slugs]
+            return [row for row in rows if row]
+        with timed("db"):
+            response = self.supabase.table(self.table)\
+                .select("*")\
+                .eq("published", True)\
+                .in_("slug", list(slugs))\
+                .execute()
+        return cast(List[Dict], response.data)
+
+    def warm_posts(self, slugs: List[str], rate: float = 0, batch_size: int = 20) -> Dict:
+        """Fill the post cache for slugs that are not cached yet.
+
+        Cold posts are fetched a batch per query with bodies downloaded
+        concurrently; ``rate`` caps how many posts per second are fetched
+        from Supabase (0 for no cap).
+        """
+        slugs = list(dict.fromkeys(slugs))
+        get_post = BlogService.get_post_by_slug
+        keys = {slug: get_post.cache_key_for(self, slug) for slug in slugs}
+        cached_entries = get_many(keys.values())
+        now = time.time()
+        cold = [
+            slug for slug in slugs
+            if not isinstance(cached_entries.get(keys[slug]), dict)
+            or cached_entries[keys[slug]].get("x", 0) <= now
+        ]
+
+        warmed = 0
+        for i in range(0, len(cold), batch_size):
+            batch = cold[i:i + batch_size]
+            started = time.monotonic()
+            posts = self.render_posts(self.get_rows_by_slugs(batch))
+            elapsed = time.monotonic() - started
+            for post in posts:
+                get_post.prime(post, self, post["slug"], compute_time=elapsed / len(posts))
+                self.post_validators(post)
+            warmed += len(posts)
+            if rate > 0:
+                # Spread batches out so warming never exceeds rate posts per second
+                time.sleep(max(0.0, len(batch) / rate - (time.monotonic() - started)))
+
+        return {"requested": len(slugs), "cold": len(cold), "warmed": warmed}
+
+    def iter_posts(self, columns: str = "*", batch_size: int = 100):
+        """Iterate over all published posts, newest first, in keyset batches.
+
+        ``columns`` must include ``created_at`` and ``id``.
+        """
+        cursor = None
+        while True:
+            rows = self._select_rows(columns, batch_size, after=cursor)
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            cursor = (rows[-1]["created_at"], rows[-1]["id"])
+
+    def _select_rows(
+        self, columns: str, limit: int, after: Optional[tuple] = None, offset: int = 0
+    ) -> List[Dict]:
+        """Select published rows newest first, after a (created_at, id) key if given."""
+        if self.content_source is not None:
+            return self.content_source.list_rows(limit, after=after, offset=offset)
+        query = self.supabase.table(self.table)\
+            .select(columns)\
+            .eq("published", True)
+        if after:
+            created_at, post_id = after
+            query = query.or_(_keyset_filter(created_at, post_id))
+        query = query\
+            .order("created_at", desc=True)\
+            .order("id", desc=True)\
+            .limit(limit)
+        if offset:
+            query = query.offset(offset)
+        with timed("db"):
+            return cast(List[Dict], query.execute().data)
+
+    def render_post(self, row: Dict) -> Dict:
+        """Format a post row, using its pre-rendered HTML or rendering its Markdown body."""
+        post = self._format_post(row)
+        if self._prerendered(row):
+            post["html_content"] = row["html_content"]
+            return post
+
+        # Fetch markdown content from storage if needed
+        content = None
+        if post.get("content_storage_path"):
+            content = self._fetch_content_from_storage(post["content_storage_path"])
+        elif self.content_source is not None:
+            content = self.content_source.read_body(post["slug"])
+        if content:
+            post["html_content"] = self._render_markdown(content)
+
+        return post
+
+    def render_posts(self, rows: List[Dict]) -> List[Dict]:
+        """Format many post rows and render their bodies.
+
+        Storage bodies are downloaded concurrently with ``fetch_contents``;
+        posts whose body could not be fetched are returned without
+        ``html_content``, like ``render_post`` does.
+        """
+        posts = [self._format_post(row) for row in rows]
+        prerendered = [self._prerendered(row) for row in rows]
+        fetched = self.fetch_contents(
+            post.get("content_storage_path")
+            for post, ready in zip(posts, prerendered)
+            if not ready
+        )
+        if fetched["errors"]:
+            current_app.logger.warning(
+                f"Failed to fetch {len(fetched['errors'])} blog bodies: {fetched['errors']}"
+            )
+
+        for post, row, ready in zip(posts, rows, prerendered):
+            if ready:
+                post["html_content"] = row["html_content"]
+                continue
+            content = None
+            if post.get("content_storage_path"):
+                content = fetched["contents"].get(post["content_storage_path"])
+            elif self.content_source is not None:
+                content = self.content_source.read_body(post["slug"])
+            if content:
+                post["html_content"] = self._render_markdown(content)
+
+        return posts
+
+    def prerender(self, markdown_content: str) -> Dict:
+        """Render and sanitise a post body once, with the fields derived from it."""
+        with timed("markdown"):
+            return prerender_markdown(markdown_content)
+
+    def prerender_row(self, row: Dict) -> Optional[Dict]:
+        """Column values to store for a post row, or None when it has no body.
+
+        Hand-written excerpts are kept (see ``_rendered_values``).
+        """
+        if row.get("content_storage_path"):
+            content = self._fetch_content_from_storage(row["content_storage_path"])
+        else:
+            content = row.get("content")
+        if not content:
+            return None
+        return _rendered_values(row, self.prerender(content))
+
+    def prerender_rows(self, rows: List[Dict], executor=None, force: bool = True) -> List[Optional[Dict]]:
+        """``prerender_row`` for many rows: bodies fetched concurrently, rendered by executor.
+
+        ``executor`` (e.g. a ``ProcessPoolExecutor``) renders the bodies;
+        without one they are rendered here. Unless ``force`` is set, rows whose
+        stored HTML already matches their source give None, like rows without
+        a body.
+        """
+        fetched = self.fetch_contents(row.get("content_storage_path") for row in rows)
+        if fetched["errors"]:
+            current_app.logger.warning(
+                f"Failed to fetch {len(fetched['errors'])} blog bodies: {fetched['errors']}"
+            )
+
+        pending = {}
+        for index, row in enumerate(rows):
+            if row.get("content_storage_path"):
+                content = fetched["contents"].get(row["content_storage_path"])
+            else:
+                content = row.get("content")
+            if not content:
+                continue
+            if not force and row.get("html_content") and row.get("content_hash") == content_hash(content):
+                continue
+            pending[index] = content
+
+        values: List[Optional[Dict]] = [None] * len(rows)
+        if executor is not None:
+            rendered = executor.map(prerender_markdown, pending.values(), chunksize=16)
+        else:
+            rendered = map(prerender_markdown, pending.values())
+        for index, result in zip(pending, rendered):
+            values[index] = _rendered_values(rows[index], result)
+        return values
+
+    @staticmethod
+    def _prerendered(row: Dict) -> bool:
+        """Whether row carries current HTML rendered at publish time."""
+        if not row.get("html_content") or not row.get("content_hash"):
+            return False
+        # Inline bodies are cheap to check; Storage bodies are re-rendered by the publish task
+        if row.get("content") and not row.get("content_storage_path"):
+            return bool(row["content_hash"] == content_hash(row["content"]))
+        return True
+
+    def fetch_contents(
+        self, paths, max_workers: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Dict[str, Dict[str, str]]:
+        """Download many Storage objects concurrently.
+
+        Returns ``{"contents": {path: text}, "errors": {path: message}}``. An
+        object that fails, or runs longer than ``timeout`` seconds once
+        started, is reported in ``errors`` without affecting the others.
+        """
+        paths = list(dict.fromkeys(path for path in paths if path))
+        contents: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        if not paths:
+            return {"contents": contents, "errors": errors}
+
+        max_workers = max_workers or current_app.config.get("BLOG_FETCH_CONCURRENCY", 16)
+        timeout = timeout or current_app.config.get("BLOG_FETCH_TIMEOUT", 10)
+
+        # Worker threads have no request context, so time the batch as a whole
+        with timed("storage"):
+            self._fetch_batch(paths, contents, errors, max_workers, timeout)
+        return {"contents": contents, "errors": errors}
+
+    def _fetch_batch(self, paths, contents, errors, max_workers, timeout):
+        """Run the downloads for fetch_contents."""
+        started = {}
+
+        def download(path):
+            started[path] = time.monotonic()
+            return self._download(path)
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(max_workers, len(paths)), thread_name_prefix="blog-fetch"
+        )
+        futures = {executor.submit(download, path): path for path in paths}
+        pending = set(futures)
+        try:
+            while pending:
+                now = time.monotonic()
+                # Queued downloads start no earlier than now, so this bound is safe
+                deadline = min(
+                    started.get(futures[future], now) + timeout for future in pending
+                )
+                done, pending = wait(
+                    pending, timeout=max(0.0, deadline - now), return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    path = futures[future]
+                    try:
+                        contents[path] = future.result().decode("utf-8")
+                    except Exception as e:
+                        errors[path] = str(e) or type(e).__name__
+                now = time.monotonic()
+                for future in list(pending):
+                    path = futures[future]
+                    if path in started and now - started[path] >= timeout:
+                        # The thread can't be interrupted; its result is discarded
+                        errors[path] = f"Timed out after {timeout}s"
+                        pending.discard(future)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_post_validators(self, slug: str) -> Optional[Dict]:
+        """Get cached ETag/Last-Modified validators for a post without an upstream call."""
+        validators: Optional[Dict] = get_cache(
+            cache_key("blog:validators:post", slug),
+            l1=True,
+            tags=[BLOG_TAG, post_tag(slug)],
+        )
+        return validators
+
+    def post_validators(self, post: Dict, previous: Optional[Dict] = None) -> Dict:
+        """Compute validators for a post and cache them if they changed."""
+        validators = {
+            "etag": make_etag(*_post_etag_parts(post)),
+            "last_modified": post.get("updated_at"),
+        }
+        if validators != previous:
+            set_cache(
+                cache_key("blog:validators:post", post["slug"]),
+                validators,
+                current_app.config.get("BLOG_CACHE_TTL", 3600),
+                l1=True,
+                tags=[BLOG_TAG, post_tag(post["slug"])],
+            )
+        return validators
+
+    def get_post_page_validators(self, slug: str) -> Optional[Dict]:
+        """Get cached validators for a post page (post and related posts) without an upstream call."""
+        validators: Optional[Dict] = get_cache(
+            cache_key("blog:validators:post_page", slug),
+            l1=True,
+            tags=[BLOG_TAG, LISTINGS_TAG, post_tag(slug)],
+        )
+        return validators
+
+    def post_page_validators(self, page: Dict, previous: Optional[Dict] = None) -> Dict:
+        """Compute validators for a ``get_post_page`` result and cache them if they changed.
+
+        The related posts are part of the page, so they are folded into the
+        ETag and the cached copy is dropped with the listings. Like listings,
+        the page has no Last-Modified: unpublishing a related post changes it
+        without any newer ``updated_at``.
+        """
+        post = page["post"]
+        validators = {
+            "etag": make_etag(
+                *_post_etag_parts(post),
+                *(f"{related.get('id')}@{related.get('updated_at')}" for related in page["related"]),
+            ),
+        }
+        if validators != previous:
+            set_cache(
+                cache_key("blog:validators:post_page", post["slug"]),
+                validators,
+                current_app.config.get("BLOG_CACHE_TTL", 3600),
+                l1=True,
+                tags=[BLOG_TAG, LISTINGS_TAG, post_tag(post["slug"])],
+            )
+        return validators
+
+    def get_listing_validators(self, limit: int, cursor: Optional[str]) -> Optional[Dict]:
+        """Get cached validators for a listing page without an upstream call."""
+        validators: Optional[Dict] = get_cache(
+            cache_key("blog:validators:listing", limit, cursor),
+            l1=True,
+            tags=[BLOG_TAG, LISTINGS_TAG],
+        )
+        return validators
+
+    def listing_validators(
+        self, page: Dict, limit: int, cursor: Optional[str], previous: Optional[Dict] = None
+    ) -> Dict:
+        """Compute validators for a listing page and cache them if they changed.
+
+        Listings get an ETag only: their newest ``updated_at`` moves back when
+        a post is unpublished, so a Last-Modified would let If-Modified-Since
+        revalidate a stale page.
+        """
+        posts = page["posts"]
+        validators = {
+            "etag": make_etag(
+                page.get("next_cursor"),
+                *(f"{post.get('id')}@{post.get('updated_at')}" for post in posts),
+            ),
+        }
+        if validators != previous:
+            set_cache(
+                cache_key("blog:validators:listing", limit, cursor),
+                validators,
+                current_app.config.get("BLOG_CACHE_TTL", 3600),
+                l1=True,
+                tags=[BLOG_TAG, LISTINGS_TAG],
+            )
+        return validators
+
+    def format_summary(self, row: Dict) -> Dict:
+        """Format a post row as listings show it, without the body fields."""
+        return self._format_post(row, summary=True)
+
+    def _format_post(self, post: Dict, summary: bool = False) -> Dict:
+        """Format post data; summaries leave out the body fields."""
+        formatted = {
             "id": post.get("id"),
             "title": post.get("title"),
             "slug": post.get("slug"),
@@ -70,18 +814,46 @@ class BlogService:
             "tags": post.get("tags", []),
             "content_storage_path": post.get("content_storage_path"),
             "content": post.get("content"),  # Inline content if stored in table
+            # Computed at publish time (see prerender); None until then
+            "toc": post.get("toc"),
+            "word_count": post.get("word_count"),
+            "reading_time": post.get("reading_time"),
         }
+        if summary:
+            for field in ("content_storage_path", "content", "toc", "word_count", "reading_time"):
+                del formatted[field]
+        return formatted
     
     def _fetch_content_from_storage(self, path: str) -> Optional[str]:
         """Fetch markdown content from Supabase Storage."""
         try:
-            response = self.supabase.storage.from_(self.bucket).download(path)
-            return response.decode("utf-8")
+            return self._download(path).decode("utf-8")
         except Exception:
             return None
+
+    def _download(self, path: str) -> bytes:
+        """Download one object from the blog bucket."""
+        with timed("storage"):
+            return self.supabase.storage.from_(self.bucket).download(path)
     
     def _render_markdown(self, markdown_content: str) -> str:
-        """Render markdown to HTML."""
-        md = markdown.Markdown(extensions=["fenced_code", "tables", "toc"])
-        return md.convert(markdown_content)
+        """Render markdown to HTML, reusing cached output for identical source."""
+        key = render_cache_key(markdown_content)
+        local_cache = _get_render_cache()
+
+        html: Optional[str] = local_cache.get(key)
+        if html is not None:
+            return html
+
+        html = get_cache(key)
+        if html is not None:
+            _render_stats["redis_hits"] += 1
+        else:
+            _render_stats["renders"] += 1
+            with timed("markdown"):
+                html = sanitize_html(_get_markdown().reset().convert(markdown_content))
+            set_cache(key, html, current_app.config.get("BLOG_RENDER_CACHE_TTL", 86400))
+
+        local_cache.set(key, html)
+        return html
 
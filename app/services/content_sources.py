@@ -0,0 +1,235 @@
+"""Blog content sources other than Supabase."""
+import bisect
+import mmap
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from flask import current_app
+
+FRONT_MATTER_DELIMITER = "---"
+
+
+def parse_front_matter(text: str) -> Tuple[Dict, int]:
+    """Parse a ``---`` delimited ``key: value`` header.
+
+    Returns the metadata and the character offset where the body starts.
+    Lists may be written as ``[a, b]`` or ``a, b`` for ``tags``.
+    """
+    lines = text.splitlines(keepends=True)
+    if not lines or lines[0].strip() != FRONT_MATTER_DELIMITER:
+        return {}, 0
+    meta: Dict = {}
+    offset = len(lines[0])
+    for line in lines[1:]:
+        offset += len(line)
+        stripped = line.strip()
+        if stripped == FRONT_MATTER_DELIMITER:
+            return meta, offset
+        if not stripped or stripped.startswith("#") or ":" not in stripped:
+            continue
+        key, value = stripped.split(":", 1)
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        meta[key.strip().lower()] = value
+    # Unterminated header: treat the whole file as body
+    return {}, 0
+
+
+def _parse_tags(value) -> List[str]:
+    """Parse a front-matter tag list."""
+    if not value:
+        return []
+    value = value.strip().strip("[]")
+    return [tag.strip().strip("'\"") for tag in value.split(",") if tag.strip()]
+
+
+def _post_id(value, slug: str) -> str:
+    """UUID for a post: its front-matter id if that is one, else derived from the id or slug.
+
+    Cursors and the keyset tiebreak compare ids as UUIDs, like the table's.
+    """
+    if value:
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            return str(uuid.uuid5(uuid.NAMESPACE_URL, f"blog:id:{value}"))
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"blog:{slug}"))
+
+
+def _parse_bool(value, default: bool = True) -> bool:
+    """Parse a front-matter boolean."""
+    if value is None:
+        return default
+    return str(value).strip().lower() in ("true", "yes", "1", "on")
+
+
+def _normalize_timestamp(value: Optional[str], fallback: float) -> str:
+    """Normalize a date or datetime to a UTC ISO 8601 string."""
+    try:
+        parsed = datetime.fromisoformat(value) if value else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        parsed = datetime.fromtimestamp(fallback, tz=timezone.utc)
+    elif parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+class FilesystemContentSource:
+    """Markdown files with front-matter, served from a local directory.
+
+    Front-matter is parsed once into an in-memory index ordered like the
+    Supabase listing (``created_at``, ``id`` descending). Bodies are read
+    lazily through mmap. The directory is re-scanned at most every
+    ``poll_interval`` seconds and only files whose mtime or size changed
+    are re-parsed, so edits show up without restarting workers.
+    """
+
+    def __init__(self, root, poll_interval: float = 2.0):
+        self.root = Path(root)
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._files: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+        # (slug -> post, posts newest first, ascending (created_at, id) keys)
+        self._index: Tuple[Dict[str, Dict], List[Dict], List[Tuple[str, str]]] = ({}, [], [])
+        self._checked_at = 0.0
+        self._listeners: List[Callable[[Iterable[str]], None]] = []
+
+    def on_change(self, callback: Callable[[Iterable[str]], None]):
+        """Register a callback receiving the slugs changed by a rescan."""
+        self._listeners.append(callback)
+
+    def refresh(self, force: bool = False) -> List[str]:
+        """Rescan the directory if due, returning changed slugs."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.poll_interval:
+            return []
+        with self._lock:
+            if not force and now - self._checked_at < self.poll_interval:
+                return []
+            changed = self._scan()
+            self._checked_at = time.monotonic()
+        if changed:
+            for callback in self._listeners:
+                try:
+                    callback(changed)
+                except Exception as e:
+                    current_app.logger.warning(f"Content change listener failed: {e}")
+        return changed
+
+    def _scan(self) -> List[str]:
+        """Re-parse new or modified files and rebuild the index."""
+        files = {}
+        for path in self.root.rglob("*.md"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            previous = self._files.get(str(path))
+            if previous and previous[0] == signature:
+                files[str(path)] = previous
+                continue
+            meta = self._load_meta(path, stat.st_mtime)
+            if meta is not None:
+                files[str(path)] = (signature, meta)
+
+        old_posts = self._index[0]
+        posts = {}
+        for _, meta in files.values():
+            if meta["published"]:
+                posts[meta["slug"]] = meta
+        changed = [
+            slug for slug in set(old_posts) | set(posts)
+            if old_posts.get(slug) is not posts.get(slug)
+        ]
+        if changed or len(files) != len(self._files):
+            ordered = sorted(posts.values(), key=lambda p: (p["created_at"], p["id"]), reverse=True)
+            keys = [(p["created_at"], p["id"]) for p in reversed(ordered)]
+            # Swap in one tuple so readers never see a partial index
+            self._files = files
+            self._index = (posts, ordered, keys)
+        return changed
+
+    def _load_meta(self, path: Path, mtime: float) -> Optional[Dict]:
+        """Parse one file's front-matter into post metadata."""
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                head = f.read(8192)
+                meta, body_offset = parse_front_matter(head)
+                if body_offset == 0 and head.startswith(FRONT_MATTER_DELIMITER) and len(head) == 8192:
+                    head += f.read()
+                    meta, body_offset = parse_front_matter(head)
+        except (OSError, UnicodeDecodeError) as e:
+            current_app.logger.warning(f"Failed to read blog content {path}: {e}")
+            return None
+        slug = meta.get("slug") or path.stem
+        created_at = _normalize_timestamp(meta.get("created_at") or meta.get("date"), mtime)
+        return {
+            "id": _post_id(meta.get("id"), slug),
+            "title": meta.get("title") or slug.replace("-", " ").title(),
+            "slug": slug,
+            "excerpt": meta.get("excerpt") or meta.get("description"),
+            "author": meta.get("author"),
+            "created_at": created_at,
+            "updated_at": _normalize_timestamp(meta.get("updated_at") or meta.get("updated"), mtime),
+            "tags": _parse_tags(meta.get("tags")),
+            "published": _parse_bool(meta.get("published")),
+            "path": str(path),
+            # Byte offset of the body, for slicing the mmap
+            "body_offset": len(head[:body_offset].encode("utf-8")),
+        }
+
+    def list_rows(self, limit: int, after: Optional[Tuple[str, str]] = None, offset: int = 0) -> List[Dict]:
+        """Published posts newest first, optionally after a (created_at, id) key."""
+        self.refresh()
+        _, ordered, keys = self._index
+        start = offset
+        if after:
+            start = len(keys) - bisect.bisect_left(keys, tuple(after)) + offset
+        return [self._row(meta) for meta in ordered[start:start + limit]]
+
+    def get_row(self, slug: str) -> Optional[Dict]:
+        """Get a published post's metadata by slug."""
+        self.refresh()
+        meta = self._index[0].get(slug)
+        return self._row(meta) if meta else None
+
+    def read_body(self, slug: str) -> Optional[str]:
+        """Read a post's Markdown body."""
+        meta = self._index[0].get(slug)
+        if not meta:
+            return None
+        try:
+            with open(meta["path"], "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return ""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return mm[meta["body_offset"]:].decode("utf-8")
+        except (OSError, ValueError) as e:
+            current_app.logger.warning(f"Failed to read blog content {meta['path']}: {e}")
+            return None
+
+    def _row(self, meta: Dict) -> Dict:
+        """Public row for a post, shaped like a Supabase blog_posts row."""
+        return {key: value for key, value in meta.items() if key not in ("path", "body_offset")}
+
+
+_content_source: FilesystemContentSource | None = None
+
+
+def get_content_source() -> FilesystemContentSource:
+    """Get this worker's filesystem content source."""
+    global _content_source
+    root = Path(current_app.config["BLOG_CONTENT_DIR"])
+    if _content_source is None or _content_source.root != root:
+        _content_source = FilesystemContentSource(
+            root, current_app.config.get("BLOG_CONTENT_POLL_INTERVAL", 2.0)
+        )
+    return _content_source
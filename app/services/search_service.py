@@ -0,0 +1,180 @@
+"""Full-text search over blog posts backed by a local SQLite FTS5 index."""
+import json
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+import bleach  # type: ignore[import-untyped]
+from flask import current_app
+
+# bm25 column weights: title, excerpt, tags, body
+_RANK_WEIGHTS = (10.0, 4.0, 6.0, 1.0)
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_posts (
+    rowid INTEGER PRIMARY KEY,
+    post_id TEXT UNIQUE NOT NULL,
+    slug TEXT NOT NULL,
+    title TEXT,
+    excerpt TEXT,
+    author TEXT,
+    tags TEXT,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+    title, excerpt, tags, body,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query (all terms, last one as a prefix)."""
+    tokens = _TOKEN_RE.findall(query or "")
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """Inverted index of post title, excerpt, tags and body."""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._pid: int | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open (or reopen after a fork) the index connection."""
+        if self._conn is None or self._pid != os.getpid():
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.row_factory = sqlite3.Row
+            # WAL lets web workers read while the Celery worker writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def index_post(self, post: Dict, body: str = ""):
+        """Add or replace a post in the index."""
+        tags = post.get("tags") or []
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                row = conn.execute(
+                    "SELECT rowid FROM search_posts WHERE post_id = ?", (str(post["id"]),)
+                ).fetchone()
+                values = (
+                    post.get("slug"),
+                    post.get("title"),
+                    post.get("excerpt"),
+                    post.get("author"),
+                    json.dumps(tags),
+                    post.get("created_at"),
+                    post.get("updated_at"),
+                )
+                if row:
+                    rowid = row["rowid"]
+                    conn.execute("DELETE FROM search_fts WHERE rowid = ?", (rowid,))
+                    conn.execute(
+                        "UPDATE search_posts SET slug = ?, title = ?, excerpt = ?, author = ?, "
+                        "tags = ?, created_at = ?, updated_at = ? WHERE rowid = ?",
+                        (*values, rowid),
+                    )
+                else:
+                    rowid = conn.execute(
+                        "INSERT INTO search_posts "
+                        "(post_id, slug, title, excerpt, author, tags, created_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (str(post["id"]), *values),
+                    ).lastrowid
+                conn.execute(
+                    "INSERT INTO search_fts (rowid, title, excerpt, tags, body) VALUES (?, ?, ?, ?, ?)",
+                    (rowid, post.get("title") or "", post.get("excerpt") or "", " ".join(tags), body or ""),
+                )
+
+    def remove_post(self, post_id: str):
+        """Remove a post from the index."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                row = conn.execute(
+                    "SELECT rowid FROM search_posts WHERE post_id = ?", (str(post_id),)
+                ).fetchone()
+                if row:
+                    conn.execute("DELETE FROM search_fts WHERE rowid = ?", (row["rowid"],))
+                    conn.execute("DELETE FROM search_posts WHERE rowid = ?", (row["rowid"],))
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> Dict:
+        """Search posts, best matches first."""
+        match = build_match_query(query)
+        if not match:
+            return {"results": [], "total": 0}
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(
+                "SELECT count(*) FROM search_fts WHERE search_fts MATCH ?", (match,)
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT p.post_id, p.slug, p.title, p.excerpt, p.author, p.tags, p.created_at, "
+                "p.updated_at, snippet(search_fts, 3, '<mark>', '</mark>', '…', 16) AS snippet, "
+                f"bm25(search_fts, {', '.join(map(str, _RANK_WEIGHTS))}) AS rank "
+                "FROM search_fts JOIN search_posts p ON p.rowid = search_fts.rowid "
+                "WHERE search_fts MATCH ? ORDER BY rank LIMIT ? OFFSET ?",
+                (match, limit, offset),
+            ).fetchall()
+        return {"results": [self._format_result(row) for row in rows], "total": total}
+
+    def count(self) -> int:
+        """Number of indexed posts."""
+        with self._lock:
+            return int(self._connect().execute("SELECT count(*) FROM search_posts").fetchone()[0])
+
+    def _format_result(self, row: sqlite3.Row) -> Dict:
+        """Format a search hit."""
+        return {
+            "id": row["post_id"],
+            "slug": row["slug"],
+            "title": row["title"],
+            "excerpt": row["excerpt"],
+            "author": row["author"],
+            "tags": json.loads(row["tags"]) if row["tags"] else [],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "snippet": row["snippet"],
+            "score": -row["rank"],
+        }
+
+
+_search_index: SearchIndex | None = None
+
+
+def get_search_index() -> SearchIndex:
+    """Get the search index configured for this app."""
+    global _search_index
+    path = str(current_app.config.get("BLOG_SEARCH_INDEX_PATH"))
+    if _search_index is None or _search_index.path != path:
+        _search_index = SearchIndex(path)
+    return _search_index
+
+
+def index_blog_post(post: Dict, html: Optional[str] = None):
+    """Index a formatted post, using its rendered HTML as the body text."""
+    body = bleach.clean(html or "", tags=[], strip=True) if html else ""
+    get_search_index().index_post(post, body)
+
+
+def search_posts(query: str, limit: int = 10, offset: int = 0) -> Dict:
+    """Search the blog index."""
+    return get_search_index().search(query, limit=limit, offset=offset)
@@ -0,0 +1,99 @@
+"""Static pre-rendering of the blog for serving straight from nginx."""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List
+from flask import current_app, render_template, url_for
+from app.services.blog_service import encode_cursor, get_blog_service, related_posts
+
+MANIFEST_NAME = ".export-manifest.json"
+
+
+def _write(path: Path, html: str):
+    """Write a page atomically along with its gzip sibling."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = html.encode("utf-8")
+    variants = {path: data, path.with_name(path.name + ".gz"): gzip.compress(data, 9, mtime=0)}
+    for target, payload in variants.items():
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, target)
+
+
+def _load_manifest(output: Path) -> Dict:
+    """Load the previous export's manifest."""
+    try:
+        manifest: Dict = json.loads((output / MANIFEST_NAME).read_text())
+        return manifest
+    except (OSError, ValueError):
+        return {"posts": {}, "listing": None}
+
+
+def _signature(value) -> str:
+    """Stable digest of a JSON-serialisable value."""
+    return hashlib.sha256(json.dumps(value).encode()).hexdigest()
+
+
+def export_static_blog(output_dir, force: bool = False, page_size: int = 10) -> Dict:
+    """Render published posts and the first listing page into output_dir.
+
+    Post pages carry the same "More posts" as the app's (``BLOG_RELATED_POSTS``
+    newest other posts). A post is re-rendered only when its ``updated_at``
+    or its related posts changed since the last export; the listing is
+    rewritten when any of its posts changed. Pages of unpublished posts are
+    removed. Later listing pages are not exported: the listing links to
+    ``/blog/?cursor=...`` like the app does, and nginx hands requests with a
+    query string to Flask.
+    """
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    manifest = {"posts": {}, "listing": None} if force else _load_manifest(output)
+
+    blog_service = get_blog_service()
+    rows = list(blog_service.iter_posts())
+    posts: List[Dict] = [blog_service.format_summary(row) for row in rows]
+
+    # The newest posts, as BlogService.get_post_page lists them for "More posts"
+    related_count = current_app.config.get("BLOG_RELATED_POSTS", 5)
+    recent = posts[:related_count + 1]
+    related = {post["slug"]: related_posts(recent, post["slug"], related_count) for post in posts}
+    current = {
+        post["slug"]: _signature(
+            [post.get("updated_at"), [[item["slug"], item.get("updated_at")] for item in related[post["slug"]]]]
+        )
+        for post in posts
+    }
+    changed = [row for row in rows if manifest["posts"].get(row["slug"]) != current[row["slug"]]]
+    removed = [slug for slug in manifest["posts"] if slug not in current]
+
+    # Bodies of every changed post are downloaded concurrently
+    for post in blog_service.render_posts(changed):
+        with current_app.test_request_context(f"/blog/{post['slug']}"):
+            html = render_template("blog/post.html", post=post, related=related[post["slug"]])
+        _write(output / post["slug"] / "index.html", html)
+
+    for slug in removed:
+        shutil.rmtree(output / slug, ignore_errors=True)
+
+    listing = posts[:page_size]
+    has_more = len(posts) > page_size
+    listing_signature = _signature([[[post["slug"], post.get("updated_at")] for post in listing], has_more])
+    listing_changed = listing_signature != manifest.get("listing")
+    if listing_changed:
+        with current_app.test_request_context("/blog/"):
+            next_url = url_for("blog.index", cursor=encode_cursor(listing[-1])) if has_more else None
+            html = render_template("blog/index.html", posts=listing, next_url=next_url)
+        _write(output / "index.html", html)
+
+    manifest = {"posts": current, "listing": listing_signature}
+    (output / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+
+    return {
+        "posts": len(posts),
+        "rendered": len(changed),
+        "removed": len(removed),
+        "listing_pages": 1 if listing_changed else 0,
+    }
@@ -0,0 +1,41 @@
+"""Cache maintenance Celery tasks."""
+from app.extensions import celery
+from app.services.blog_service import decay_popularity, get_blog_service, popular_slugs
+from flask import current_app
+
+
+@celery.task(name="tasks.warm_blog_cache")
+def warm_blog_cache(
+    newest: int | None = None, popular: int | None = None, rate: float | None = None
+):
+    """Warm caches for the newest and most viewed blog posts.
+
+    Runs on the beat schedule and after deploys (``flask blog warm-cache``)
+    so the first visitors after a deploy or Redis flush hit warm caches.
+    """
+    try:
+        with current_app.app_context():
+            config = current_app.config
+            newest = config.get("BLOG_WARM_NEWEST", 50) if newest is None else newest
+            popular = config.get("BLOG_WARM_POPULAR", 100) if popular is None else popular
+            rate = config.get("BLOG_WARM_RATE", 20) if rate is None else rate
+            blog_service = get_blog_service()
+
+            # First listing page, which most visitors land on
+            first_page = blog_service.list_posts_page(limit=10)
+            blog_service.listing_validators(first_page, 10, None)
+
+            recent = blog_service.list_posts(limit=newest) if newest else []
+            slugs = [post["slug"] for post in recent] + popular_slugs(popular)
+            result = blog_service.warm_posts(slugs, rate=rate)
+
+            # Let old traffic fade so the popular set follows current readers
+            decay_popularity(config.get("BLOG_POPULARITY_DECAY", 0.9))
+
+            current_app.logger.info(
+                f"Warmed blog cache: {result['warmed']} of {result['requested']} posts"
+            )
+            return {"status": "completed", **result}
+    except Exception as e:
+        current_app.logger.error(f"Failed to warm blog cache: {e}")
+        raise
@@ -1,8 +1,18 @@
 """Example Celery tasks."""
+import multiprocessing
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, cast
 from app.extensions import celery
 from app.extensions import supabase_client
+from app.services.blog_service import LISTINGS_TAG, get_blog_service, invalidate_post, post_tag
+from app.services.search_service import get_search_index, index_blog_post
+from app.utils.cache import invalidate_tags
 from flask import current_app
 
+# PostgREST upserts are INSERT ... ON CONFLICT, so NOT NULL columns must be sent too
+UPSERT_KEY_COLUMNS = ("id", "title", "slug", "author")
+
 
 @celery.task(name="tasks.example_task")
 def example_task(data: dict):
@@ -23,25 +33,209 @@ def example_task(data: dict):
 
 @celery.task(name="tasks.process_blog_post")
 def process_blog_post(post_id: str):
-    """Process a blog post asynchronously (e.g., generate preview, index for search)."""
+    """Process a blog post asynchronously: pre-render its HTML and index it for search."""
     try:
         with current_app.app_context():
-            client = supabase_client.get_client()
+            # Drafts too: unpublishing must remove the post from the search index
+            client = _write_client()
             
-            # Example: Fetch post, process it, update it
             response = client.table("blog_posts").select("*").eq("id", post_id).single().execute()
             
             if response.data:
-                # Process the post (e.g., generate preview, extract tags, etc.)
                 current_app.logger.info(f"Processing blog post: {post_id}")
-                
-                # Update post with processed data
-                # client.table("blog_posts").update({"processed": True}).eq("id", post_id).execute()
-                
-                return {"status": "completed", "post_id": post_id}
+                blog_service = get_blog_service()
+                row = cast(dict, response.data)
+
+                # Render, sanitise and store the body once so reads are a single query
+                rendered = blog_service.prerender_row(row)
+                if rendered and (
+                    rendered["content_hash"] != row.get("content_hash") or not row.get("html_content")
+                ):
+                    # The stored row, since the update trigger has moved updated_at on
+                    updated = client.table("blog_posts").update(rendered).eq("id", post_id).execute()
+                    row = cast(dict, updated.data[0]) if updated.data else {**row, **rendered}
+
+                # Keep the search index in step with the post
+                if row.get("published"):
+                    post = blog_service.render_post(row)
+                    index_blog_post(post, post.get("html_content") or post.get("content"))
+                else:
+                    get_search_index().remove_post(post_id)
+
+                # Drop cached listings, data and full-page responses for this post
+                invalidate_post(row.get("slug"))
+
+                return {"status": "completed", "post_id": post_id, "rendered": bool(rendered)}
             else:
                 raise Exception(f"Post not found: {post_id}")
     except Exception as e:
         current_app.logger.error(f"Failed to process blog post: {e}")
         raise
 
+
+@celery.task(name="tasks.process_blog_posts", bind=True)
+def process_blog_posts(
+    self,
+    post_ids: list | None = None,
+    after: str | None = None,
+    limit: int | None = None,
+    batch_size: int | None = None,
+    force: bool = False,
+):
+    """Pre-render and index many blog posts: ``post_ids``, or every post by id after ``after``.
+
+    Each batch is fetched with one query, rendered in a process pool and
+    written back with one upsert. Posts whose stored HTML matches their source
+    are skipped unless ``force`` is set (use it after a renderer change).
+    Progress is reported as the ``PROGRESS`` state; ``last_id`` in the result
+    or the progress resumes an interrupted run. Given ``post_ids`` that match
+    no post are counted as done and listed under ``missing``.
+    """
+    try:
+        with current_app.app_context():
+            # Drafts too, so unpublished posts leave the search index
+            client = _write_client()
+            blog_service = get_blog_service()
+            batch_size = batch_size or current_app.config.get("BLOG_BULK_BATCH_SIZE", 200)
+            if post_ids is not None:
+                total = len(post_ids)
+            else:
+                total = _count_posts(client, after)
+            if limit is not None:
+                total = min(total, limit)
+            progress: dict[str, Any] = {
+                "total": total, "done": 0, "rendered": 0, "missing": [], "last_id": after
+            }
+
+            with _render_pool() as pool:
+                for rows, missing in _post_batches(client, post_ids, after, limit, batch_size):
+                    if missing:
+                        current_app.logger.warning(f"Blog posts not found: {', '.join(map(str, missing))}")
+                        progress["missing"].extend(missing)
+                    rendered = blog_service.prerender_rows(rows, executor=pool, force=force)
+                    updates = []
+                    for row, values in zip(rows, rendered):
+                        if values:
+                            updates.append({**{c: row.get(c) for c in UPSERT_KEY_COLUMNS}, **values})
+                            row.update(values)
+                    if updates:
+                        written = client.table("blog_posts").upsert(updates, on_conflict="id").execute()
+                        # Index the stored rows, whose updated_at the update trigger has moved on
+                        stored = {row["id"]: row for row in written.data or []}
+                        for row in rows:
+                            row.update(stored.get(row["id"], {}))
+
+                    for post in blog_service.render_posts([row for row in rows if row.get("published")]):
+                        index_blog_post(post, post.get("html_content") or post.get("content"))
+                    for row in rows:
+                        if not row.get("published"):
+                            get_search_index().remove_post(row["id"])
+                    if updates:
+                        invalidate_tags(LISTINGS_TAG, *(post_tag(update["slug"]) for update in updates))
+
+                    progress["done"] += len(rows) + len(missing)
+                    progress["rendered"] += len(updates)
+                    if rows:
+                        progress["last_id"] = rows[-1]["id"]
+                    _report_progress(self, progress)
+
+            current_app.logger.info(
+                f"Processed {progress['done']} blog posts ({progress['rendered']} re-rendered)"
+            )
+            return {"status": "completed", **progress}
+    except Exception as e:
+        current_app.logger.error(f"Failed to process blog posts: {e}")
+        raise
+
+
+def _count_posts(client, after: str | None) -> int:
+    """Number of posts with an id after ``after``."""
+    query = client.table("blog_posts").select("id", count="exact")
+    if after:
+        query = query.gt("id", after)
+    return query.limit(1).execute().count or 0
+
+
+def _post_batches(client, post_ids, after, limit, batch_size):
+    """Yield ``(rows, missing ids)`` per batch: the given ids, or keyset by id after ``after``."""
+    remaining = limit
+    if post_ids is not None:
+        post_ids = post_ids[:limit] if limit is not None else post_ids
+        for start in range(0, len(post_ids), batch_size):
+            chunk = post_ids[start:start + batch_size]
+            rows = client.table("blog_posts").select("*").in_("id", chunk).execute().data
+            # Keep the caller's order so last_id resumes correctly
+            order = {post_id: index for index, post_id in enumerate(chunk)}
+            rows.sort(key=lambda row: order.get(row["id"], len(order)))
+            found = {row["id"] for row in rows}
+            yield rows, [post_id for post_id in chunk if post_id not in found]
+        return
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        query = client.table("blog_posts").select("*")
+        if after:
+            query = query.gt("id", after)
+        rows = query.order("id").limit(size).execute().data
+        if not rows:
+            return
+        yield rows, []
+        after = rows[-1]["id"]
+        if remaining is not None:
+            remaining -= len(rows)
+        if len(rows) < size:
+            return
+
+
+def _render_pool():
+    """Process pool for rendering Markdown, or a null context to render in this process.
+
+    Celery's default prefork children are daemonic and may not start processes
+    of their own, so there the batch is rendered in the child itself.
+    """
+    processes = current_app.config.get("BLOG_BULK_PROCESSES", 0) or None
+    if processes == 1 or multiprocessing.current_process().daemon:
+        return nullcontext()
+    return ProcessPoolExecutor(max_workers=processes)
+
+
+def _report_progress(task, progress: dict):
+    """Publish progress as the task's PROGRESS state when it runs through a broker."""
+    if task.request.called_directly or task.request.is_eager:
+        return
+    task.update_state(state="PROGRESS", meta=dict(progress))
+
+
+def _write_client():
+    """Service-role client when configured (bypasses RLS, so it sees drafts), else the anon client."""
+    if supabase_client.service_role_key:
+        return supabase_client.get_service_client()
+    return supabase_client.get_client()
+
+
+@celery.task(name="tasks.reindex_blog_search")
+def reindex_blog_search():
+    """Rebuild the search index from every published blog post."""
+    try:
+        with current_app.app_context():
+            blog_service = get_blog_service()
+            indexed = 0
+            batch = []
+            for row in blog_service.iter_posts():
+                batch.append(row)
+                if len(batch) >= 100:
+                    indexed += _index_posts(blog_service, batch)
+                    batch = []
+            indexed += _index_posts(blog_service, batch)
+
+            current_app.logger.info(f"Reindexed {indexed} blog posts")
+            return {"status": "completed", "indexed": indexed}
+    except Exception as e:
+        current_app.logger.error(f"Failed to reindex blog posts: {e}")
+        raise
+
+
+def _index_posts(blog_service, rows) -> int:
+    """Render a batch of posts (bodies fetched concurrently) and index them."""
+    for post in blog_service.render_posts(rows):
+        index_blog_post(post, post.get("html_content") or post.get("content"))
+    return len(rows)
@@ -0,0 +1,19 @@
+"""Celery monitoring tasks."""
+from app.extensions import celery
+from app.metrics import QUEUE_DEPTH
+from app.utils.task_stats import sample_queues
+from flask import current_app
+
+
+@celery.task(name="tasks.sample_queue_depth", ignore_result=True)
+def sample_queue_depth():
+    """Sample broker queue depth and per-queue throughput (runs on the beat schedule)."""
+    try:
+        with current_app.app_context():
+            samples = sample_queues(current_app.config.get("CELERY_MONITORED_QUEUES", ["celery"]))
+            for queue, sample in samples.items():
+                QUEUE_DEPTH.labels(queue).set(sample["depth"])
+            return {"status": "completed", "queues": samples}
+    except Exception as e:
+        current_app.logger.error(f"Failed to sample queues: {e}")
+        raise
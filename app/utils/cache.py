@@ -1,9 +1,210 @@
 """Redis caching utilities."""
+from collections import OrderedDict
+from contextlib import contextmanager
 from functools import wraps
-from flask import current_app
+from flask import current_app, request, make_response
 from app.extensions import redis_client
-import json
+from app.metrics import record_cache
+from app.utils.serialization import Serializer, available_codec, available_compression
+from app.utils.timing import timed
 import hashlib
+import inspect
+import math
+import random
+import threading
+import time
+import uuid
+from typing import cast
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded, thread-safe in-process LRU cache with optional TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        """Get value and mark it as most recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value, ttl: float | None = None):
+        """Store value, evicting the least recently used entry when full."""
+        if self.maxsize <= 0:
+            return
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        """Remove value if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all values and reset counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """Per-key locks so concurrent misses in one worker compute a value once."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks: dict[str, list] = {}
+
+    @contextmanager
+    def lock(self, key: str):
+        """Hold the lock for key; waiters block until the holder is done."""
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._locks.pop(key, None)
+
+
+_serializer: Serializer | None = None
+_l1_cache: LRUCache | None = None
+_tag_cache: LRUCache | None = None
+_single_flight = SingleFlight()
+
+TAG_KEY_PREFIX = "cache:tag:"
+
+
+def get_serializer() -> Serializer:
+    """Get the configured cache serializer, falling back to JSON/zlib if unavailable."""
+    global _serializer
+    if _serializer is None:
+        codec = current_app.config.get("CACHE_SERIALIZER", "json")
+        compression = current_app.config.get("CACHE_COMPRESSION", "none")
+        if not available_codec(codec):
+            current_app.logger.warning(f"Cache serializer {codec} not installed, using json")
+            codec = "json"
+        if not available_compression(compression):
+            current_app.logger.warning(f"Cache compression {compression} not installed, using zlib")
+            compression = "zlib"
+        _serializer = Serializer(
+            codec,
+            compression,
+            current_app.config.get("CACHE_COMPRESS_MIN_SIZE", 1024),
+        )
+    return _serializer
+
+
+def get_l1() -> LRUCache:
+    """Get the per-worker L1 cache."""
+    global _l1_cache
+    if _l1_cache is None:
+        _l1_cache = LRUCache(
+            current_app.config.get("CACHE_L1_SIZE", 1024),
+            ttl=current_app.config.get("CACHE_L1_TTL", 30),
+        )
+    return _l1_cache
+
+
+def _get_tag_cache() -> LRUCache:
+    """Get the per-worker cache of tag generations."""
+    global _tag_cache
+    if _tag_cache is None:
+        _tag_cache = LRUCache(
+            current_app.config.get("CACHE_TAG_CACHE_SIZE", 4096),
+            ttl=current_app.config.get("CACHE_TAG_TTL", 5),
+        )
+    return _tag_cache
+
+
+def tag_generations(tags) -> list[int]:
+    """Get the current generation of each tag (0 if never invalidated)."""
+    tag_cache = _get_tag_cache()
+    generations = [tag_cache.get(tag) for tag in tags]
+    missing = [tag for tag, generation in zip(tags, generations) if generation is None]
+    if missing:
+        fetched = {}
+        try:
+            cache = redis_client.get_cache()
+            with timed("cache"):
+                values = cast(list, cache.mget([f"{TAG_KEY_PREFIX}{tag}" for tag in missing]))
+            for tag, value in zip(missing, values):
+                fetched[tag] = int(value) if value is not None else 0
+                tag_cache.set(tag, fetched[tag])
+        except Exception as e:
+            current_app.logger.warning(f"Cache tag error: {e}")
+        generations = [
+            generation if generation is not None else fetched.get(tag, 0)
+            for tag, generation in zip(tags, generations)
+        ]
+    return generations
+
+
+def tagged_key(key: str, tags=None) -> str:
+    """Namespace key by the current generation of its tags."""
+    if not tags:
+        return key
+    tags = sorted(set(tags))
+    generations = tag_generations(tags)
+    namespace = ",".join(f"{tag}={gen}" for tag, gen in zip(tags, generations))
+    return f"{key}:{hashlib.md5(namespace.encode()).hexdigest()[:12]}"
+
+
+def invalidate_tags(*tags):
+    """Invalidate every entry carrying any of tags (one INCR per tag)."""
+    if not tags:
+        return
+    tag_cache = _get_tag_cache()
+    try:
+        cache = redis_client.get_cache()
+        pipe = cache.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(f"{TAG_KEY_PREFIX}{tag}")
+        with timed("cache"):
+            generations = pipe.execute()
+        for tag, generation in zip(tags, generations):
+            tag_cache.set(tag, int(generation))
+    except Exception as e:
+        current_app.logger.warning(f"Cache invalidate error: {e}")
+        for tag in tags:
+            tag_cache.delete(tag)
 
 
 def cache_key(prefix: str, *args, **kwargs) -> str:
@@ -14,61 +215,378 @@ def cache_key(prefix: str, *args, **kwargs) -> str:
     if kwargs:
         sorted_kwargs = sorted(kwargs.items())
         key_parts.extend(f"{k}:{v}" for k, v in sorted_kwargs)
-    
+
     key_string = ":".join(key_parts)
     return f"cache:{hashlib.md5(key_string.encode()).hexdigest()}"
 
 
-def get_cache(key: str, default=None):
-    """Get value from cache."""
+def get_cache(key: str, default=None, l1: bool = False, tags=None):
+    """Get value from cache, checking the in-process L1 first when enabled."""
+    key = tagged_key(key, tags)
+    if l1:
+        value = get_l1().get(key, _MISSING)
+        record_cache("l1", value is not _MISSING)
+        if value is not _MISSING:
+            return value
     try:
         cache = redis_client.get_cache()
-        value = cache.get(key)
+        with timed("cache"):
+            value = cache.get(key)
+        record_cache("redis", value is not None)
         if value is not None:
-            return json.loads(value)
+            value = get_serializer().loads(value)
+            if l1:
+                get_l1().set(key, value)
+            return value
         return default
     except Exception as e:
         current_app.logger.warning(f"Cache get error: {e}")
         return default
 
 
-def set_cache(key: str, value, ttl: int = 3600):
-    """Set value in cache with TTL (seconds)."""
+def set_cache(key: str, value, ttl: int = 3600, l1: bool = False, tags=None):
+    """Set value in cache with TTL (seconds), mirroring it into the L1 when enabled."""
+    key = tagged_key(key, tags)
+    if l1:
+        l1_cache = get_l1()
+        l1_cache.set(key, value, ttl=min(ttl, l1_cache.ttl or ttl))
     try:
         cache = redis_client.get_cache()
-        cache.setex(key, ttl, json.dumps(value))
+        data = get_serializer().dumps(value)
+        with timed("cache"):
+            cache.setex(key, ttl, data)
     except Exception as e:
         current_app.logger.warning(f"Cache set error: {e}")
 
 
-def delete_cache(key: str):
-    """Delete value from cache."""
+def delete_cache(key: str | None = None, tags=None):
+    """Delete value from cache and/or invalidate every entry carrying tags."""
+    if tags:
+        invalidate_tags(*tags)
+    if key is None:
+        return
+    if _l1_cache is not None:
+        _l1_cache.delete(key)
     try:
         cache = redis_client.get_cache()
-        cache.delete(key)
+        with timed("cache"):
+            cache.delete(key)
     except Exception as e:
         current_app.logger.warning(f"Cache delete error: {e}")
 
 
-def cached(ttl: int = 3600, key_prefix: str = None):
-    """Decorator to cache function results."""
+def get_many(keys, l1: bool = False, tags=None) -> dict:
+    """Get several values in one MGET; missing keys are left out of the result."""
+    keys = list(keys)
+    if not keys:
+        return {}
+    found = {}
+    lookup = {tagged_key(key, tags): key for key in keys}
+    if l1:
+        l1_cache = get_l1()
+        for full_key, key in list(lookup.items()):
+            value = l1_cache.get(full_key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+                del lookup[full_key]
+        record_cache("l1", True, len(found))
+        record_cache("l1", False, len(lookup))
+    if not lookup:
+        return found
+    try:
+        cache = redis_client.get_cache()
+        serializer = get_serializer()
+        full_keys = list(lookup)
+        with timed("cache"):
+            values = cast(list, cache.mget(full_keys))
+        hits = sum(value is not None for value in values)
+        record_cache("redis", True, hits)
+        record_cache("redis", False, len(values) - hits)
+        for full_key, value in zip(full_keys, values):
+            if value is None:
+                continue
+            value = serializer.loads(value)
+            found[lookup[full_key]] = value
+            if l1:
+                get_l1().set(full_key, value)
+    except Exception as e:
+        current_app.logger.warning(f"Cache get_many error: {e}")
+    return found
+
+
+def set_many(mapping: dict, ttl: int = 3600, l1: bool = False, tags=None):
+    """Set several values with TTL (seconds) in one pipeline."""
+    if not mapping:
+        return
+    # All keys share the same tags, so resolve the namespace once
+    namespace = tagged_key("", tags)
+    items = [(f"{key}{namespace}", value) for key, value in mapping.items()]
+    if l1:
+        l1_cache = get_l1()
+        for full_key, value in items:
+            l1_cache.set(full_key, value, ttl=min(ttl, l1_cache.ttl or ttl))
+    try:
+        cache = redis_client.get_cache()
+        serializer = get_serializer()
+        pipe = cache.pipeline(transaction=False)
+        for full_key, value in items:
+            pipe.setex(full_key, ttl, serializer.dumps(value))
+        with timed("cache"):
+            pipe.execute()
+    except Exception as e:
+        current_app.logger.warning(f"Cache set_many error: {e}")
+
+
+def delete_many(keys):
+    """Delete several values in one round trip."""
+    keys = list(keys)
+    if not keys:
+        return
+    if _l1_cache is not None:
+        for key in keys:
+            _l1_cache.delete(key)
+    try:
+        cache = redis_client.get_cache()
+        with timed("cache"):
+            cache.delete(*keys)
+    except Exception as e:
+        current_app.logger.warning(f"Cache delete_many error: {e}")
+
+
+def _get_entry(key: str, l1: bool = False) -> dict | None:
+    """Get a ``cached`` entry, ignoring values not written by the decorator."""
+    entry = get_cache(key, l1=l1)
+    if isinstance(entry, dict) and "x" in entry and "v" in entry:
+        return entry
+    return None
+
+
+def _should_refresh(entry: dict, beta: float) -> bool:
+    """Decide whether to recompute an entry (expired, or early via XFetch)."""
+    now = time.time()
+    if now >= entry["x"]:
+        return True
+    if beta <= 0:
+        return False
+    # Probabilistic early expiration: the closer to expiry and the more
+    # expensive the recompute, the more likely one caller refreshes early.
+    return bool(now - entry["d"] * beta * math.log(1.0 - random.random()) >= entry["x"])
+
+
+# Delete the lock only while it still holds our token, in one atomic step
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _acquire_lock(key: str, timeout: float) -> str | None:
+    """Take the cross-worker recompute lock for key."""
+    try:
+        token = uuid.uuid4().hex
+        cache = redis_client.get_cache()
+        with timed("cache"):
+            acquired = cache.set(f"lock:{key}", token, nx=True, px=int(timeout * 1000))
+        if acquired:
+            return token
+        return None
+    except Exception as e:
+        current_app.logger.warning(f"Cache lock error: {e}")
+        return ""
+
+
+def _release_lock(key: str, token: str | None):
+    """Release the recompute lock if we still own it."""
+    if not token:
+        return
+    try:
+        cache = redis_client.get_cache()
+        with timed("cache"):
+            cache.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token)
+    except Exception as e:
+        current_app.logger.warning(f"Cache unlock error: {e}")
+
+
+def _wait_for_entry(key: str, timeout: float) -> dict | None:
+    """Poll for an entry another worker is computing."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = _get_entry(key)
+        if entry is not None and time.time() < entry["x"]:
+            return entry
+    return None
+
+
+def cached(
+    ttl: int = 3600,
+    key_prefix: str | None = None,
+    l1: bool = False,
+    stale_ttl: int = 0,
+    beta: float = 1.0,
+    lock_timeout: float | None = None,
+    tags=None,
+    method: bool = False,
+    ttl_config: str | None = None,
+):
+    """Decorator to cache function results.
+
+    Entries are stored as ``{"v": value, "x": expires_at, "d": compute_seconds}``.
+    With ``l1`` hot entries are served from the per-worker LRU. Concurrent
+    misses in a worker share one computation, and a short Redis lock keeps
+    other workers from recomputing at the same time; they serve the stale
+    value for up to ``stale_ttl`` seconds instead. ``beta`` controls
+    probabilistic early refresh (0 disables it).
+
+    Arguments are bound to the function's signature (defaults applied)
+    before keying, so ``f(10)``, ``f(limit=10)`` and ``f()`` share an entry.
+
+    ``tags`` is a list or a callable taking the function arguments and
+    returning one; ``invalidate_tags`` drops every entry carrying a tag.
+    ``method`` leaves ``self`` out of the key, and ``ttl_config`` names a
+    config value that overrides ``ttl`` at call time.
+
+    The wrapper gets ``cache_key_for(*args, **kwargs)`` and
+    ``prime(value, *args, **kwargs)`` to check or fill entries ahead of
+    time (e.g. when warming caches in bulk).
+    """
     def decorator(f):
+        signature = inspect.signature(f)
+
+        def entry_key(args, kwargs) -> str:
+            prefix = key_prefix or f"{f.__module__}.{f.__name__}"
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key_args = bound.args[1:] if method else bound.args
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+            return tagged_key(cache_key(prefix, *key_args, **bound.kwargs), entry_tags)
+
+        def resolve_ttl() -> int:
+            return current_app.config.get(ttl_config, ttl) if ttl_config else ttl
+
         @wraps(f)
         def decorated_function(*args, **kwargs):
             # Generate cache key
-            prefix = key_prefix or f"{f.__module__}.{f.__name__}"
-            cache_key_str = cache_key(prefix, *args, **kwargs)
-            
+            cache_key_str = entry_key(args, kwargs)
+            entry_ttl = resolve_ttl()
+
             # Try to get from cache
-            cached_value = get_cache(cache_key_str)
-            if cached_value is not None:
-                return cached_value
-            
-            # Execute function and cache result
-            result = f(*args, **kwargs)
-            set_cache(cache_key_str, result, ttl)
-            return result
-        
+            entry = _get_entry(cache_key_str, l1=l1)
+            if entry is not None and not _should_refresh(entry, beta):
+                return entry["v"]
+
+            timeout = lock_timeout or current_app.config.get("CACHE_LOCK_TIMEOUT", 10)
+            with _single_flight.lock(cache_key_str):
+                # Another greenlet in this worker may have refreshed it already
+                latest = _get_entry(cache_key_str, l1=l1)
+                if latest is not None and time.time() < latest["x"]:
+                    if entry is None or latest["x"] > entry["x"]:
+                        return latest["v"]
+
+                token = _acquire_lock(cache_key_str, timeout)
+                if token is None:
+                    # Another worker is recomputing: serve stale or wait for it
+                    if entry is not None:
+                        return entry["v"]
+                    waited = _wait_for_entry(cache_key_str, timeout)
+                    if waited is not None:
+                        return waited["v"]
+
+                try:
+                    # Execute function and cache result
+                    start = time.monotonic()
+                    result = f(*args, **kwargs)
+                    entry = {
+                        "v": result,
+                        "x": time.time() + entry_ttl,
+                        "d": time.monotonic() - start,
+                    }
+                    set_cache(cache_key_str, entry, entry_ttl + stale_ttl, l1=l1)
+                    return result
+                finally:
+                    _release_lock(cache_key_str, token)
+
+        def cache_key_for(*args, **kwargs) -> str:
+            """Key the result for these arguments is cached under."""
+            return entry_key(args, kwargs)
+
+        def prime(value, *args, compute_time: float = 0.0, **kwargs):
+            """Store value as the cached result for these arguments."""
+            value_ttl = resolve_ttl()
+            entry = {"v": value, "x": time.time() + value_ttl, "d": compute_time}
+            set_cache(entry_key(args, kwargs), entry, value_ttl + stale_ttl, l1=l1)
+
+        decorated_function.cache_key_for = cache_key_for
+        decorated_function.prime = prime
         return decorated_function
     return decorator
 
+
+# Response headers that must not be replayed from the page cache
+_UNCACHED_HEADERS = {"set-cookie", "content-length", "x-request-id", "x-cache", "server-timing"}
+
+
+def cached_response(
+    ttl: int = 300,
+    key_prefix: str | None = None,
+    tags=None,
+    vary=("Accept", "Accept-Language"),
+    ttl_config: str | None = None,
+):
+    """Decorator to cache whole GET responses (status, headers and body) for anonymous requests.
+
+    The key covers the path, the query string and the ``vary`` request
+    headers. Requests carrying an Authorization header or a session cookie
+    bypass the cache, and only 200 responses without cookies are stored.
+    Hits are answered with 304 when the client's validators still match.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            session_cookie = current_app.config.get("SESSION_COOKIE_NAME", "session")
+            if (
+                request.method != "GET"
+                or "Authorization" in request.headers
+                or session_cookie in request.cookies
+            ):
+                return f(*args, **kwargs)
+
+            prefix = key_prefix or f"response:{request.endpoint}"
+            query = sorted(request.args.items(multi=True))
+            headers = [request.headers.get(header, "") for header in vary]
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+            key = cache_key(prefix, request.path, *query, *headers)
+
+            entry = get_cache(key, l1=True, tags=entry_tags)
+            record_cache("page", entry is not None)
+            if entry is not None:
+                response = current_app.response_class(
+                    entry["body"], status=entry["status"], headers=entry["headers"]
+                )
+                response.headers["X-Cache"] = "HIT"
+                return response.make_conditional(request)
+
+            response = make_response(f(*args, **kwargs))
+            if (
+                response.status_code == 200
+                and not response.direct_passthrough
+                and "Set-Cookie" not in response.headers
+            ):
+                entry = {
+                    "body": response.get_data(as_text=True),
+                    "status": response.status_code,
+                    "headers": [
+                        [name, value]
+                        for name, value in response.headers.items()
+                        if name.lower() not in _UNCACHED_HEADERS
+                    ],
+                }
+                entry_ttl = current_app.config.get(ttl_config, ttl) if ttl_config else ttl
+                set_cache(key, entry, entry_ttl, l1=True, tags=entry_tags)
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return decorated_function
+    return decorator
@@ -0,0 +1,52 @@
+"""HTTP conditional request helpers."""
+import hashlib
+from datetime import datetime, timezone
+from flask import request, Response
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag value from the parts identifying a representation."""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def parse_timestamp(value: str | None) -> datetime | None:
+    """Parse an ISO timestamp (as returned by PostgREST) into an aware datetime."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def is_not_modified(etag: str | None, last_modified: datetime | None = None) -> bool:
+    """Check If-None-Match / If-Modified-Since against the current validators."""
+    if request.method not in ("GET", "HEAD"):
+        return False
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+    if request.if_none_match:
+        return bool(etag and request.if_none_match.contains(etag))
+    if last_modified and request.if_modified_since:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def set_validators(
+    response: Response, etag: str | None, last_modified: datetime | None = None
+) -> Response:
+    """Attach ETag, Last-Modified and a revalidation Cache-Control to response."""
+    if etag:
+        response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers.setdefault("Cache-Control", "public, no-cache")
+    return response
+
+
+def not_modified(etag: str | None, last_modified: datetime | None = None) -> Response:
+    """Build an empty 304 response carrying the validators."""
+    return set_validators(Response(status=304), etag, last_modified)
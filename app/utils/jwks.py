@@ -0,0 +1,115 @@
+"""Locally cached Supabase JSON Web Key Set for asymmetric JWT verification."""
+import logging
+import os
+import threading
+import time
+import httpx
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class SupabaseJWKS:
+    """JWKS kept in memory and refreshed by a background thread.
+
+    The key set is fetched once, blocking, when the app is set up and again
+    after every fork (``gunicorn.conf.py`` calls ``start``). Request handlers
+    only read the in-memory key set, so verification never waits on the
+    network: an unknown ``kid`` is rejected and schedules an early refresh.
+    """
+
+    def __init__(self):
+        self.url: str | None = None
+        self.refresh_interval = 600
+        self.min_refresh_interval = 30
+        self.startup_wait = 2.0
+        self._keys: dict[str | None, jwt.PyJWK] = {}
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+        self._generation = 0
+
+    def init_app(self, app):
+        """Configure the JWKS endpoint from app configuration."""
+        supabase_url = app.config.get("SUPABASE_URL")
+        self.url = app.config.get("SUPABASE_JWKS_URL") or (
+            f"{supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json" if supabase_url else None
+        )
+        self.refresh_interval = app.config.get("SUPABASE_JWKS_REFRESH_INTERVAL", 600)
+        self.start()
+
+    def start(self):
+        """Load the key set now and keep it refreshed from this process (call after a fork)."""
+        if not self.url:
+            return
+        # Bounded warm-up, so the first requests already have the keys
+        loaded = self.refresh(timeout=self.startup_wait)
+        with self._lock:
+            self._spawn(retry_now=not loaded)
+
+    def refresh(self, timeout: float = 5) -> bool:
+        """Fetch the key set and swap it in."""
+        if not self.url:
+            return False
+        try:
+            response = httpx.get(self.url, timeout=timeout)
+            response.raise_for_status()
+            keys: dict[str | None, jwt.PyJWK] = {}
+            for key_data in response.json().get("keys", []):
+                try:
+                    key = jwt.PyJWK(key_data)
+                except jwt.PyJWKError:
+                    continue
+                keys[key.key_id] = key
+            self._keys = keys
+            return True
+        except Exception as e:
+            logger.warning(f"JWKS refresh failed: {e}")
+            return False
+
+    def get_key(self, kid: str | None) -> jwt.PyJWK | None:
+        """Get a signing key by id from the local key set; never fetches."""
+        if not self.url:
+            return None
+        if self._pid != os.getpid():
+            # Forked without start(): keep the inherited keys and refresh in the background
+            self._start_background()
+        key = self._keys.get(kid)
+        if key is None:
+            # Possibly a rotated key: reject it now and refresh in the background
+            self._wake.set()
+        return key
+
+    def _start_background(self):
+        """Start the refresher in this process without waiting for a fetch."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._spawn(retry_now=True)
+
+    def _spawn(self, retry_now: bool):
+        """Replace the refresher thread; the previous one exits at its next wake-up."""
+        previous = self._wake
+        self._pid = os.getpid()
+        self._generation += 1
+        self._wake = threading.Event()
+        if retry_now:
+            self._wake.set()
+        previous.set()
+        threading.Thread(
+            target=self._run, args=(self._generation, self._wake), name="jwks-refresh", daemon=True
+        ).start()
+
+    def _run(self, generation: int, wake: threading.Event):
+        """Refresh periodically, or early when woken, until replaced."""
+        while True:
+            wake.wait(self.refresh_interval)
+            wake.clear()
+            if self._generation != generation or self._pid != os.getpid():
+                return
+            started = time.monotonic()
+            self.refresh()
+            # Unknown key ids come from clients, so throttle early refreshes
+            time.sleep(max(0.0, self.min_refresh_interval - (time.monotonic() - started)))
+
+
+jwks = SupabaseJWKS()
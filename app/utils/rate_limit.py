@@ -0,0 +1,239 @@
+"""Hybrid rate limit storage: local counters reconciled with Redis in batches.
+
+Registering ``hybrid+redis://`` (or ``hybrid+rediss://``) with the ``limits``
+library lets Flask-Limiter check limits against in-process counters, so a
+request costs a dict lookup instead of a Redis round trip per limit. A
+background thread pushes the hits counted since the last sync to Redis in one
+pipeline every ``sync_interval`` seconds and pulls back the global counts of
+those keys; keys with no new hits cost nothing. Windows not hit for
+``idle_timeout`` seconds are dropped and rebuilt from Redis on their next hit.
+
+Limits are approximate: between syncs each worker only sees its own hits on
+top of the last global count, so a limit can be overshot by at most the hits
+all workers admit during one sync interval (a sync is also triggered early
+once ``sync_batch`` hits are pending). When Redis is slow or down, syncing
+backs off and limits are enforced per worker until it recovers.
+
+Only the fixed-window strategy (Flask-Limiter's default) is supported.
+"""
+import math
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from limits.storage import Storage
+
+# Query string options consumed by the hybrid storage rather than redis-py
+_OPTIONS = {
+    "sync_interval": float,
+    "sync_batch": int,
+    "sync_timeout": float,
+    "backoff": float,
+    "idle_timeout": float,
+}
+
+
+class _Window:
+    """Counter for one key's current fixed window."""
+    __slots__ = ("expires_at", "expiry", "synced", "pending", "hit_at")
+
+    def __init__(self, expiry: int, now: float):
+        self.expiry = expiry
+        self.expires_at = now + expiry
+        self.hit_at = now
+        self.synced = 0  # global count as of the last sync, including our flushed hits
+        self.pending = 0  # local hits not yet pushed to Redis
+
+
+class HybridRedisStorage(Storage):
+    """Rate limit counters kept per process and synced to Redis periodically."""
+
+    STORAGE_SCHEME = ["hybrid+redis", "hybrid+rediss"]
+    DEPENDENCIES = ["redis"]
+
+    def __init__(
+        self,
+        uri: str,
+        wrap_exceptions: bool = False,
+        sync_interval: float = 1.0,
+        sync_batch: int = 100,
+        sync_timeout: float = 0.05,
+        backoff: float = 5.0,
+        idle_timeout: float = 60.0,
+        **options,
+    ):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+        parts = urlsplit(uri)
+        query = dict(parse_qsl(parts.query))
+        settings = {
+            "sync_interval": sync_interval,
+            "sync_batch": sync_batch,
+            "sync_timeout": sync_timeout,
+            "backoff": backoff,
+            "idle_timeout": idle_timeout,
+        }
+        for name, cast in _OPTIONS.items():
+            if name in query:
+                settings[name] = cast(query.pop(name))
+        self.sync_interval = settings["sync_interval"]
+        self.sync_batch = settings["sync_batch"]
+        self.backoff = settings["backoff"]
+        self.idle_timeout = settings["idle_timeout"]
+
+        redis_uri = urlunsplit(
+            (parts.scheme.split("+", 1)[1], parts.netloc, parts.path, urlencode(query), parts.fragment)
+        )
+        redis = self.dependencies["redis"].module
+        self.redis = redis.from_url(
+            redis_uri,
+            socket_timeout=settings["sync_timeout"],
+            socket_connect_timeout=settings["sync_timeout"],
+            **options,
+        )
+        self.stats = {"syncs": 0, "sync_errors": 0, "keys_synced": 0}
+        self._pid: int | None = None
+        self._windows: dict[str, _Window] = {}
+        self._dirty: set[str] = set()  # keys hit since the last sync
+        self._unsynced = 0
+        self._next_eviction = 0.0
+        self._degraded_until = 0.0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    @property
+    def base_exceptions(self):
+        return self.dependencies["redis"].module.RedisError
+
+    def _ensure_started(self):
+        """Start the sync thread for this process, dropping state inherited across a fork."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._windows = {}
+            self._dirty = set()
+            self._unsynced = 0
+            self._wakeup = threading.Event()
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, args=(self._pid,), name="ratelimit-sync", daemon=True).start()
+
+    def _window(self, key: str, now: float) -> _Window | None:
+        """Current window for key, or None once it has expired."""
+        window = self._windows.get(key)
+        if window is not None and window.expires_at <= now:
+            del self._windows[key]
+            return None
+        return window
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """Count a hit locally and return the estimated global count."""
+        self._ensure_started()
+        now = time.time()
+        with self._lock:
+            window = self._window(key, now)
+            if window is None:
+                window = self._windows[key] = _Window(expiry, now)
+            window.pending += amount
+            window.hit_at = now
+            self._dirty.add(key)
+            self._unsynced += amount
+            count = window.synced + window.pending
+            if self._unsynced >= self.sync_batch:
+                self._wakeup.set()
+        return count
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            window = self._window(key, time.time())
+            return window.synced + window.pending if window else 0
+
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            window = self._window(key, time.time())
+            return window.expires_at if window else time.time()
+
+    def check(self) -> bool:
+        """Always usable: limits are enforced locally while Redis is unavailable."""
+        return True
+
+    def reset(self) -> int | None:
+        with self._lock:
+            cleared = len(self._windows)
+            self._windows.clear()
+            self._dirty.clear()
+            self._unsynced = 0
+        return cleared
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._windows.pop(key, None)
+            self._dirty.discard(key)
+        try:
+            self.redis.delete(key)
+        except self.base_exceptions:
+            pass
+
+    def _run(self, pid: int):
+        """Sync until the process that started the thread is gone (e.g. forked away)."""
+        while self._pid == pid:
+            self._wakeup.wait(self.sync_interval)
+            self._wakeup.clear()
+            if time.time() >= self._degraded_until:
+                self.sync()
+
+    def sync(self) -> bool:
+        """Push pending hits and pull global counts in one pipeline."""
+        now = time.time()
+        with self._lock:
+            if now >= self._next_eviction:
+                self._evict(now)
+            batch = []
+            for key in self._dirty:
+                window = self._window(key, now)
+                if window is not None and window.pending:
+                    batch.append((key, window, window.pending))
+                    window.pending = 0
+            self._dirty = set()
+            self._unsynced = 0
+        if not batch:
+            return True
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, window, delta in batch:
+                # Start the Redis window if this is its first hit anywhere
+                pipe.set(key, 0, ex=max(1, math.ceil(window.expiry)), nx=True)
+                pipe.incrby(key, delta)
+                pipe.pttl(key)
+            results = pipe.execute()
+        except self.base_exceptions:
+            # Keep the hits for the next attempt and limit locally meanwhile
+            with self._lock:
+                for key, window, delta in batch:
+                    window.pending += delta
+                    self._unsynced += delta
+                    self._dirty.add(key)
+            self.stats["sync_errors"] += 1
+            self._degraded_until = time.time() + self.backoff
+            return False
+
+        now = time.time()
+        with self._lock:
+            for index, (key, window, _) in enumerate(batch):
+                count, ttl_ms = results[index * 3 + 1], results[index * 3 + 2]
+                window.synced = int(count)
+                if ttl_ms and ttl_ms > 0:
+                    # Follow the shared window so every worker resets together
+                    window.expires_at = now + ttl_ms / 1000
+        self.stats["syncs"] += 1
+        self.stats["keys_synced"] += len(batch)
+        return True
+
+    def _evict(self, now: float):
+        """Drop expired windows and synced ones idle for ``idle_timeout`` (lock held)."""
+        idle_since = now - self.idle_timeout
+        for key, window in list(self._windows.items()):
+            if window.expires_at <= now or (not window.pending and window.hit_at <= idle_since):
+                del self._windows[key]
+        self._next_eviction = now + min(self.idle_timeout, 60)
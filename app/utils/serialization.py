@@ -0,0 +1,91 @@
+"""Cache value serialization."""
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Serialized values start with a NUL byte followed by a codec and a
+# compression id. Plain JSON text never starts with NUL, so values
+# written before this format existed still decode.
+MAGIC = b"\x00"
+
+CODECS = {"json": b"j", "orjson": b"o", "msgpack": b"m"}
+COMPRESSIONS = {"none": b"-", "zlib": b"z", "lz4": b"l"}
+
+
+def available_codec(codec: str) -> bool:
+    """Check whether the codec's library is installed."""
+    if codec == "orjson":
+        return orjson is not None
+    if codec == "msgpack":
+        return msgpack is not None
+    return codec == "json"
+
+
+def available_compression(compression: str) -> bool:
+    """Check whether the compression library is installed."""
+    if compression == "lz4":
+        return lz4_frame is not None
+    return compression in ("none", "zlib")
+
+
+class Serializer:
+    """Encode cache values to bytes with optional compression above a size threshold."""
+
+    def __init__(self, codec: str = "json", compression: str = "none", min_compress_size: int = 1024):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown cache serializer: {codec}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+        self.codec = codec
+        self.compression = compression
+        self.min_compress_size = min_compress_size
+
+    def dumps(self, value) -> bytes:
+        """Serialize value to bytes."""
+        if self.codec == "orjson":
+            payload = orjson.dumps(value)
+        elif self.codec == "msgpack":
+            payload = msgpack.packb(value, use_bin_type=True)
+        else:
+            payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+        compression = self.compression
+        if compression == "none" or len(payload) < self.min_compress_size:
+            compression = "none"
+        elif compression == "zlib":
+            payload = zlib.compress(payload, 6)
+        else:
+            payload = lz4_frame.compress(payload)
+
+        return MAGIC + CODECS[self.codec] + COMPRESSIONS[compression] + payload
+
+    def loads(self, data: bytes | str):
+        """Deserialize bytes written by dumps (or legacy JSON text)."""
+        if isinstance(data, str) or not data.startswith(MAGIC):
+            return json.loads(data)
+
+        codec, compression, payload = data[1:2], data[2:3], data[3:]
+        if compression == COMPRESSIONS["zlib"]:
+            payload = zlib.decompress(payload)
+        elif compression == COMPRESSIONS["lz4"]:
+            payload = lz4_frame.decompress(payload)
+
+        if codec == CODECS["msgpack"]:
+            return msgpack.unpackb(payload, raw=False)
+        if orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(payload)
@@ -0,0 +1,119 @@
+"""Per-queue Celery task counters shared through Redis.
+
+Workers add each finished task to a hash per queue (one pipelined round trip
+per task). ``sample_queues`` runs on the beat schedule: it reads the broker's
+queue lengths and those counters, and stores a sample with the throughput and
+average wait and run time since the previous one. ``/health/queues`` serves
+the latest samples with live queue lengths.
+
+Queues are the Redis broker's lists, so their length is the backlog of
+messages not yet reserved by a worker.
+"""
+import json
+import logging
+import time
+from app.extensions import redis_client
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY_PREFIX = "taskstats:queue:"
+SAMPLES_KEY = "taskstats:samples"
+
+# Task states counted per queue
+STATE_COUNTERS = {"SUCCESS": "completed", "FAILURE": "failed", "RETRY": "retried"}
+
+
+def record_task(queue: str, state: str, runtime: float, wait: float | None = None):
+    """Add one finished task to its queue's counters."""
+    try:
+        pipe = redis_client.get_celery().pipeline(transaction=False)
+        key = f"{STATS_KEY_PREFIX}{queue}"
+        pipe.hincrby(key, STATE_COUNTERS.get(state, "other"), 1)
+        pipe.hincrbyfloat(key, "runtime_seconds", runtime)
+        if wait is not None:
+            pipe.hincrby(key, "waited", 1)
+            pipe.hincrbyfloat(key, "wait_seconds", wait)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Task stats error: {e}")
+
+
+def _counters(raw: dict) -> dict:
+    return {
+        "completed": int(raw.get("completed", 0)),
+        "failed": int(raw.get("failed", 0)),
+        "retried": int(raw.get("retried", 0)),
+        "other": int(raw.get("other", 0)),
+        "waited": int(raw.get("waited", 0)),
+        "runtime_seconds": float(raw.get("runtime_seconds", 0)),
+        "wait_seconds": float(raw.get("wait_seconds", 0)),
+    }
+
+
+def sample_queues(queues) -> dict:
+    """Sample queue depth and counters, storing and returning one sample per queue."""
+    queues = list(queues)
+    client = redis_client.get_celery()
+    pipe = client.pipeline(transaction=False)
+    for queue in queues:
+        pipe.llen(queue)
+        pipe.hgetall(f"{STATS_KEY_PREFIX}{queue}")
+    pipe.hmget(SAMPLES_KEY, queues)
+    results = pipe.execute()
+    previous = results[-1]
+
+    now = time.time()
+    samples = {}
+    for index, queue in enumerate(queues):
+        depth, counters = results[index * 2], _counters(results[index * 2 + 1])
+        sample = {"depth": depth, "sampled_at": now, **counters}
+        last = json.loads(previous[index]) if previous[index] else None
+        sample.update(_rates(counters, last, now))
+        samples[queue] = sample
+
+    client.hset(SAMPLES_KEY, mapping={queue: json.dumps(sample) for queue, sample in samples.items()})
+    return samples
+
+
+def _rates(counters: dict, last: dict | None, now: float) -> dict:
+    """Throughput (tasks/s) and average wait and run time (ms) since the last sample."""
+    rates = {"throughput": None, "avg_wait_ms": None, "avg_runtime_ms": None}
+    if not last or now <= last["sampled_at"]:
+        return rates
+    finished = sum(counters[name] - last[name] for name in ("completed", "failed", "retried", "other"))
+    if finished < 0:
+        return rates  # Counters were reset
+    rates["throughput"] = round(finished / (now - last["sampled_at"]), 3)
+    if finished:
+        runtime = counters["runtime_seconds"] - last["runtime_seconds"]
+        rates["avg_runtime_ms"] = round(runtime / finished * 1000, 1)
+    waited = counters["waited"] - last["waited"]
+    if waited > 0:
+        wait = counters["wait_seconds"] - last["wait_seconds"]
+        rates["avg_wait_ms"] = round(wait / waited * 1000, 1)
+    return rates
+
+
+def queue_status(queues) -> dict:
+    """Live depth and the latest sample for each queue."""
+    queues = list(queues)
+    pipe = redis_client.get_celery().pipeline(transaction=False)
+    for queue in queues:
+        pipe.llen(queue)
+    pipe.hmget(SAMPLES_KEY, queues)
+    results = pipe.execute()
+
+    status = {}
+    for index, queue in enumerate(queues):
+        sample = json.loads(results[-1][index]) if results[-1][index] else {}
+        status[queue] = {
+            "depth": results[index],
+            "throughput": sample.get("throughput"),
+            "avg_wait_ms": sample.get("avg_wait_ms"),
+            "avg_runtime_ms": sample.get("avg_runtime_ms"),
+            "completed": sample.get("completed"),
+            "failed": sample.get("failed"),
+            "retried": sample.get("retried"),
+            "sampled_at": sample.get("sampled_at"),
+        }
+    return status
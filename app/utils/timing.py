@@ -0,0 +1,86 @@
+"""Per-request phase timers, reported in the Server-Timing header and request log."""
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context
+
+# Phase name -> Server-Timing description
+PHASES = {
+    "db": "Supabase PostgREST",
+    "storage": "Supabase Storage",
+    "cache": "Redis cache",
+    "markdown": "Markdown render",
+    "template": "Template render",
+    "auth": "JWT verification",
+    "fanout": "Concurrent upstream calls",
+}
+
+
+def record(phase: str, seconds: float):
+    """Add time spent in phase to the current request."""
+    if not has_request_context():
+        return
+    timings = g.setdefault("timings", {})
+    total, count = timings.get(phase, (0.0, 0))
+    timings[phase] = (total + seconds, count + 1)
+
+
+@contextmanager
+def timed(phase: str):
+    """Time a block as part of phase; a no-op outside requests."""
+    if not has_request_context():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start)
+
+
+def start_request():
+    """Mark the start of the current request."""
+    g.request_start = time.perf_counter()
+    g.timings = {}
+
+
+def request_timings() -> dict:
+    """Phase durations of the current request in milliseconds, plus the total."""
+    timings = {
+        phase: round(total * 1000, 2)
+        for phase, (total, _) in g.get("timings", {}).items()
+    }
+    start = g.get("request_start")
+    if start is not None:
+        timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+    return timings
+
+
+def server_timing_header() -> str:
+    """Format the current request's timings as a Server-Timing header value."""
+    metrics = []
+    for phase, (total, count) in g.get("timings", {}).items():
+        desc = PHASES.get(phase, phase)
+        if count > 1:
+            desc = f"{desc} x{count}"
+        metrics.append(f'{phase};desc="{desc}";dur={total * 1000:.2f}')
+    start = g.get("request_start")
+    if start is not None:
+        metrics.append(f"total;dur={(time.perf_counter() - start) * 1000:.2f}")
+    return ", ".join(metrics)
+
+
+def setup_template_timing(app):
+    """Time template rendering through Flask's template signals."""
+    from flask import before_render_template, template_rendered
+
+    def before_render(sender, template, context, **extra):
+        if has_request_context():
+            g.setdefault("template_starts", []).append(time.perf_counter())
+
+    def rendered(sender, template, context, **extra):
+        starts = g.get("template_starts") if has_request_context() else None
+        if starts:
+            record("template", time.perf_counter() - starts.pop())
+
+    before_render_template.connect(before_render, app, weak=False)
+    template_rendered.connect(rendered, app, weak=False)
@@ -11,11 +11,16 @@ load_dotenv()
 env = os.environ.get("FLASK_ENV", "development")
 config_class = config.get(env, config["default"])
 
-app = create_app(config_class)
+# Worker role: Supabase, Redis and Celery only, no HTTP stack
+app = create_app(config_class, role="worker")
 celery = app.celery
 
+# Task duration metrics, served from the worker when CELERY_METRICS_PORT is set
+from app.metrics import setup_celery_metrics  # noqa: E402
+setup_celery_metrics(celery, app.config.get("CELERY_METRICS_PORT"))
+
 # Import tasks to register them
-from app.tasks import example_tasks
+from app.tasks import example_tasks, cache_tasks, monitoring_tasks  # noqa: E402,F401
 
 if __name__ == "__main__":
     celery.start()
@@ -0,0 +1,71 @@
+"""Gunicorn configuration.
+
+With ``preload_app`` the master imports and builds the app once and workers
+share those pages copy-on-write. Anything holding sockets or threads is
+re-created in ``post_fork`` so no connection is shared between workers, and
+``gc.freeze()`` keeps the collector from touching (and so copying) the
+inherited objects. Subsystems the app otherwise imports on first use
+(supabase, Celery and the tasks) are imported in ``when_ready`` so they are
+shared as well.
+"""
+import gc
+import os
+import shutil
+import sys
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True").lower() == "true"
+
+# Recycle workers after a number of requests; jitter keeps them from restarting together
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+if preload_app and worker_class == "gevent":
+    # The app is imported in the master, so patch before it creates any locks or sockets
+    from gevent import monkey
+    monkey.patch_all()
+
+
+def on_starting(server):
+    """Start with an empty Prometheus multiprocess directory."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def when_ready(server):
+    """Import the lazily loaded subsystems in the master before the workers fork."""
+    if "app.extensions" in sys.modules:
+        from app.extensions import preload_lazy_modules
+        preload_lazy_modules()
+
+
+def pre_fork(server, worker):
+    """Move everything the master has built into the permanent GC generation."""
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Give the worker its own Redis pools, Supabase HTTP clients, span exporter and JWKS refresher."""
+    if "app.extensions" not in sys.modules:
+        return  # Not preloaded: the worker builds everything itself
+    from app.extensions import redis_client, supabase_client
+    from app.monitoring import reset_opentelemetry
+    from app.utils.jwks import jwks
+
+    supabase_client.reset()
+    redis_client.reset()
+    reset_opentelemetry()
+    jwks.start()  # Blocking warm-up, so requests never fetch keys
+
+
+def child_exit(server, worker):
+    """Drop an exited worker's live gauges from the aggregated metrics."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -11,7 +11,6 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from app import create_app
-from app.extensions import db
 from app.config import Config
 
 # this is the Alembic Config object
@@ -21,8 +20,9 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# Get Flask app and database URL
-app = create_app()
+# Get Flask app and database URL (migrations role: config and SQLAlchemy only)
+app = create_app(role="migrations")
+from app.extensions import db
 target_metadata = db.metadata
 
 # Set database URL from Flask config
@@ -15,10 +15,22 @@ CREATE TABLE IF NOT EXISTS blog_posts (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Pre-rendered body, written by the process_blog_post task at publish time
+-- (ALTER TABLE so existing databases can run this file again)
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS html_content TEXT;
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS toc TEXT;
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS word_count INTEGER;
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS reading_time INTEGER;  -- minutes
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);  -- sha256 of the Markdown source
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS rendered_at TIMESTAMP WITH TIME ZONE;
+
 -- Create index for faster lookups
 CREATE INDEX IF NOT EXISTS idx_blog_posts_slug ON blog_posts(slug);
 CREATE INDEX IF NOT EXISTS idx_blog_posts_published ON blog_posts(published);
 CREATE INDEX IF NOT EXISTS idx_blog_posts_created_at ON blog_posts(created_at DESC);
+-- Keyset pagination over published posts: ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_blog_posts_published_keyset
+    ON blog_posts(created_at DESC, id DESC) WHERE published = TRUE;
 
 -- Enable Row Level Security (RLS)
 ALTER TABLE blog_posts ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,5 @@
+"""Offline request benchmarks.
+
+Run ``python -m tests.benchmarks`` for a report, or ``pytest -m benchmark``
+to fail on regressions against ``baseline.json``.
+"""
@@ -0,0 +1,68 @@
+"""Print a benchmark report: ``python -m tests.benchmarks [--update-baseline] [scenario ...]``."""
+import sys
+from tests.benchmarks.harness import (
+    HEADER,
+    STARTUP_BUDGET_MS,
+    compare,
+    compare_fanout,
+    create_benchmark_app,
+    env_float,
+    load_baseline,
+    measure_startup,
+    regressions,
+    run_scenario,
+    save_baseline,
+    scenarios,
+)
+
+
+def main(argv) -> int:
+    update = "--update-baseline" in argv
+    names = [arg for arg in argv if not arg.startswith("--")]
+    app, slugs = create_benchmark_app()
+    available = scenarios(slugs)
+    baseline = load_baseline()
+
+    results = []
+    print(HEADER)
+    for name in [name for name in names if name in available] or ([] if names else available):
+        path_for, headers = available[name]
+        result = run_scenario(app, name, path_for, headers)
+        results.append(result)
+        print(result.row())
+
+    # Cold post pages against a slower upstream: serial vs concurrent fan-out
+    if not names or "fanout" in names:
+        fanout_app, fanout_slugs = create_benchmark_app(
+            latency=env_float("BENCH_FANOUT_LATENCY_MS", 20) / 1000
+        )
+        for result in compare_fanout(fanout_app, fanout_slugs):
+            results.append(result)
+            print(result.row())
+
+    print()
+    failed = False
+    for role, budget in STARTUP_BUDGET_MS.items():
+        startup = measure_startup(role)
+        over = startup["total_ms"] > budget
+        failed = failed or over
+        print(
+            f"startup {role:<10} import {startup['import_ms']:>5.0f} ms  create_app {startup['create_ms']:>5.0f} ms"
+            f"  (budget {budget} ms){'  OVER BUDGET' if over else ''}"
+        )
+
+    print()
+    for result in results:
+        print(compare(result, baseline.get(result.name)))
+        for problem in regressions(result, baseline.get(result.name)):
+            print(f"  REGRESSION {problem}")
+            failed = True
+    if update:
+        save_baseline(results)
+        print(f"\nBaseline updated for {len(results)} scenario(s)")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,570 @@
+"""In-memory stand-ins for Supabase (PostgREST + Storage) and Redis."""
+import fnmatch
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+
+class FakeResponse:
+    """PostgREST API response."""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _split_top_level(expression: str):
+    """Split a PostgREST logic expression on commas outside parentheses and quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in expression:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+_OPERATORS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+}
+
+
+def _compile_filter(expression: str):
+    """Compile ``col.op.value`` / ``and(...)`` / ``or(...)`` terms into a predicate."""
+    group = re.fullmatch(r"(and|or)\((.*)\)", expression)
+    if group:
+        predicates = [_compile_filter(part) for part in _split_top_level(group.group(2))]
+        combine = all if group.group(1) == "and" else any
+        return lambda row: combine(predicate(row) for predicate in predicates)
+    column, operator, value = expression.split(".", 2)
+    value = value[1:-1] if value.startswith('"') and value.endswith('"') else value
+    compare = _OPERATORS[operator]
+    return lambda row: compare(_as_text(row.get(column)), value)
+
+
+def _as_text(value):
+    """Compare filter values as PostgREST sends them: text."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class FakeQuery:
+    """Subset of the postgrest-py request builder used by the app."""
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.columns = "*"
+        self.filters = []
+        self.ordering = []
+        self.limit_value = None
+        self.offset_value = 0
+        self.mode = "many"
+        self.payload = None
+        self.operation = "select"
+        self.on_conflict = None
+        self.count = None
+
+    def select(self, columns="*", count=None):
+        self.columns = columns
+        self.count = count
+        return self
+
+    def insert(self, payload):
+        self.operation, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict="id", **kwargs):
+        self.operation, self.payload, self.on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def update(self, payload):
+        self.operation, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def or_(self, expression):
+        self.filters.append(_compile_filter(f"or({expression})"))
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size):
+        self.limit_value = size
+        return self
+
+    def offset(self, size):
+        self.offset_value = size
+        return self
+
+    def range(self, start, end):
+        self.offset_value, self.limit_value = start, end - start + 1
+        return self
+
+    def single(self):
+        self.mode = "single"
+        return self
+
+    def maybe_single(self):
+        self.mode = "maybe_single"
+        return self
+
+    def execute(self):
+        self.db.round_trip()
+        with self.db.lock:
+            rows = self.db.tables.setdefault(self.table, [])
+            if self.operation != "select":
+                return FakeResponse(self._write(rows))
+            matched = [row for row in rows if all(f(row) for f in self.filters)]
+            for column, desc in reversed(self.ordering):
+                matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+            total = len(matched)
+            end = None if self.limit_value is None else self.offset_value + self.limit_value
+            matched = [self._project(row) for row in matched[self.offset_value:end]]
+        if self.mode == "maybe_single":
+            return FakeResponse(matched[0]) if matched else None
+        if self.mode == "single":
+            if len(matched) != 1:
+                raise Exception("JSON object requested, multiple (or no) rows returned")
+            return FakeResponse(matched[0])
+        return FakeResponse(matched, total if self.count else None)
+
+    def _write(self, rows):
+        """Apply an insert, upsert, update or delete."""
+        if self.operation == "update":
+            changed = [row for row in rows if all(f(row) for f in self.filters)]
+            for row in changed:
+                row.update(self.payload)
+                if self.db.on_update:
+                    self.db.on_update(row)
+            return [dict(row) for row in changed]
+        if self.operation == "delete":
+            removed = [row for row in rows if all(f(row) for f in self.filters)]
+            rows[:] = [row for row in rows if row not in removed]
+            return removed
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        written = []
+        for item in payload:
+            existing = None
+            if self.operation == "upsert":
+                keys = self.on_conflict.split(",")
+                existing = next(
+                    (row for row in rows if all(row.get(k) == item.get(k) for k in keys)), None
+                )
+            if existing is not None:
+                existing.update(item)
+                if self.db.on_update:
+                    self.db.on_update(existing)
+                written.append(dict(existing))
+            else:
+                rows.append(dict(item))
+                written.append(dict(item))
+        return written
+
+    def _project(self, row):
+        """Apply the select column list."""
+        if self.columns.strip() == "*":
+            return dict(row)
+        return {column: row.get(column) for column in (c.strip() for c in self.columns.split(","))}
+
+
+class FakeBucket:
+    """Storage bucket."""
+
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def download(self, path):
+        self.db.round_trip()
+        objects = self.db.objects.get(self.name, {})
+        if path not in objects:
+            raise Exception(f"Object not found: {path}")
+        return objects[path]
+
+    def upload(self, path, file, file_options=None):
+        self.db.round_trip()
+        data = file.encode("utf-8") if isinstance(file, str) else file
+        self.db.objects.setdefault(self.name, {})[path] = data
+        return {"Key": f"{self.name}/{path}"}
+
+
+class FakeStorage:
+    """Storage API."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def from_(self, bucket):
+        return FakeBucket(self.db, bucket)
+
+
+class FakeSupabase:
+    """In-memory Supabase client: PostgREST tables and Storage objects.
+
+    ``latency`` seconds are slept on every call to stand in for the network
+    round trip; sleeping releases the GIL like real socket I/O does.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables = {}
+        self.objects = {}
+        self.lock = threading.RLock()
+        self.calls = 0
+        self.storage = FakeStorage(self)
+        # Called with each row an update or upsert changes, like a BEFORE UPDATE trigger
+        self.on_update = None
+
+    def round_trip(self):
+        with self.lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def from_(self, name):
+        return FakeQuery(self, name)
+
+
+class FakePipeline:
+    """Redis pipeline collecting commands until execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        return [method(*args, **kwargs) for method, args, kwargs in commands]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.commands = []
+
+
+class FakeRedis:
+    """Thread-safe in-memory Redis; replies are bytes unless ``decode_responses``."""
+
+    def __init__(self, decode_responses=False):
+        self.decode_responses = decode_responses
+        self.data = {}
+        self.expires = {}
+        self.lock = threading.RLock()
+
+    def _encode(self, value):
+        if self.decode_responses:
+            return value.decode() if isinstance(value, bytes) else str(value)
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode() if not isinstance(value, str) else value.encode()
+
+    def _alive(self, key):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _expire_in(self, key, seconds):
+        if seconds is None:
+            self.expires.pop(key, None)
+        else:
+            self.expires[key] = time.monotonic() + seconds
+
+    def get(self, key):
+        with self.lock:
+            return self.data[key] if self._alive(key) else None
+
+    def mget(self, keys, *more):
+        keys = list(keys) + list(more) if not isinstance(keys, str) else [keys, *more]
+        with self.lock:
+            return [self.data[key] if self._alive(key) else None for key in keys]
+
+    def set(self, key, value, ex=None, px=None, nx=False, xx=False):
+        with self.lock:
+            exists = self._alive(key)
+            if (nx and exists) or (xx and not exists):
+                return None
+            self.data[key] = self._encode(value)
+            ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+            self._expire_in(key, ttl)
+            return True
+
+    def setex(self, key, seconds, value):
+        return self.set(key, value, ex=seconds)
+
+    def delete(self, *keys):
+        with self.lock:
+            removed = 0
+            for key in keys:
+                if self._alive(key):
+                    removed += 1
+                self.data.pop(key, None)
+                self.expires.pop(key, None)
+            return removed
+
+    def exists(self, *keys):
+        with self.lock:
+            return sum(self._alive(key) for key in keys)
+
+    def expire(self, key, seconds):
+        with self.lock:
+            if not self._alive(key):
+                return False
+            self._expire_in(key, seconds)
+            return True
+
+    def ttl(self, key):
+        with self.lock:
+            if not self._alive(key):
+                return -2
+            expires = self.expires.get(key)
+            return -1 if expires is None else int(expires - time.monotonic())
+
+    def pttl(self, key):
+        with self.lock:
+            if not self._alive(key):
+                return -2
+            expires = self.expires.get(key)
+            return -1 if expires is None else int((expires - time.monotonic()) * 1000)
+
+    def incr(self, key, amount=1):
+        return self.incrby(key, amount)
+
+    def incrby(self, key, amount=1):
+        with self.lock:
+            value = int(self.data[key]) if self._alive(key) else 0
+            value += amount
+            self.data[key] = self._encode(value)
+            return value
+
+    def keys(self, pattern="*"):
+        with self.lock:
+            pattern = pattern.decode() if isinstance(pattern, bytes) else pattern
+            return [key.encode() for key in list(self.data) if self._alive(key) and fnmatch.fnmatch(key, pattern)]
+
+    def flushdb(self):
+        with self.lock:
+            self.data.clear()
+            self.expires.clear()
+
+    # Sorted sets are stored as {member: score}
+    def zincrby(self, key, amount, member):
+        with self.lock:
+            zset = self.data.setdefault(key, {}) if self._alive(key) or key not in self.data else self.data[key]
+            member = self._encode(member)
+            zset[member] = zset.get(member, 0) + amount
+            return zset[member]
+
+    def zrevrange(self, key, start, end, withscores=False):
+        with self.lock:
+            zset = self.data.get(key, {}) if self._alive(key) else {}
+            ordered = sorted(zset.items(), key=lambda item: (-item[1], item[0]))
+            end = len(ordered) if end == -1 else end + 1
+            items = ordered[start:end]
+            return items if withscores else [member for member, _ in items]
+
+    def zunionstore(self, dest, keys, aggregate=None):
+        with self.lock:
+            weights = keys if isinstance(keys, dict) else {key: 1 for key in keys}
+            result = {}
+            for key, weight in weights.items():
+                for member, score in (self.data.get(key, {}) if self._alive(key) else {}).items():
+                    result[member] = result.get(member, 0) + score * weight
+            self.data[dest] = result
+            return len(result)
+
+    def zremrangebyrank(self, key, start, end):
+        with self.lock:
+            zset = self.data.get(key, {}) if self._alive(key) else {}
+            ordered = sorted(zset.items(), key=lambda item: (item[1], item[0]))
+            end = len(ordered) if end == -1 else (len(ordered) + end + 1 if end < 0 else end + 1)
+            start = len(ordered) + start if start < 0 else start
+            removed = ordered[start:end]
+            for member, _ in removed:
+                del zset[member]
+            return len(removed)
+
+    def zcard(self, key):
+        with self.lock:
+            return len(self.data.get(key, {})) if self._alive(key) else 0
+
+    # Hashes are stored as dicts
+    def _hash(self, key):
+        if not self._alive(key):
+            self.data[key] = {}
+        return self.data[key]
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        with self.lock:
+            items = dict(mapping or {})
+            if field is not None:
+                items[field] = value
+            fields = self._hash(key)
+            added = sum(self._encode(name) not in fields for name in items)
+            fields.update((self._encode(name), self._encode(item)) for name, item in items.items())
+            return added
+
+    def hgetall(self, key):
+        with self.lock:
+            return dict(self.data[key]) if self._alive(key) else {}
+
+    def hmget(self, key, fields, *more):
+        fields = [fields, *more] if isinstance(fields, (str, bytes)) else list(fields) + list(more)
+        with self.lock:
+            values = self.data[key] if self._alive(key) else {}
+            return [values.get(self._encode(name)) for name in fields]
+
+    def hincrby(self, key, field, amount=1):
+        with self.lock:
+            fields = self._hash(key)
+            value = int(fields.get(self._encode(field), 0)) + amount
+            fields[self._encode(field)] = self._encode(value)
+            return value
+
+    def hincrbyfloat(self, key, field, amount=1.0):
+        with self.lock:
+            fields = self._hash(key)
+            value = float(fields.get(self._encode(field), 0)) + amount
+            fields[self._encode(field)] = self._encode(repr(value))
+            return value
+
+    # Lists are stored as Python lists
+    def lpush(self, key, *values):
+        with self.lock:
+            items = self.data.setdefault(key, [])
+            for value in values:
+                items.insert(0, self._encode(value))
+            return len(items)
+
+    def rpush(self, key, *values):
+        with self.lock:
+            items = self.data.setdefault(key, [])
+            items.extend(self._encode(value) for value in values)
+            return len(items)
+
+    def llen(self, key):
+        with self.lock:
+            return len(self.data.get(key, [])) if self._alive(key) else 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def eval(self, script, numkeys, *keys_and_args):
+        """Run one of the app's Lua scripts (only those are known)."""
+        from app.utils.cache import _RELEASE_LOCK_SCRIPT
+
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        if script != _RELEASE_LOCK_SCRIPT:
+            raise NotImplementedError("FakeRedis only runs the app's own scripts")
+        with self.lock:
+            if self.get(keys[0]) == self._encode(args[0]):
+                return self.delete(keys[0])
+            return 0
+
+    def ping(self):
+        return True
+
+
+MARKDOWN_WORDS = (
+    "cache latency supabase flask request worker render markdown query index pool "
+    "connection redis template storage response header gevent celery python"
+).split()
+
+
+def make_markdown(rng: random.Random, sections: int) -> str:
+    """Generate a Markdown article with headings, lists, code and tables."""
+    parts = []
+    for i in range(sections):
+        words = " ".join(rng.choice(MARKDOWN_WORDS) for _ in range(rng.randint(60, 140)))
+        parts.append(f"## Section {i + 1}\n\n{words.capitalize()}.\n")
+        parts.append("\n".join(f"- {rng.choice(MARKDOWN_WORDS)} *{rng.choice(MARKDOWN_WORDS)}*" for _ in range(4)))
+        if i % 2 == 0:
+            parts.append("```python\ndef handler(request):\n    return cache.get(request.path)\n```\n")
+        if i % 3 == 0:
+            parts.append("| metric | value |\n|---|---|\n| p50 | 12ms |\n| p99 | 80ms |\n")
+    return "\n\n".join(parts)
+
+
+def seed_blog(supabase: FakeSupabase, posts: int = 200, seed: int = 42, bucket: str = "blog-content"):
+    """Seed realistic blog_posts rows and Markdown bodies; returns published slugs newest first."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(posts):
+        slug = f"post-{i:04d}"
+        created = start + timedelta(hours=13 * i, minutes=rng.randint(0, 59))
+        path = f"posts/{slug}.md"
+        supabase.objects.setdefault(bucket, {})[path] = make_markdown(rng, rng.randint(4, 12)).encode()
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "title": f"Post {i}: {' '.join(rng.choice(MARKDOWN_WORDS) for _ in range(4)).title()}",
+            "slug": slug,
+            "excerpt": " ".join(rng.choice(MARKDOWN_WORDS) for _ in range(25)),
+            "author": rng.choice(["Ada", "Grace", "Linus", "Guido"]),
+            "created_at": created.isoformat(),
+            "updated_at": (created + timedelta(days=rng.randint(0, 30))).isoformat(),
+            "tags": rng.sample(MARKDOWN_WORDS, 3),
+            "published": i % 10 != 0,
+            "content_storage_path": path,
+            "content": None,
+        })
+    supabase.tables["blog_posts"] = rows
+    published = [row for row in rows if row["published"]]
+    published.sort(key=lambda row: row["created_at"], reverse=True)
+    return [row["slug"] for row in published]
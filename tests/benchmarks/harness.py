@@ -0,0 +1,313 @@
+"""Offline benchmark harness: boots the app against in-memory Supabase and Redis."""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from app import create_app
+from app.config import TestingConfig
+from tests.benchmarks.fakes import FakeRedis, FakeSupabase, seed_blog
+from tests.helpers import SECRET, make_token
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Cold start budgets in milliseconds (import app + create_app), per role
+STARTUP_BUDGET_MS = {"web": 600, "worker": 400, "migrations": 500}
+
+# Modules a role must not import at startup
+STARTUP_FORBIDDEN = {
+    "web": ("celery", "sqlalchemy", "supabase"),
+    "worker": ("flask_smorest", "flask_limiter", "sqlalchemy", "supabase"),
+    "migrations": ("celery", "supabase", "redis", "flask_smorest", "flask_limiter"),
+}
+
+_STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app("production", role=sys.argv[1])
+created = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_ms": (created - imported) * 1000,
+    "modules": sorted({name.split(".")[0] for name in sys.modules}),
+}))
+"""
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+class BenchmarkConfig(TestingConfig):
+    """Production-like settings with every external service replaced in memory."""
+    DEBUG = False
+    SUPABASE_URL = None
+    SUPABASE_KEY = None
+    SUPABASE_JWT_SECRET = SECRET
+    REDIS_CACHE_URL = None
+    RATELIMIT_ENABLED = False
+    RATELIMIT_STORAGE_URL = "memory://"
+    BLOG_CONTENT_BACKEND = "supabase"
+    LOG_SAMPLE_RATE = 0.0
+    LOG_SLOW_REQUEST_MS = 60000
+
+
+@dataclass
+class BenchmarkResult:
+    """Throughput, latency percentiles (ms) and memory per request (bytes)."""
+    name: str
+    requests: int
+    concurrency: int
+    errors: int
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+    alloc_peak: int
+    alloc_retained: int
+
+    def row(self) -> str:
+        return (
+            f"{self.name:<14} {self.throughput:>9.0f} {self.p50:>8.2f} {self.p95:>8.2f} "
+            f"{self.p99:>8.2f} {self.alloc_peak / 1024:>10.1f} {self.alloc_retained:>9d} {self.errors:>6d}"
+        )
+
+
+HEADER = (
+    f"{'scenario':<14} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+    f"{'p99 ms':>8} {'alloc KiB':>10} {'retain B':>9} {'errors':>6}"
+)
+
+
+def reset_module_state():
+    """Drop per-process caches so each benchmark app starts cold."""
+    import app.middleware as middleware
+    import app.services.blog_service as blog_service
+    import app.utils.cache as cache_module
+
+    cache_module._l1_cache = None
+    cache_module._tag_cache = None
+    blog_service._blog_service = None
+    blog_service._render_cache = None
+    middleware._token_cache = None
+
+
+def create_benchmark_app(posts: int = 200, latency: float | None = None):
+    """Create the app wired to a seeded FakeSupabase and a FakeRedis.
+
+    Returns (app, slugs) where slugs are the published posts, newest first.
+    """
+    from app.extensions import redis_client, supabase_client
+
+    if latency is None:
+        latency = env_float("BENCH_UPSTREAM_LATENCY_MS", 2.0) / 1000
+    reset_module_state()
+    app = create_app(BenchmarkConfig)
+    supabase = FakeSupabase(latency=latency)
+    slugs = seed_blog(supabase, posts=posts)
+    supabase_client.client = supabase
+    redis_client.cache_client = FakeRedis()
+    return app, slugs
+
+
+def scenarios(slugs) -> dict:
+    """Scenario name -> (path for request i, request headers)."""
+    token = make_token()
+    hot = slugs[:50]
+    return {
+        "blog_index": (lambda i: "/blog/", {}),
+        "blog_post": (lambda i: f"/blog/{hot[i % len(hot)]}", {}),
+        "api_posts": (lambda i: f"/blog/api/posts?limit={5 + i % 3 * 5}", {}),
+        "protected": (lambda i: "/api/v1/protected", {"Authorization": f"Bearer {token}"}),
+    }
+
+
+def compare_fanout(app, slugs, requests=None, concurrency=None) -> list:
+    """Cold post pages with serial upstream calls, then with the concurrent fan-out.
+
+    Every request first invalidates the blog caches, so each page needs the
+    post row, its body and the related listing from upstream.
+    """
+    from app.services.blog_service import BLOG_TAG
+    from app.utils.cache import invalidate_tags
+
+    hot = slugs[:50]
+    requests = requests or env_int("BENCH_FANOUT_REQUESTS", 80)
+
+    def cold_post(i):
+        with app.app_context():
+            invalidate_tags(BLOG_TAG)
+        return f"/blog/{hot[i % len(hot)]}"
+
+    results = []
+    for name, enabled in (("post_cold_serial", False), ("post_cold_fanout", True)):
+        app.config["BLOG_FANOUT_ENABLED"] = enabled
+        results.append(run_scenario(
+            app, name, cold_post, {}, requests=requests, concurrency=concurrency, warmup=0, alloc_requests=10
+        ))
+    app.config["BLOG_FANOUT_ENABLED"] = True
+    return results
+
+
+def _percentile(ordered, q: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    index = min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _measure_allocations(app, path_for, headers, requests: int) -> tuple[int, int]:
+    """Median peak bytes allocated per request, and bytes retained per request."""
+    client = app.test_client()
+    peaks = []
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        for i in range(requests):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            client.get(path_for(i), headers=headers)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return int(statistics.median(peaks)), max(0, (end - start) // requests)
+
+
+def run_scenario(app, name, path_for, headers, requests=None, concurrency=None, warmup=None, alloc_requests=None):
+    """Drive one scenario at fixed concurrency and measure it."""
+    requests = requests or env_int("BENCH_REQUESTS", 400)
+    concurrency = concurrency or env_int("BENCH_CONCURRENCY", 8)
+    warmup = warmup if warmup is not None else env_int("BENCH_WARMUP", 60)
+    alloc_requests = alloc_requests or env_int("BENCH_ALLOC_REQUESTS", 50)
+
+    # Fill the caches the way steady-state traffic would
+    warm_client = app.test_client()
+    for i in range(warmup):
+        warm_client.get(path_for(i), headers=headers)
+
+    counter = iter(range(requests))
+    counter_lock = threading.Lock()
+    latencies = []
+    errors = [0]
+
+    def worker():
+        client = app.test_client()
+        samples = []
+        while True:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            started = time.perf_counter()
+            response = client.get(path_for(i), headers=headers)
+            samples.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                with counter_lock:
+                    errors[0] += 1
+        with counter_lock:
+            latencies.extend(samples)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    alloc_peak, alloc_retained = _measure_allocations(app, path_for, headers, alloc_requests)
+    return BenchmarkResult(
+        name=name,
+        requests=requests,
+        concurrency=concurrency,
+        errors=errors[0],
+        throughput=requests / elapsed,
+        p50=_percentile(latencies, 0.50),
+        p95=_percentile(latencies, 0.95),
+        p99=_percentile(latencies, 0.99),
+        alloc_peak=alloc_peak,
+        alloc_retained=alloc_retained,
+    )
+
+
+def measure_startup(role: str, runs: int = 3) -> dict:
+    """Cold start of a fresh interpreter: best-of-runs import and create_app time."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT, role],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    best = min(samples, key=lambda sample: sample["import_ms"] + sample["create_ms"])
+    best["total_ms"] = best["import_ms"] + best["create_ms"]
+    return best
+
+
+def load_baseline() -> dict:
+    """Baseline results by scenario name."""
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text())
+
+
+def save_baseline(results):
+    """Merge results into the baseline file."""
+    baseline = load_baseline()
+    for result in results:
+        baseline[result.name] = {
+            key: round(value, 2) if isinstance(value, float) else value
+            for key, value in asdict(result).items()
+            if key != "name"
+        }
+    BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def regressions(result: BenchmarkResult, baseline: dict | None) -> list[str]:
+    """Describe how result is worse than baseline beyond the allowed tolerances.
+
+    Timing tolerance (``BENCH_TOLERANCE``, default 1.0 = twice as slow) is loose
+    because it depends on the machine; allocations are deterministic and held to
+    ``BENCH_ALLOC_TOLERANCE`` (default 0.25).
+    """
+    if not baseline:
+        return []
+    timing = 1 + env_float("BENCH_TOLERANCE", 1.0)
+    memory = 1 + env_float("BENCH_ALLOC_TOLERANCE", 0.25)
+    problems = []
+    if result.throughput * timing < baseline["throughput"]:
+        problems.append(f"throughput {result.throughput:.0f} req/s vs baseline {baseline['throughput']:.0f}")
+    if result.p95 > baseline["p95"] * timing:
+        problems.append(f"p95 {result.p95:.2f} ms vs baseline {baseline['p95']:.2f}")
+    # Small absolute slack so a few hundred bytes of noise can't fail the gate
+    if result.alloc_peak > baseline["alloc_peak"] * memory + 4096:
+        problems.append(f"peak allocation {result.alloc_peak} B vs baseline {baseline['alloc_peak']}")
+    return problems
+
+
+def compare(result: BenchmarkResult, baseline: dict | None) -> str:
+    """One-line relative change against baseline."""
+    if not baseline:
+        return f"{result.name}: no baseline"
+    return (
+        f"{result.name}: throughput {result.throughput / baseline['throughput'] - 1:+.0%}, "
+        f"p95 {result.p95 / baseline['p95'] - 1:+.0%}, "
+        f"alloc {result.alloc_peak / max(baseline['alloc_peak'], 1) - 1:+.0%}"
+    )
@@ -0,0 +1,51 @@
+"""Endpoint benchmarks gated on baseline.json."""
+import os
+import pytest
+from tests.benchmarks.harness import (
+    compare,
+    create_benchmark_app,
+    load_baseline,
+    regressions,
+    run_scenario,
+    save_baseline,
+    scenarios,
+)
+
+SCENARIOS = ["blog_index", "blog_post", "api_posts", "protected"]
+
+
+@pytest.fixture(scope="module")
+def bench():
+    """One seeded app shared by every scenario."""
+    app, slugs = create_benchmark_app()
+    return app, scenarios(slugs)
+
+
+def test_fakes_serve_seeded_blog(bench):
+    """Test the stand-ins return real pages before anything is measured."""
+    app, _ = bench
+    client = app.test_client()
+    index = client.get("/blog/")
+    assert index.status_code == 200
+    posts = client.get("/blog/api/posts?limit=5").get_json()
+    assert len(posts) == 5
+    post = client.get(f"/blog/{posts[0]['slug']}")
+    assert post.status_code == 200
+    assert b"<h2" in post.data
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("name", SCENARIOS)
+def test_endpoint_benchmark(bench, name):
+    """Test throughput, latency and allocations stay within the baseline tolerances."""
+    app, available = bench
+    path_for, headers = available[name]
+    result = run_scenario(app, name, path_for, headers)
+    assert result.errors == 0
+
+    if os.environ.get("BENCH_UPDATE_BASELINE"):
+        save_baseline([result])
+        return
+    baseline = load_baseline().get(name)
+    print(compare(result, baseline))
+    assert not regressions(result, baseline)
@@ -0,0 +1,41 @@
+"""Cold post page benchmark: serial upstream calls vs the concurrent fan-out."""
+import os
+import pytest
+from tests.benchmarks.harness import (
+    compare,
+    compare_fanout,
+    create_benchmark_app,
+    env_float,
+    load_baseline,
+    regressions,
+    save_baseline,
+)
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module")
+def results():
+    """Run both modes against a Supabase stand-in with a realistic round trip."""
+    app, slugs = create_benchmark_app(latency=env_float("BENCH_FANOUT_LATENCY_MS", 20) / 1000)
+    return compare_fanout(app, slugs)
+
+
+def test_fanout_beats_serial(results):
+    """Test overlapping the post and listing fetches cuts cold page latency."""
+    serial, fanout = results
+    assert serial.errors == 0 and fanout.errors == 0
+    print(f"\nserial p50 {serial.p50:.1f} ms, fan-out p50 {fanout.p50:.1f} ms")
+    assert fanout.p50 < serial.p50
+    assert fanout.throughput > serial.throughput
+
+
+def test_fanout_baseline(results):
+    """Test neither mode regressed against baseline.json."""
+    if os.environ.get("BENCH_UPDATE_BASELINE"):
+        save_baseline(results)
+        return
+    baseline = load_baseline()
+    for result in results:
+        print(compare(result, baseline.get(result.name)))
+        assert not regressions(result, baseline.get(result.name))
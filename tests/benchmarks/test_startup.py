@@ -0,0 +1,21 @@
+"""Cold start budget per process role."""
+import pytest
+from tests.benchmarks.harness import STARTUP_BUDGET_MS, STARTUP_FORBIDDEN, env_float, measure_startup
+
+
+@pytest.mark.parametrize("role", sorted(STARTUP_FORBIDDEN))
+def test_startup_skips_other_roles(role):
+    """Test a role does not import other roles' subsystems at startup."""
+    startup = measure_startup(role, runs=1)
+    loaded = set(startup["modules"]) & set(STARTUP_FORBIDDEN[role])
+    assert not loaded, f"{role} imported {sorted(loaded)} at startup"
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("role", sorted(STARTUP_BUDGET_MS))
+def test_startup_budget(role):
+    """Test import plus create_app stays within the cold start budget."""
+    startup = measure_startup(role)
+    budget = STARTUP_BUDGET_MS[role] * env_float("BENCH_STARTUP_BUDGET_SCALE", 1.0)
+    print(f"{role}: import {startup['import_ms']:.0f} ms + create_app {startup['create_ms']:.0f} ms")
+    assert startup["total_ms"] <= budget, f"{role} started in {startup['total_ms']:.0f} ms (budget {budget:.0f})"
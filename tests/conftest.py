@@ -0,0 +1,13 @@
+"""Shared pytest configuration."""
+import os
+import pytest
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip wall-clock benchmarks unless asked for with ``-m benchmark`` or RUN_BENCHMARKS=1."""
+    if os.environ.get("RUN_BENCHMARKS") or "benchmark" in (config.getoption("markexpr") or ""):
+        return
+    skip = pytest.mark.skip(reason="timing benchmark: run with -m benchmark or RUN_BENCHMARKS=1")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,17 @@
+"""Helpers shared by the tests and the benchmarks."""
+import time
+import jwt
+
+SECRET = "test-jwt-secret-with-enough-length-for-hs256"
+
+
+def make_token(**claims) -> str:
+    """Create a Supabase-style access token."""
+    payload = {
+        "sub": "user-1",
+        "email": "user@example.com",
+        "aud": "authenticated",
+        "exp": int(time.time()) + 3600,
+        **claims,
+    }
+    return jwt.encode(payload, SECRET, algorithm="HS256")
@@ -0,0 +1,121 @@
+"""JWT verification tests and benchmark."""
+import time
+import jwt
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app import middleware
+from tests.helpers import SECRET, make_token
+
+
+class AuthTestConfig(TestingConfig):
+    """Testing config with a JWT secret and no rate limits."""
+    SUPABASE_JWT_SECRET = SECRET
+    RATELIMIT_ENABLED = False
+    RATELIMIT_STORAGE_URL = "memory://"
+
+
+class UncachedAuthTestConfig(AuthTestConfig):
+    """Testing config with the verified-token cache disabled."""
+    AUTH_TOKEN_CACHE_SIZE = 0
+
+
+def make_client(config_class):
+    """Create a test client with a fresh token cache."""
+    middleware._token_cache = None
+    return create_app(config_class).test_client()
+
+
+def test_protected_endpoint_accepts_valid_token():
+    """Test a valid token reaches the protected endpoint."""
+    client = make_client(AuthTestConfig)
+    response = client.get(
+        "/api/v1/protected", headers={"Authorization": f"Bearer {make_token()}"}
+    )
+    assert response.status_code == 200
+    assert response.get_json()["user_id"] == "user-1"
+
+
+def test_protected_endpoint_rejects_expired_token():
+    """Test expired tokens are rejected."""
+    client = make_client(AuthTestConfig)
+    token = make_token(exp=int(time.time()) - 10)
+    response = client.get("/api/v1/protected", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+def test_verified_claims_are_cached(monkeypatch):
+    """Test repeated requests with one token verify the signature once."""
+    calls = []
+    decode = middleware._decode_supabase_jwt
+
+    def counting_decode(token):
+        calls.append(token)
+        return decode(token)
+
+    monkeypatch.setattr(middleware, "_decode_supabase_jwt", counting_decode)
+    client = make_client(AuthTestConfig)
+    headers = {"Authorization": f"Bearer {make_token()}"}
+    for _ in range(5):
+        assert client.get("/api/v1/protected", headers=headers).status_code == 200
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("config_class", [UncachedAuthTestConfig, AuthTestConfig])
+def test_protected_endpoint_benchmark(config_class):
+    """Benchmark protected-endpoint throughput with and without the token cache."""
+    client = make_client(config_class)
+    headers = {"Authorization": f"Bearer {make_token()}"}
+    requests = 300
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        assert client.get("/api/v1/protected", headers=headers).status_code == 200
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{config_class.__name__}: {requests / elapsed:.0f} req/s")
+
+
+def test_asymmetric_keys_are_loaded_before_requests(monkeypatch):
+    """Test the JWKS is fetched at setup and requests only read it, rejecting unknown keys."""
+    import json
+    import threading
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from jwt.algorithms import ECAlgorithm
+    from app.utils import jwks as jwks_module
+
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    public_jwk = {**json.loads(ECAlgorithm.to_jwk(private_key.public_key())), "kid": "key-1", "alg": "ES256"}
+    fetches = []
+
+    class JWKSResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"keys": [public_jwk]}
+
+    def fake_get(url, timeout=None):
+        fetches.append(threading.current_thread().name)
+        return JWKSResponse()
+
+    class JWKSConfig(AuthTestConfig):
+        SUPABASE_JWKS_URL = "https://example.test/auth/v1/.well-known/jwks.json"
+
+    monkeypatch.setattr(jwks_module.httpx, "get", fake_get)
+    monkeypatch.setattr(jwks_module.jwks, "min_refresh_interval", 0)
+    monkeypatch.setattr(jwks_module.jwks, "url", None)  # restored after the test
+    client = make_client(JWKSConfig)
+    assert fetches == [threading.current_thread().name]
+
+    claims = {"sub": "user-2", "aud": "authenticated", "exp": int(time.time()) + 3600}
+    signed = jwt.encode(claims, private_key, algorithm="ES256", headers={"kid": "key-1"})
+    unknown = jwt.encode(claims, private_key, algorithm="ES256", headers={"kid": "rotated"})
+    assert client.get("/api/v1/protected", headers={"Authorization": f"Bearer {signed}"}).status_code == 200
+    assert client.get("/api/v1/protected", headers={"Authorization": f"Bearer {unknown}"}).status_code == 401
+
+    # The unknown key id only wakes the background refresher
+    deadline = time.monotonic() + 2
+    while len(fetches) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fetches[1:] == ["jwks-refresh"]
@@ -0,0 +1,398 @@
+"""Blog service tests."""
+import time
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app.services import blog_service
+from app.services.blog_service import (
+    BlogService,
+    decode_cursor,
+    encode_cursor,
+    render_cache_key,
+    render_cache_stats,
+)
+
+
+class BlogTestConfig(TestingConfig):
+    """Testing config without a Redis cache."""
+    REDIS_CACHE_URL = None
+
+
+@pytest.fixture
+def app():
+    """Create test app."""
+    app = create_app(BlogTestConfig)
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def service(app):
+    """Create blog service with a fresh render cache."""
+    blog_service._render_cache = None
+    return BlogService(None)
+
+
+def large_post(sections: int = 200) -> str:
+    """Build a large Markdown document."""
+    parts = []
+    for i in range(sections):
+        parts.append(f"## Section {i}\n\nSome *text* with a [link](https://example.com/{i}).\n")
+        parts.append("```python\nprint('hello')\n```\n")
+        parts.append("| a | b |\n|---|---|\n| 1 | 2 |\n")
+    return "\n".join(parts)
+
+
+def test_render_cache_key_depends_on_content():
+    """Test render cache keys change with the source."""
+    assert render_cache_key("# a") == render_cache_key("# a")
+    assert render_cache_key("# a") != render_cache_key("# b")
+
+
+def test_render_markdown_uses_local_cache(service):
+    """Test repeated renders are served from the LRU."""
+    first = service._render_markdown("# Title\n\nBody")
+    second = service._render_markdown("# Title\n\nBody")
+    assert first == second
+    assert '<h1 id="title">Title</h1>' in first
+    stats = render_cache_stats()
+    assert stats["l1"]["hits"] == 1
+    assert stats["l1"]["misses"] == 1
+
+
+def test_render_markdown_resets_toc_between_documents(service):
+    """Test reused Markdown instances do not leak state."""
+    service._render_markdown("# Same")
+    html = service._render_markdown("# Same\n\nOther body")
+    assert 'id="same"' in html
+    assert "same_1" not in html
+
+
+def test_cold_vs_warm_render_benchmark(service):
+    """Benchmark cold vs warm render of a large post."""
+    content = large_post()
+
+    start = time.perf_counter()
+    service._render_markdown(content)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(100):
+        service._render_markdown(content)
+    warm = (time.perf_counter() - start) / 100
+
+    print(f"\nmarkdown render: cold={cold * 1000:.2f}ms warm={warm * 1000:.4f}ms")
+    assert warm < cold
+
+
+def test_cursor_round_trip():
+    """Test cursors encode the (created_at, id) position."""
+    post = {"created_at": "2025-01-02T03:04:05.123+00:00", "id": "7f1c2d3e-0000-4000-8000-000000000001"}
+    assert decode_cursor(encode_cursor(post)) == (post["created_at"], post["id"])
+
+
+@pytest.mark.parametrize("cursor", ["garbage", encode_cursor({"created_at": "x", "id": "y"})])
+def test_decode_cursor_rejects_invalid(cursor):
+    """Test malformed cursors never reach the query."""
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_format_post_summary_excludes_body(service):
+    """Test listing projections leave out the body fields."""
+    summary = service._format_post({"id": "1", "content": "body", "content_storage_path": "a.md"}, summary=True)
+    assert "content" not in summary
+    assert "content_storage_path" not in summary
+
+
+class SlowStorageService(BlogService):
+    """Blog service whose downloads take a fixed time."""
+
+    def __init__(self, delay=0.05):
+        super().__init__(None)
+        self.delay = delay
+
+    def _download(self, path):
+        if path == "missing.md":
+            raise Exception("Object not found")
+        time.sleep(1 if path == "hang.md" else self.delay)
+        return f"# {path}".encode()
+
+
+def test_fetch_contents_is_concurrent(app):
+    """Test many bodies download in roughly one round trip."""
+    service = SlowStorageService(delay=0.1)
+    paths = [f"post-{i}.md" for i in range(20)]
+    started = time.perf_counter()
+    result = service.fetch_contents(paths, max_workers=20)
+    elapsed = time.perf_counter() - started
+    assert result["errors"] == {}
+    assert result["contents"]["post-3.md"] == "# post-3.md"
+    assert elapsed < 1.0
+
+
+def test_fetch_contents_reports_partial_failures(app):
+    """Test failures and timeouts are reported per object."""
+    service = SlowStorageService()
+    started = time.perf_counter()
+    result = service.fetch_contents(["a.md", "missing.md", "hang.md", None], timeout=0.3)
+    assert time.perf_counter() - started < 0.9
+    assert set(result["contents"]) == {"a.md"}
+    assert result["errors"]["missing.md"] == "Object not found"
+    assert "Timed out" in result["errors"]["hang.md"]
+
+
+def test_render_posts_renders_fetched_bodies(app):
+    """Test batch rendering attaches HTML to each post."""
+    service = SlowStorageService()
+    rows = [
+        {"id": "1", "slug": "a", "content_storage_path": "a.md"},
+        {"id": "2", "slug": "b", "content_storage_path": "missing.md"},
+    ]
+    posts = service.render_posts(rows)
+    assert posts[0]["html_content"] == '<h1 id="amd">a.md</h1>'
+    assert "html_content" not in posts[1]
+
+
+def test_post_page_fetches_post_and_listing_concurrently(app):
+    """Test the post and the related listing overlap instead of adding up."""
+    from tests.benchmarks.fakes import FakeSupabase, seed_blog
+
+    supabase = FakeSupabase(latency=0.05)
+    slugs = seed_blog(supabase, posts=20)
+    service = BlogService(supabase)
+
+    started = time.perf_counter()
+    sequential = service.get_post_page(slugs[3], related=3, concurrent=False)
+    sequential_time = time.perf_counter() - started
+    started = time.perf_counter()
+    concurrent = service.get_post_page(slugs[4], related=3)
+    concurrent_time = time.perf_counter() - started
+
+    # Row, body and listing: three round trips in a row, two when overlapped
+    assert sequential_time >= 0.15
+    assert concurrent_time < sequential_time - 0.03
+    assert concurrent["post"]["slug"] == slugs[4]
+    assert "<h2" in concurrent["post"]["html_content"]
+    assert [post["slug"] for post in concurrent["related"]] == slugs[:3]
+    assert slugs[3] not in [post["slug"] for post in sequential["related"]]
+    assert service.get_post_page("missing") is None
+
+
+def test_prerender_sanitizes_and_derives_fields(service):
+    """Test publish-time rendering strips unsafe markup and computes metadata."""
+    source = "# Title\n\n" + "word " * 450 + "\n\n<script>alert(1)</script>\n\n[x](javascript:alert(1))"
+    rendered = service.prerender(source)
+
+    assert "<script" not in rendered["html_content"]
+    assert "javascript:" not in rendered["html_content"]
+    assert '<h1 id="title">Title</h1>' in rendered["html_content"]
+    assert 'href="#title"' in rendered["toc"]
+    assert rendered["word_count"] >= 450
+    assert rendered["reading_time"] == 3
+    assert rendered["excerpt"].endswith("…") and len(rendered["excerpt"]) <= 201
+    assert rendered["content_hash"] == blog_service.content_hash(source)
+
+
+def test_prerendered_post_is_a_single_query(app):
+    """Test posts rendered at publish time skip Storage and Markdown on read."""
+    from tests.benchmarks.fakes import FakeSupabase, seed_blog
+
+    supabase = FakeSupabase()
+    slugs = seed_blog(supabase, posts=3)
+    service = BlogService(supabase)
+    get_post = BlogService.get_post_by_slug.__wrapped__
+
+    cold = get_post(service, slugs[0])
+    assert supabase.calls == 2  # row, then body
+
+    row = next(row for row in supabase.tables["blog_posts"] if row["slug"] == slugs[0])
+    row.update(service.prerender_row(row))
+    supabase.calls = 0
+    post = get_post(service, slugs[0])
+    assert supabase.calls == 1
+    assert post["html_content"] == row["html_content"] == cold["html_content"]
+    assert post["reading_time"] == row["reading_time"]
+
+
+def test_stale_inline_prerender_is_ignored(service):
+    """Test HTML rendered from an older inline body is not served."""
+    row = {"id": "1", "slug": "a", "content": "# New", "html_content": "<h1>Old</h1>"}
+    row["content_hash"] = blog_service.content_hash("# Old")
+    assert "html_content" not in service.render_post(row)
+    row["content_hash"] = blog_service.content_hash("# New")
+    assert service.render_post(row)["html_content"] == "<h1>Old</h1>"
+
+
+def test_process_blog_post_stores_rendered_html(app, tmp_path):
+    """Test the publish task writes the rendered columns once."""
+    from app.extensions import supabase_client
+    from app.tasks.example_tasks import process_blog_post
+    from tests.benchmarks.fakes import FakeSupabase, seed_blog
+
+    app.config["BLOG_SEARCH_INDEX_PATH"] = str(tmp_path / "search.db")
+    supabase = FakeSupabase()
+    seed_blog(supabase, posts=2)
+    row = next(row for row in supabase.tables["blog_posts"] if row["published"])
+    original, blog_service._blog_service = supabase_client.client, None
+    supabase_client.client = supabase
+    try:
+        assert process_blog_post(row["id"])["rendered"]
+        assert row["html_content"].startswith("<h2")
+        assert row["content_hash"] and row["rendered_at"] and row["word_count"] > 0
+
+        writes = supabase.calls
+        process_blog_post(row["id"])  # unchanged source: nothing to write
+        assert supabase.calls - writes == 2  # select and Storage download only
+    finally:
+        supabase_client.client, blog_service._blog_service = original, None
+
+
+def test_process_blog_post_indexes_the_stored_updated_at(app, tmp_path):
+    """Test the index gets the updated_at the update trigger wrote, not the pre-update one."""
+    from app.extensions import supabase_client
+    from app.services.search_service import search_posts
+    from app.tasks.example_tasks import process_blog_post
+    from tests.benchmarks.fakes import FakeSupabase, seed_blog
+
+    app.config["BLOG_SEARCH_INDEX_PATH"] = str(tmp_path / "search.db")
+    supabase = FakeSupabase()
+    supabase.on_update = lambda row: row.update(updated_at="2030-01-01T00:00:00+00:00")
+    seed_blog(supabase, posts=2)
+    row = next(row for row in supabase.tables["blog_posts"] if row["published"])
+    original, blog_service._blog_service = supabase_client.client, None
+    supabase_client.client = supabase
+    try:
+        process_blog_post.run(row["id"])
+        hits = search_posts(row["title"].split(": ")[1])["results"]
+        assert [hit["updated_at"] for hit in hits] == ["2030-01-01T00:00:00+00:00"]
+    finally:
+        supabase_client.client, blog_service._blog_service = original, None
+
+
+def test_prerender_row_refreshes_generated_excerpts_only(service):
+    """Test an excerpt derived from the old body follows the new one; a hand-written one stays."""
+    row = {"id": "1", "slug": "a", "content": "First version of the post."}
+    row.update(service.prerender_row(row))
+    assert row["excerpt"] == "First version of the post."
+
+    row["content"] = "Second version of the post."
+    row.update(service.prerender_row(row))
+    assert row["excerpt"] == "Second version of the post."
+
+    row["excerpt"] = "Written by hand."
+    row["content"] = "Third version of the post."
+    assert "excerpt" not in service.prerender_row(row)
+
+
+@pytest.fixture
+def bulk_supabase(app, tmp_path):
+    """FakeSupabase with 30 seeded posts wired in as the worker's client."""
+    from app.extensions import supabase_client
+    from tests.benchmarks.fakes import FakeSupabase, seed_blog
+
+    app.config["BLOG_SEARCH_INDEX_PATH"] = str(tmp_path / "search.db")
+    supabase = FakeSupabase()
+    seed_blog(supabase, posts=30)
+    original, blog_service._blog_service = supabase_client.client, None
+    supabase_client.client = supabase
+    yield supabase
+    supabase_client.client, blog_service._blog_service = original, None
+
+
+def test_process_blog_posts_renders_in_batches(app, bulk_supabase):
+    """Test the bulk task fetches and writes a batch per round trip and skips current posts."""
+    from app.tasks.example_tasks import process_blog_posts
+
+    app.config["BLOG_BULK_PROCESSES"] = 1
+    rows = bulk_supabase.tables["blog_posts"]
+    result = process_blog_posts(batch_size=8)
+
+    assert result["done"] == result["total"] == result["rendered"] == 30
+    assert result["last_id"] == max(row["id"] for row in rows)
+    assert all(row["html_content"] and row["title"] and row["author"] for row in rows)
+    # count + 4 selects + 30 Storage downloads + 4 upserts
+    assert bulk_supabase.calls == 1 + 4 + 30 + 4
+
+    bulk_supabase.calls = 0
+    assert process_blog_posts(batch_size=8)["rendered"] == 0
+    assert bulk_supabase.calls == 1 + 4 + 30  # bodies re-checked, nothing written
+
+    resumed = process_blog_posts(after=sorted(row["id"] for row in rows)[19], force=True)
+    assert resumed["done"] == resumed["rendered"] == 10
+
+
+def test_process_blog_posts_uses_a_process_pool(app, bulk_supabase):
+    """Test ids are fetched with one in_ query and rendered in worker processes."""
+    from app.tasks.example_tasks import process_blog_posts
+
+    app.config["BLOG_BULK_PROCESSES"] = 2
+    rows = bulk_supabase.tables["blog_posts"][:5]
+    result = process_blog_posts([row["id"] for row in rows])
+
+    assert result["rendered"] == 5 and result["last_id"] == rows[-1]["id"]
+    assert bulk_supabase.calls == 1 + 5 + 1
+    assert all(row["content_hash"] and row["reading_time"] for row in rows)
+
+
+def test_process_blog_posts_reports_missing_ids(app, bulk_supabase, monkeypatch):
+    """Test unknown ids are reported, one client serves the run and the stored rows are kept."""
+    from app.tasks import example_tasks
+
+    app.config["BLOG_BULK_PROCESSES"] = 1
+    bulk_supabase.on_update = lambda row: row.update(updated_at="2030-01-01T00:00:00+00:00")
+    clients = []
+    write_client = example_tasks._write_client
+    monkeypatch.setattr(example_tasks, "_write_client", lambda: clients.append(1) or write_client())
+    indexed = []
+    monkeypatch.setattr(example_tasks, "index_blog_post", lambda post, html: indexed.append(post))
+    rows = bulk_supabase.tables["blog_posts"][:4]
+    post_ids = [rows[0]["id"], "no-such-post", *(row["id"] for row in rows[1:]), "gone"]
+
+    result = example_tasks.process_blog_posts.run(post_ids, batch_size=2)
+
+    assert result["done"] == result["total"] == 6
+    assert result["rendered"] == 4
+    assert result["missing"] == ["no-such-post", "gone"]
+    assert len(clients) == 1
+    assert {post["updated_at"] for post in indexed} == {"2030-01-01T00:00:00+00:00"}
+
+
+def test_process_blog_posts_reads_drafts_with_the_service_client(app, bulk_supabase, monkeypatch):
+    """Test drafts hidden from the anon client by RLS are still reprocessed and unindexed."""
+    from app.extensions import supabase_client
+    from app.services.search_service import get_search_index, index_blog_post
+    from app.tasks import example_tasks
+    from tests.benchmarks.fakes import FakeSupabase
+
+    app.config["BLOG_BULK_PROCESSES"] = 1
+    rows = bulk_supabase.tables["blog_posts"]
+    anon = FakeSupabase()
+    anon.tables["blog_posts"] = [row for row in rows if row["published"]]
+    anon.objects = bulk_supabase.objects
+    supabase_client.client = anon
+    monkeypatch.setattr(example_tasks, "_write_client", lambda: bulk_supabase)
+    draft = next(row for row in rows if not row["published"])
+    index_blog_post(blog_service.BlogService(bulk_supabase).format_summary(draft), "<p>Draft</p>")
+
+    # run() keeps this test's app context (and search index path)
+    result = example_tasks.process_blog_posts.run(batch_size=8)
+    assert result["done"] == result["rendered"] == 30
+    assert draft["html_content"]
+    assert get_search_index().count() == len(anon.tables["blog_posts"])
+
+
+def test_process_blog_post_unindexes_a_draft(app, bulk_supabase, monkeypatch):
+    """Test a post hidden from the anon client by RLS is read with the service client."""
+    from app.extensions import supabase_client
+    from app.services.search_service import get_search_index, index_blog_post
+    from app.tasks import example_tasks
+    from tests.benchmarks.fakes import FakeSupabase
+
+    supabase_client.client = FakeSupabase()  # RLS: the anon client sees no drafts
+    monkeypatch.setattr(example_tasks, "_write_client", lambda: bulk_supabase)
+    draft = next(row for row in bulk_supabase.tables["blog_posts"] if not row["published"])
+    index_blog_post(blog_service.BlogService(bulk_supabase).format_summary(draft), "<p>Draft</p>")
+
+    assert example_tasks.process_blog_post.run(draft["id"])["status"] == "completed"
+    assert get_search_index().count() == 0
@@ -0,0 +1,170 @@
+"""Cache utility tests."""
+import threading
+import time
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app.utils import cache as cache_module
+from app.utils.cache import LRUCache, cached, _should_refresh
+
+
+class CacheTestConfig(TestingConfig):
+    """Testing config without a Redis cache."""
+    REDIS_CACHE_URL = None
+    RATELIMIT_ENABLED = False
+    RATELIMIT_STORAGE_URL = "memory://"
+
+
+@pytest.fixture
+def app():
+    """Create test app with a fresh L1 cache."""
+    cache_module._l1_cache = None
+    cache_module._tag_cache = None
+    app = create_app(CacheTestConfig)
+    with app.app_context():
+        yield app
+
+
+def test_lru_evicts_least_recently_used():
+    """Test the LRU keeps the most recently used entries."""
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    assert lru.get("a") == 1
+    assert lru.get("b") is None
+    assert lru.get("c") == 3
+
+
+def test_lru_expires_entries():
+    """Test per-entry TTL."""
+    lru = LRUCache(maxsize=2, ttl=0.01)
+    lru.set("a", 1)
+    time.sleep(0.02)
+    assert lru.get("a") is None
+    assert lru.stats()["misses"] == 1
+
+
+def test_should_refresh():
+    """Test expiry and early refresh decisions."""
+    now = time.time()
+    assert _should_refresh({"v": 1, "x": now - 1, "d": 0}, beta=1.0)
+    assert not _should_refresh({"v": 1, "x": now + 3600, "d": 0.01}, beta=1.0)
+    assert not _should_refresh({"v": 1, "x": now + 0.001, "d": 10}, beta=0)
+
+
+def test_cached_serves_from_l1(app):
+    """Test hot entries are served without recomputing."""
+    calls = []
+
+    @cached(ttl=60, l1=True)
+    def compute(x):
+        calls.append(x)
+        return x * 2
+
+    assert compute(2) == 4
+    assert compute(2) == 4
+    assert calls == [2]
+
+
+def test_cached_prime(app):
+    """Test primed entries are served without computing."""
+    calls = []
+
+    @cached(ttl=60, l1=True)
+    def compute(x):
+        calls.append(x)
+        return x * 2
+
+    compute.prime(10, 3)
+    assert compute(3) == 10
+    assert calls == []
+    assert compute.cache_key_for(3) != compute.cache_key_for(4)
+
+
+def test_cached_key_binds_arguments(app):
+    """Test positional, keyword and defaulted calls share one entry."""
+    @cached(ttl=60)
+    def page(limit=10, cursor=None):
+        return limit
+
+    key = page.cache_key_for()
+    assert page.cache_key_for(10) == page.cache_key_for(limit=10, cursor=None) == key
+    assert page.cache_key_for(20) != key
+
+
+def test_cached_single_flight(app):
+    """Test concurrent misses in one worker compute once."""
+    calls = []
+
+    @cached(ttl=60, l1=True, beta=0)
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    def worker():
+        with app.app_context():
+            results.append(slow())
+
+    results = []
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+
+
+def test_tagged_key_changes_with_generation(app):
+    """Test bumping a tag generation moves entries to a new namespace."""
+    key = cache_module.cache_key("listing", 1)
+    assert cache_module.tagged_key(key) == key
+
+    before = cache_module.tagged_key(key, ["blog:listings"])
+    cache_module._get_tag_cache().set("blog:listings", 1)
+    after = cache_module.tagged_key(key, ["blog:listings"])
+    assert before != after
+    assert after.startswith(key)
+
+
+def test_cached_response_serves_anonymous_hits(app):
+    """Test full-page responses are replayed without calling the view."""
+    calls = []
+
+    @app.route("/page")
+    @cache_module.cached_response(ttl=60, tags=["pages"])
+    def page():
+        calls.append(1)
+        return "<p>hello</p>"
+
+    client = app.test_client()
+    first = client.get("/page")
+    second = client.get("/page")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_data(as_text=True) == "<p>hello</p>"
+    assert calls == [1]
+
+    client.get("/page", headers={"Authorization": "Bearer token"})
+    assert calls == [1, 1]
+
+
+def test_lock_release_keeps_a_lock_taken_over_by_another_worker(app, monkeypatch):
+    """Test an expired lock re-taken elsewhere is not deleted by its old owner."""
+    from app.extensions import redis_client
+    from tests.benchmarks.fakes import FakeRedis
+
+    redis = FakeRedis()
+    monkeypatch.setattr(redis_client, "cache_client", redis)
+    token = cache_module._acquire_lock("k", timeout=10)
+    redis.set("lock:k", "other-worker")
+    cache_module._release_lock("k", token)
+    assert redis.get("lock:k") == b"other-worker"
+
+    token = cache_module._acquire_lock("j", timeout=10)
+    cache_module._release_lock("j", token)
+    assert redis.get("lock:j") is None
@@ -0,0 +1,111 @@
+"""Cache warm-up tests."""
+import time
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app.services import blog_service as blog_service_module
+from app.services.blog_service import BlogService
+from app.tasks import cache_tasks
+
+
+class WarmTestConfig(TestingConfig):
+    """Testing config without Redis."""
+    REDIS_CACHE_URL = None
+    RATELIMIT_ENABLED = False
+    RATELIMIT_STORAGE_URL = "memory://"
+
+
+class FakeBlogService(BlogService):
+    """Blog service returning generated rows."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.queries = []
+
+    def get_rows_by_slugs(self, slugs):
+        self.queries.append(list(slugs))
+        return [{"id": slug, "slug": slug, "content": "Inline"} for slug in slugs if slug != "gone"]
+
+    def list_posts_page(self, limit=10, cursor=None):
+        return {"posts": [], "next_cursor": None}
+
+    def list_posts(self, limit=10, offset=0):
+        return [{"slug": f"new-{i}"} for i in range(limit)]
+
+
+@pytest.fixture
+def app():
+    """Create test app."""
+    app = create_app(WarmTestConfig)
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def primed(monkeypatch):
+    """Record primed post cache entries."""
+    primed = {}
+    monkeypatch.setattr(
+        BlogService.get_post_by_slug,
+        "prime",
+        lambda value, service, slug, compute_time=0.0: primed.__setitem__(slug, value),
+    )
+    return primed
+
+
+def test_warm_posts_skips_cached_and_batches(app, primed, monkeypatch):
+    """Test only cold posts are fetched, in batches."""
+    service = FakeBlogService()
+    hot_key = BlogService.get_post_by_slug.cache_key_for(service, "hot")
+    monkeypatch.setattr(
+        blog_service_module,
+        "get_many",
+        lambda keys: {hot_key: {"v": {}, "x": time.time() + 60, "d": 0}},
+    )
+
+    result = service.warm_posts(["hot", "a", "b", "c", "a", "gone"], batch_size=2)
+
+    assert result == {"requested": 5, "cold": 4, "warmed": 3}
+    assert service.queries == [["a", "b"], ["c", "gone"]]
+    assert sorted(primed) == ["a", "b", "c"]
+
+
+def test_warm_posts_rate_cap(app, primed):
+    """Test warming is spread out to respect the rate cap."""
+    service = FakeBlogService()
+    started = time.monotonic()
+    service.warm_posts([f"p{i}" for i in range(6)], rate=20, batch_size=2)
+    assert time.monotonic() - started >= 0.25
+
+
+def test_warm_blog_cache_task(app, primed, monkeypatch):
+    """Test the task warms the newest and popular posts."""
+    service = FakeBlogService()
+    monkeypatch.setattr(cache_tasks, "get_blog_service", lambda: service)
+    monkeypatch.setattr(cache_tasks, "popular_slugs", lambda limit: ["popular", "new-0"])
+
+    result = cache_tasks.warm_blog_cache(newest=2, popular=5, rate=0)
+
+    assert result["status"] == "completed"
+    assert sorted(primed) == ["new-0", "new-1", "popular"]
+
+
+def test_warm_task_fills_the_listing_entry_the_index_reads(app, primed, monkeypatch):
+    """Test the warmed first listing page is cached under the key the route looks up."""
+    from app.blueprints.blog import routes
+
+    keys = []
+    cached_page = BlogService.list_posts_page
+
+    def list_posts_page(self, *args, **kwargs):
+        keys.append(cached_page.cache_key_for(self, *args, **kwargs))
+        return {"posts": [], "next_cursor": None}
+
+    service = FakeBlogService()
+    monkeypatch.setattr(FakeBlogService, "list_posts_page", list_posts_page)
+    monkeypatch.setattr(cache_tasks, "get_blog_service", lambda: service)
+    monkeypatch.setattr(routes, "get_blog_service", lambda: service)
+
+    cache_tasks.warm_blog_cache(newest=0, popular=0, rate=0)
+    assert app.test_client().get("/blog/").status_code == 200
+    assert len(keys) == 2 and keys[0] == keys[1]
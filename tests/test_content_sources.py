@@ -0,0 +1,159 @@
+"""Filesystem content source tests."""
+import os
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import redis_client
+from app.services import blog_service
+from app.utils import cache as cache_module
+from app.services.content_sources import FilesystemContentSource, parse_front_matter
+from tests.benchmarks.fakes import FakeRedis
+
+
+class ContentTestConfig(TestingConfig):
+    """Testing config without Redis."""
+    REDIS_CACHE_URL = None
+    RATELIMIT_ENABLED = False
+    RATELIMIT_STORAGE_URL = "memory://"
+
+
+def write_post(root, name, title, date, published="true", body="# Heading\n\nBody text."):
+    """Write a Markdown post with front-matter."""
+    path = root / f"{name}.md"
+    path.write_text(
+        f"---\ntitle: {title}\ndate: {date}\ntags: [a, b]\npublished: {published}\n---\n{body}",
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Create test app serving content from tmp_path."""
+    class Config(ContentTestConfig):
+        BLOG_CONTENT_BACKEND = "filesystem"
+        BLOG_CONTENT_DIR = str(tmp_path)
+        BLOG_CONTENT_POLL_INTERVAL = 0
+
+    app = create_app(Config)
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def source(app, tmp_path):
+    """Create a content source with three posts."""
+    write_post(tmp_path, "first", "First", "2025-01-01")
+    write_post(tmp_path, "second", "Second", "2025-01-02")
+    write_post(tmp_path, "third", "Third", "2025-01-03")
+    write_post(tmp_path, "draft", "Draft", "2025-01-04", published="false")
+    return FilesystemContentSource(tmp_path, poll_interval=0)
+
+
+def test_parse_front_matter():
+    """Test front-matter parsing and body offset."""
+    text = '---\ntitle: "Hello: World"\n# comment\ntags: a, b\n---\nBody'
+    meta, offset = parse_front_matter(text)
+    assert meta == {"title": "Hello: World", "tags": "a, b"}
+    assert text[offset:] == "Body"
+    assert parse_front_matter("No header") == ({}, 0)
+
+
+def test_list_rows_newest_first(source):
+    """Test published posts are listed newest first with keyset paging."""
+    rows = source.list_rows(2)
+    assert [row["slug"] for row in rows] == ["third", "second"]
+    assert rows[0]["tags"] == ["a", "b"]
+    assert "path" not in rows[0]
+
+    after = (rows[-1]["created_at"], rows[-1]["id"])
+    assert [row["slug"] for row in source.list_rows(2, after=after)] == ["first"]
+    assert [row["slug"] for row in source.list_rows(2, offset=1)] == ["second", "first"]
+
+
+def test_read_body_and_unpublished(source):
+    """Test bodies are read after the front-matter and drafts are hidden."""
+    assert source.get_row("draft") is None
+    assert source.read_body("first") == "# Heading\n\nBody text."
+
+
+def test_changes_are_picked_up(source, tmp_path):
+    """Test modified and removed files are reindexed and reported."""
+    source.refresh(force=True)
+    changed = []
+    source.on_change(changed.extend)
+
+    path = write_post(tmp_path, "first", "First (edited)", "2025-01-01", body="New body")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    (tmp_path / "third.md").unlink()
+    source.refresh(force=True)
+
+    assert sorted(changed) == ["first", "third"]
+    assert source.get_row("first")["title"] == "First (edited)"
+    assert source.read_body("first") == "New body"
+    assert source.get_row("third") is None
+
+
+def test_blog_service_uses_filesystem(source, client):
+    """Test the blog pages render from local files."""
+    blog_service._blog_service = None
+    response = client.get("/blog/api/posts?limit=2")
+    assert [post["slug"] for post in response.get_json()] == ["third", "second"]
+
+    response = client.get("/blog/api/posts/first")
+    assert response.status_code == 200
+    assert '<h1 id="heading">Heading</h1>' in response.get_json()["html_content"]
+    assert client.get("/blog/api/posts/draft").status_code == 404
+
+
+def test_non_uuid_ids_page_like_table_ids(app, tmp_path, client):
+    """Test front-matter ids that are not UUIDs still give valid cursors."""
+    for name in ("one", "two", "three"):
+        path = write_post(tmp_path, name, name.title(), "2025-01-01")
+        path.write_text(path.read_text().replace("---\ntitle", f"---\nid: my-{name}\ntitle", 1))
+    blog_service._blog_service = None
+    cache_module._l1_cache = None  # listings cached by earlier tests
+
+    first = client.get("/blog/api/posts?limit=2")
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(f"/blog/api/posts?limit=2&cursor={cursor}")
+    assert second.status_code == 200
+    slugs = [post["slug"] for post in first.get_json() + second.get_json()]
+    assert sorted(slugs) == ["one", "three", "two"]
+
+
+def test_post_page_etag_covers_related_posts(source, tmp_path, client, monkeypatch):
+    """Test unpublishing a related post changes the post page's ETag."""
+    monkeypatch.setattr(redis_client, "cache_client", FakeRedis())
+    blog_service._blog_service = None
+    cache_module._l1_cache = None
+    first = client.get("/blog/first")
+    assert first.status_code == 200 and "Third" in first.get_data(as_text=True)
+    etag = first.headers["ETag"]
+    assert client.get("/blog/first", headers={"If-None-Match": etag}).status_code == 304
+
+    path = write_post(tmp_path, "third", "Third", "2025-01-03", published="false")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    blog_service.invalidate_post("third")
+
+    response = client.get("/blog/first", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "Last-Modified" not in response.headers
+    assert "Third" not in response.get_data(as_text=True)
+
+
+def test_listing_is_not_revalidated_by_date(source, tmp_path, client, monkeypatch):
+    """Test listings carry no Last-Modified, which unpublishing would move backwards."""
+    monkeypatch.setattr(redis_client, "cache_client", FakeRedis())
+    blog_service._blog_service = None
+    cache_module._l1_cache = None
+    first = client.get("/blog/")
+    assert first.status_code == 200 and first.headers.get("ETag")
+    assert "Last-Modified" not in first.headers
+
+    since = {"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+    assert client.get("/blog/", headers=since).status_code == 200
+    assert client.get("/blog/api/posts", headers=since).status_code == 200
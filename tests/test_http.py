@@ -0,0 +1,51 @@
+"""Conditional request helper tests."""
+from datetime import datetime, timezone
+import pytest
+from flask import Flask
+from app.utils.http import make_etag, parse_timestamp, is_not_modified, not_modified
+
+
+@pytest.fixture
+def app():
+    """Create a bare Flask app for request contexts."""
+    return Flask(__name__)
+
+
+def test_make_etag_is_stable():
+    """Test ETags depend only on their parts."""
+    assert make_etag("html", "abc") == make_etag("html", "abc")
+    assert make_etag("html", "abc") != make_etag("json", "abc")
+
+
+def test_parse_timestamp():
+    """Test PostgREST timestamps parse to aware datetimes."""
+    parsed = parse_timestamp("2025-01-02T03:04:05.123456+00:00")
+    assert parsed == datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc)
+    assert parse_timestamp(None) is None
+    assert parse_timestamp("not a date") is None
+
+
+def test_if_none_match(app):
+    """Test a matching ETag is not modified."""
+    etag = make_etag("post")
+    with app.test_request_context(headers={"If-None-Match": f'"{etag}"'}):
+        assert is_not_modified(etag)
+        assert not is_not_modified(make_etag("other"))
+
+
+def test_if_modified_since(app):
+    """Test Last-Modified comparison ignores sub-second precision."""
+    last_modified = parse_timestamp("2025-01-02T03:04:05.500000+00:00")
+    headers = {"If-Modified-Since": "Thu, 02 Jan 2025 03:04:05 GMT"}
+    with app.test_request_context(headers=headers):
+        assert is_not_modified(None, last_modified)
+        assert not is_not_modified(None, parse_timestamp("2025-01-03T00:00:00+00:00"))
+
+
+def test_not_modified_response(app):
+    """Test 304 responses carry the validators."""
+    with app.test_request_context():
+        response = not_modified("abc", parse_timestamp("2025-01-02T03:04:05+00:00"))
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"abc"'
+    assert "Last-Modified" in response.headers
@@ -0,0 +1,115 @@
+"""Access logging tests and benchmark."""
+import io
+import json
+import logging
+import os
+import time
+import pytest
+from flask import Flask
+from app.logs import AsyncQueueHandler, json_formatter, should_log_request
+from app.middleware import setup_middleware
+
+
+def make_app(handler=None, sample_rate=1.0):
+    """Create a bare app whose access log goes to handler (None disables logging)."""
+    app = Flask(f"bench_{id(handler)}")
+    app.config.update(LOG_SAMPLE_RATE=sample_rate, SERVER_TIMING_ENABLED=False)
+    setup_middleware(app)
+    app.logger.handlers.clear()
+    app.logger.propagate = False
+    if handler is not None:
+        app.logger.addHandler(handler)
+        app.logger.setLevel(logging.INFO)
+    else:
+        app.logger.setLevel(logging.CRITICAL)
+
+    @app.route("/ping")
+    def ping():
+        return "pong"
+
+    return app
+
+
+def stream_handler(stream):
+    """JSON handler writing to stream."""
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(json_formatter())
+    return handler
+
+
+def test_should_log_request_sampling():
+    """Test errors and slow requests bypass sampling."""
+    config = {"LOG_SAMPLE_RATE": 0.0, "LOG_SLOW_REQUEST_MS": 500}
+    assert not should_log_request(200, 10, config)
+    assert should_log_request(404, 10, config)
+    assert should_log_request(429, 10, config)
+    assert should_log_request(503, 10, config)
+    assert should_log_request(200, 800, config)
+    assert should_log_request(200, 10, {"LOG_SAMPLE_RATE": 1.0})
+
+
+def test_async_handler_writes_one_access_line():
+    """Test each request produces a single JSON access line off-thread."""
+    stream = io.StringIO()
+    handler = AsyncQueueHandler([stream_handler(stream)])
+    app = make_app(handler)
+    app.test_client().get("/ping")
+    handler.stop()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["message"] == "Request completed"
+    assert lines[0]["status_code"] == 200
+    assert lines[0]["path"] == "/ping"
+    assert "duration_ms" in lines[0]
+
+
+def test_errors_are_logged_when_sampled_out():
+    """Test a 404 is logged even when successful requests are all sampled out."""
+    stream = io.StringIO()
+    handler = AsyncQueueHandler([stream_handler(stream)])
+    app = make_app(handler, sample_rate=0.0)
+    client = app.test_client()
+    client.get("/ping")
+    client.get("/missing")
+    handler.stop()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(line["path"], line["status_code"]) for line in lines] == [("/missing", 404)]
+
+
+def test_async_handler_resolves_args_and_drops_when_full():
+    """Test records are prepared in the caller and never block."""
+    stream = io.StringIO()
+    handler = AsyncQueueHandler([stream_handler(stream)], maxsize=1)
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "hello %s", ("world",), None)
+    prepared = handler.prepare(record)
+    assert prepared.msg == "hello world" and prepared.args is None
+
+    handler._pid = os.getpid()  # no listener started, so nothing drains the queue
+    handler.enqueue(prepared)
+    handler.enqueue(prepared)
+    assert handler.dropped == 1
+
+
+@pytest.mark.parametrize("mode", ["off", "sync", "async", "async_sampled"])
+def test_logging_benchmark(mode):
+    """Benchmark requests/sec with logging off, synchronous, queued and sampled."""
+    stream = open("/dev/null", "w")
+    handler = None
+    if mode == "sync":
+        handler = stream_handler(stream)
+    elif mode.startswith("async"):
+        handler = AsyncQueueHandler([stream_handler(stream)])
+    client = make_app(handler, sample_rate=0.1 if mode == "async_sampled" else 1.0).test_client()
+    requests = 1000
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        assert client.get("/ping").status_code == 200
+    elapsed = time.perf_counter() - start
+
+    if isinstance(handler, AsyncQueueHandler):
+        handler.stop()
+    stream.close()
+    print(f"\nlogging {mode}: {requests / elapsed:.0f} req/s")
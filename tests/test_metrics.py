@@ -0,0 +1,125 @@
+"""Prometheus metrics tests."""
+import json
+import os
+import subprocess
+import sys
+import pytest
+from flask import Flask
+from prometheus_client import REGISTRY
+from app.metrics import observe_upstream, record_cache, setup_metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def client():
+    """Create a bare app with metrics."""
+    app = Flask(__name__)
+    setup_metrics(app)
+
+    @app.route("/hello")
+    def hello():
+        return "hello"
+
+    return app.test_client()
+
+
+def sample(name, **labels):
+    """Read a metric sample from the default registry."""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_request_latency_and_in_flight(client):
+    """Test requests are observed per endpoint and status, and leave no in-flight count."""
+    before = sample("http_request_duration_seconds_count", method="GET", endpoint="hello", status="200")
+    client.get("/hello")
+    client.get("/missing")
+    after = sample("http_request_duration_seconds_count", method="GET", endpoint="hello", status="200")
+    assert after == before + 1
+    assert sample("http_request_duration_seconds_count", method="GET", endpoint="unmatched", status="404") >= 1
+    assert sample("http_requests_in_progress", method="GET", endpoint="hello") == 0
+
+
+def test_metrics_endpoint(client):
+    """Test the scrape endpoint exposes the registered metrics."""
+    record_cache("redis", True)
+    observe_upstream("GET", "/rest/v1/blog_posts", 200, 0.02)
+    response = client.get("/metrics")
+    body = response.get_data(as_text=True)
+    assert response.headers["Content-Type"].startswith("text/plain")
+    assert 'cache_requests_total{result="hit",tier="redis"}' in body
+    assert 'supabase_request_duration_seconds_count{method="GET",service="postgrest",status="200"}' in body
+
+
+def test_multiprocess_aggregation(tmp_path):
+    """Test counters from several worker processes are summed."""
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = "from app.metrics import record_cache; record_cache('l1', True, 3)"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, cwd=ROOT, check=True)
+
+    scrape = (
+        "from prometheus_client import generate_latest\n"
+        "from app.metrics import metrics_registry\n"
+        "print(generate_latest(metrics_registry()).decode())"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", scrape], env=env, cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    assert 'cache_requests_total{result="hit",tier="l1"} 6.0' in output
+
+
+def test_celery_task_signals():
+    """Test publish stamping, queue wait, retries, failures and per-queue counters."""
+    worker = """
+import json, time
+from celery import Celery
+from celery.signals import before_task_publish
+from prometheus_client import REGISTRY
+from app.extensions import redis_client
+from app.metrics import setup_celery_metrics, setup_task_publish_metrics
+from tests.benchmarks.fakes import FakeRedis
+
+redis_client.celery_client = FakeRedis(decode_responses=True)
+celery = Celery("test", broker="memory://", backend="cache+memory://")
+setup_task_publish_metrics()
+setup_celery_metrics(celery)
+published = []
+before_task_publish.connect(lambda headers=None, **kw: published.append(dict(headers)), weak=False)
+
+@celery.task(name="ok")
+def ok(data):
+    return 1
+
+@celery.task(name="boom")
+def boom():
+    raise KeyError("x")
+
+@celery.task(name="again", bind=True, max_retries=1)
+def again(self):
+    raise self.retry(countdown=0)
+
+ok.delay({"key": "value"})
+ok.apply(args=({},), headers={"published_at": time.time() - 2})
+boom.apply()
+again.apply()
+sample = lambda name, **labels: REGISTRY.get_sample_value(name, labels)
+print(json.dumps({
+    "stamped": "published_at" in published[0],
+    "payload": sample("celery_task_payload_bytes_count", task="ok"),
+    "wait": sample("celery_task_queue_wait_seconds_sum", task="ok", queue="celery"),
+    "failures": sample("celery_task_failures_total", task="boom", exception="KeyError"),
+    "retries": sample("celery_task_retries_total", task="again"),
+    "stats": redis_client.celery_client.hgetall("taskstats:queue:celery"),
+}))
+"""
+    # Signal receivers stay connected, so keep them out of this process
+    output = subprocess.run(
+        [sys.executable, "-c", worker], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    assert result["stamped"] and result["payload"] == 1
+    assert 2 <= result["wait"] < 5
+    assert result["failures"] == 1 and result["retries"] == 1
+    assert result["stats"]["completed"] == "1" and result["stats"]["retried"] == "1"
+    assert result["stats"]["waited"] == "1"
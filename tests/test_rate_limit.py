@@ -0,0 +1,141 @@
+"""Hybrid rate limit storage tests and benchmark."""
+import time
+import pytest
+import redis
+from limits import RateLimitItemPerMinute
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from app import create_app
+from app.config import TestingConfig
+from app.utils.rate_limit import HybridRedisStorage
+from tests.benchmarks.fakes import FakeRedis
+
+# Nothing listens here: every Redis call fails fast
+UNREACHABLE = "hybrid+redis://127.0.0.1:1/0?sync_interval=60"
+
+
+class BrokenRedis:
+    """Redis whose pipeline always times out."""
+
+    def pipeline(self, transaction=True):
+        raise redis.TimeoutError("timed out")
+
+
+def make_storage(shared=None):
+    """Hybrid storage backed by an in-memory Redis, synced only on demand."""
+    storage = storage_from_string(UNREACHABLE)
+    storage.redis = shared if shared is not None else FakeRedis()
+    return storage
+
+
+def test_scheme_is_registered():
+    """Test hybrid+redis:// URLs resolve to the hybrid storage with query options."""
+    storage = storage_from_string("hybrid+redis://localhost:6379/0?sync_interval=0.25&sync_batch=10")
+    assert isinstance(storage, HybridRedisStorage)
+    assert storage.sync_interval == 0.25
+    assert storage.sync_batch == 10
+
+
+def test_hits_are_counted_locally_until_sync():
+    """Test hits never touch Redis until the batched sync."""
+    shared = FakeRedis()
+    storage = make_storage(shared)
+    for expected in range(1, 4):
+        assert storage.incr("limit/a", 60) == expected
+    assert shared.get("limit/a") is None
+
+    assert storage.sync()
+    assert shared.get("limit/a") == b"3"
+    assert storage.get("limit/a") == 3
+    assert storage.get_expiry("limit/a") > time.time() + 50
+
+
+def test_workers_see_each_others_hits_after_sync():
+    """Test two workers reconcile their counts through Redis."""
+    shared = FakeRedis()
+    first, second = make_storage(shared), make_storage(shared)
+    for _ in range(3):
+        first.incr("limit/a", 60)
+    for _ in range(2):
+        second.incr("limit/a", 60)
+    first.sync()
+    second.sync()
+    assert second.get("limit/a") == 5
+
+    # A worker refreshes a key's global count when it syncs its own next hit
+    assert first.incr("limit/a", 60) == 4
+    first.sync()
+    assert first.get("limit/a") == 6
+    assert second.incr("limit/a", 60) == 6
+
+
+def test_sync_sends_only_keys_hit_since_the_last_sync():
+    """Test idle windows cost no Redis commands and are evicted."""
+    shared = FakeRedis()
+    storage = make_storage(shared)
+    for i in range(100):
+        storage.incr(f"limit/{i}", 86400)
+    storage.sync()
+    assert storage.stats["keys_synced"] == 100
+
+    storage.incr("limit/new", 86400)
+    storage.sync()
+    assert storage.stats["keys_synced"] == 101
+    assert storage.sync() and storage.stats["keys_synced"] == 101
+
+    storage.idle_timeout = 0
+    storage._next_eviction = 0
+    storage.sync()
+    assert storage._windows == {}
+    assert storage.incr("limit/0", 86400) == 1
+    storage.sync()
+    assert storage.get("limit/0") == 2  # rebuilt from the global count
+
+
+def test_limits_locally_while_redis_is_down():
+    """Test a failed sync keeps the hits and limiting continues per worker."""
+    storage = make_storage(BrokenRedis())
+    limiter = FixedWindowRateLimiter(storage)
+    item = RateLimitItemPerMinute(3)
+    assert [limiter.hit(item, "client") for _ in range(4)] == [True, True, True, False]
+
+    assert not storage.sync()
+    assert storage.stats["sync_errors"] == 1
+
+    shared = FakeRedis()
+    storage.redis = shared
+    assert storage.sync()
+    assert shared.get(item.key_for("client")) == b"4"
+
+
+class HybridLimitConfig(TestingConfig):
+    """Testing config limited through an unreachable Redis."""
+    REDIS_CACHE_URL = None
+    RATELIMIT_ENABLED = True
+    RATELIMIT_STORAGE_URL = UNREACHABLE
+    RATELIMIT_DEFAULT = ["3 per minute"]
+
+
+def test_app_enforces_limits_without_redis():
+    """Test the app limits requests with no Redis round trip."""
+    client = create_app(HybridLimitConfig).test_client()
+    statuses = [client.get("/health").status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+
+
+@pytest.mark.benchmark
+def test_hit_cost_benchmark():
+    """Benchmark a limit check against local counters."""
+    storage = make_storage()
+    limiter = FixedWindowRateLimiter(storage)
+    items = [RateLimitItemPerMinute(60), RateLimitItemPerMinute(1000)]
+    hits = 20000
+
+    started = time.perf_counter()
+    for i in range(hits):
+        for item in items:
+            limiter.hit(item, f"client-{i % 100}")
+    per_check = (time.perf_counter() - started) / (hits * len(items))
+
+    print(f"\nhybrid limit check: {per_check * 1e6:.2f} us")
+    assert per_check < 0.0005
@@ -0,0 +1,47 @@
+"""Search index tests."""
+import pytest
+from app.services.search_service import SearchIndex, build_match_query
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Create an index with a few posts."""
+    index = SearchIndex(tmp_path / "search.db")
+    index.index_post(
+        {"id": "1", "slug": "caching", "title": "Caching with Redis", "tags": ["redis"]},
+        "Keep hot listings in memory and invalidate them with tags.",
+    )
+    index.index_post(
+        {"id": "2", "slug": "deploy", "title": "Deploying Flask", "tags": ["ops"]},
+        "Gunicorn workers sit behind nginx; Redis holds the cache.",
+    )
+    return index
+
+
+def test_build_match_query():
+    """Test free text is quoted and the last term is a prefix."""
+    assert build_match_query("redis cach") == '"redis" "cach"*'
+    assert build_match_query('"); DROP') == '"DROP"*'
+    assert build_match_query("   ") is None
+
+
+def test_search_ranks_title_matches_first(index):
+    """Test title hits outrank body hits."""
+    results = index.search("redis")
+    assert results["total"] == 2
+    assert [hit["slug"] for hit in results["results"]] == ["caching", "deploy"]
+    assert results["results"][0]["tags"] == ["redis"]
+
+
+def test_reindex_replaces_post(index):
+    """Test re-indexing a post replaces its previous terms."""
+    index.index_post({"id": "2", "slug": "deploy", "title": "Deploying Flask"}, "Kubernetes")
+    assert index.search("nginx")["total"] == 0
+    assert index.search("kubernetes")["results"][0]["slug"] == "deploy"
+    assert index.count() == 2
+
+
+def test_remove_post(index):
+    """Test removed posts no longer match."""
+    index.remove_post("1")
+    assert [hit["slug"] for hit in index.search("redis")["results"]] == ["deploy"]
@@ -0,0 +1,72 @@
+"""Cache serialization tests and micro-benchmark."""
+import json
+import time
+import pytest
+from app.utils.serialization import Serializer, available_codec
+
+
+def rendered_post(paragraphs: int = 300) -> dict:
+    """Build a cached post payload with large rendered HTML."""
+    html = "".join(
+        f'<h2 id="section-{i}">Section {i}</h2><p>Some <em>text</em> with a '
+        f'<a href="https://example.com/{i}">link</a>.</p><pre><code>print({i})</code></pre>'
+        for i in range(paragraphs)
+    )
+    return {
+        "id": "7f1c2d3e-0000-4000-8000-000000000001",
+        "title": "A long post",
+        "slug": "a-long-post",
+        "tags": ["python", "flask"],
+        "html_content": html,
+    }
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson", "msgpack"])
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_round_trip(codec, compression):
+    """Test values survive a round trip with every codec."""
+    if not available_codec(codec):
+        pytest.skip(f"{codec} not installed")
+    serializer = Serializer(codec, compression, min_compress_size=16)
+    value = rendered_post(5)
+    assert serializer.loads(serializer.dumps(value)) == value
+
+
+def test_small_values_are_not_compressed():
+    """Test values below the threshold are stored as-is."""
+    serializer = Serializer("json", "zlib", min_compress_size=1024)
+    assert serializer.dumps({"a": 1})[2:3] == b"-"
+
+
+def test_loads_legacy_json():
+    """Test values written as plain JSON text still decode."""
+    serializer = Serializer("json", "zlib")
+    assert serializer.loads(b'{"a": 1}') == {"a": 1}
+    assert serializer.loads('{"a": 1}') == {"a": 1}
+
+
+def test_serialization_benchmark():
+    """Compare bytes stored and ops/sec against the plain JSON path."""
+    value = rendered_post()
+    codec = "orjson" if available_codec("orjson") else "json"
+    serializer = Serializer(codec, "zlib", min_compress_size=1024)
+    iterations = 200
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        legacy = json.dumps(value)
+        json.loads(legacy)
+    legacy_ops = iterations / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        compact = serializer.dumps(value)
+        serializer.loads(compact)
+    compact_ops = iterations / (time.perf_counter() - start)
+
+    legacy_bytes = len(legacy.encode("utf-8"))
+    print(
+        f"\njson: {legacy_bytes} bytes, {legacy_ops:.0f} ops/s; "
+        f"{codec}+zlib: {len(compact)} bytes, {compact_ops:.0f} ops/s"
+    )
+    assert len(compact) < legacy_bytes / 2
@@ -0,0 +1,128 @@
+"""Static blog export tests."""
+import gzip
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app.services import static_export
+from app.services.blog_service import BlogService, encode_cursor
+
+
+class ExportTestConfig(TestingConfig):
+    """Testing config without a Redis cache."""
+    REDIS_CACHE_URL = None
+
+
+class FakeBlogService(BlogService):
+    """Blog service backed by a list of rows."""
+
+    def __init__(self, rows):
+        super().__init__(None)
+        self.rows = rows
+        self.fetched = []
+
+    def iter_posts(self, columns="*", batch_size=100):
+        yield from self.rows
+
+    def _download(self, path):
+        slug = path[:-len(".md")]
+        self.fetched.append(slug)
+        row = next(row for row in self.rows if row["slug"] == slug)
+        return f"{row['title']} body".encode()
+
+
+def make_row(i, updated_at="2025-01-01T00:00:00+00:00"):
+    """Build a published post row."""
+    return {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "title": f"Post {i}",
+        "slug": f"post-{i}",
+        "excerpt": "Excerpt",
+        "author": "Author",
+        "created_at": f"2025-01-{i + 1:02d}T00:00:00+00:00",
+        "updated_at": updated_at,
+        "tags": [],
+        "content_storage_path": f"post-{i}.md",
+    }
+
+
+@pytest.fixture
+def app():
+    """Create test app."""
+    app = create_app(ExportTestConfig)
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Install a fake blog service with three posts."""
+    service = FakeBlogService([make_row(i) for i in range(3)])
+    monkeypatch.setattr(static_export, "get_blog_service", lambda: service)
+    return service
+
+
+def test_export_writes_pages_and_gzip(app, service, tmp_path):
+    """Test posts and the listing are written with gzip siblings."""
+    result = static_export.export_static_blog(tmp_path, page_size=2)
+
+    assert result == {"posts": 3, "rendered": 3, "removed": 0, "listing_pages": 1}
+    post_page = tmp_path / "post-1" / "index.html"
+    assert "Post 1 body" in post_page.read_text()
+    assert gzip.decompress((tmp_path / "post-1" / "index.html.gz").read_bytes()) == post_page.read_bytes()
+    # Later pages are served by the app, with the same cursor links
+    next_cursor = encode_cursor(service.format_summary(service.rows[1]))
+    assert f'href="/blog/?cursor={next_cursor}"' in (tmp_path / "index.html").read_text()
+    assert not (tmp_path / "page").exists()
+
+
+def test_export_allows_a_post_named_page(app, monkeypatch, tmp_path):
+    """Test a post with the slug "page" is exported like any other."""
+    row = {**make_row(0), "slug": "page", "content_storage_path": "page.md"}
+    service = FakeBlogService([row, make_row(1)])
+    monkeypatch.setattr(static_export, "get_blog_service", lambda: service)
+
+    static_export.export_static_blog(tmp_path, page_size=1)
+    static_export.export_static_blog(tmp_path, page_size=1, force=True)
+    assert "Post 0 body" in (tmp_path / "page" / "index.html").read_text()
+
+
+def test_export_is_incremental(app, service, tmp_path):
+    """Test only changed posts are re-rendered and removed posts deleted."""
+    static_export.export_static_blog(tmp_path)
+    service.fetched.clear()
+
+    result = static_export.export_static_blog(tmp_path)
+    assert result["rendered"] == 0
+    assert result["listing_pages"] == 0
+    assert service.fetched == []
+
+    service.rows = [make_row(0, updated_at="2025-02-01T00:00:00+00:00"), make_row(1)]
+    result = static_export.export_static_blog(tmp_path)
+    # post-1 lists post-0 under "More posts", so it is re-rendered too
+    assert service.fetched == ["post-0", "post-1"]
+    assert result["removed"] == 1
+    assert result["listing_pages"] == 1
+    assert not (tmp_path / "post-2").exists()
+
+
+def test_export_renders_related_posts_like_the_app(app, service, tmp_path):
+    """Test post pages list the other newest posts and follow changes to them."""
+    app.config["BLOG_RELATED_POSTS"] = 1
+    static_export.export_static_blog(tmp_path)
+    page = (tmp_path / "post-1" / "index.html").read_text()
+    assert "More posts" in page and "Post 0" in page and "Post 2" not in page
+
+    service.fetched.clear()
+    service.rows = [make_row(3)] + service.rows
+    result = static_export.export_static_blog(tmp_path)
+    assert sorted(service.fetched) == ["post-0", "post-1", "post-2", "post-3"]
+    assert result["rendered"] == 4
+    assert "Post 3" in (tmp_path / "post-1" / "index.html").read_text()
+
+
+def test_export_cli(app, service, tmp_path):
+    """Test the export command."""
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["blog", "export", "--output", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert "Exported 3 posts" in result.output
@@ -0,0 +1,69 @@
+"""Queue depth and per-queue task counter tests."""
+import pytest
+from app import create_app
+from app.extensions import redis_client
+from app.utils import task_stats
+from tests.benchmarks.fakes import FakeRedis
+
+
+@pytest.fixture
+def app():
+    """Create test app."""
+    return create_app("testing")
+
+
+@pytest.fixture
+def broker(app, monkeypatch):
+    """Stand in an in-memory broker for the Celery Redis client."""
+    fake = FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_client, "celery_client", fake)
+    return fake
+
+
+@pytest.fixture
+def client(app, broker):
+    """Create test client."""
+    with app.test_client() as client:
+        yield client
+
+
+def test_samples_report_throughput_since_last_sample(broker, monkeypatch):
+    """Test depth comes from the broker list and rates from counter deltas."""
+    now = [1000.0]
+    monkeypatch.setattr(task_stats.time, "time", lambda: now[0])
+    broker.rpush("celery", "a", "b", "c")
+    task_stats.record_task("celery", "SUCCESS", 0.5, wait=2.0)
+
+    first = task_stats.sample_queues(["celery"])["celery"]
+    assert first["depth"] == 3 and first["completed"] == 1
+    assert first["throughput"] is None
+
+    now[0] += 10
+    for _ in range(4):
+        task_stats.record_task("celery", "SUCCESS", 0.25, wait=1.0)
+    task_stats.record_task("celery", "FAILURE", 1.0)
+    second = task_stats.sample_queues(["celery"])["celery"]
+    assert second["throughput"] == 0.5  # 5 tasks in 10 s
+    assert second["avg_runtime_ms"] == 400.0
+    assert second["avg_wait_ms"] == 1000.0
+    assert second["failed"] == 1
+
+
+def test_queue_health_endpoint(client, broker):
+    """Test /health/queues serves live depth with the last sample."""
+    task_stats.record_task("celery", "SUCCESS", 0.1)
+    task_stats.sample_queues(["celery"])
+    broker.rpush("celery", "queued")
+
+    response = client.get("/health/queues")
+    assert response.status_code == 200
+    status = response.get_json()["queues"]["celery"]
+    assert status["depth"] == 1
+    assert status["completed"] == 1 and status["sampled_at"]
+
+
+def test_queue_health_without_redis(client, monkeypatch):
+    """Test the endpoint reports unavailability instead of failing."""
+    monkeypatch.setattr(redis_client, "celery_client", None)
+    response = client.get("/health/queues")
+    assert response.status_code == 503
@@ -0,0 +1,55 @@
+"""Request phase timing tests."""
+import time
+import pytest
+from flask import Flask, render_template_string
+from app.middleware import setup_middleware
+from app.utils.timing import record, server_timing_header, timed
+
+
+@pytest.fixture
+def app():
+    """Create a bare app with the request middleware."""
+    app = Flask(__name__)
+    setup_middleware(app)
+
+    @app.route("/slow")
+    def slow():
+        with timed("db"):
+            time.sleep(0.01)
+        with timed("db"):
+            pass
+        return render_template_string("<p>{{ value }}</p>", value=1)
+
+    return app
+
+
+def test_timed_outside_request_is_noop():
+    """Test timers can run without a request context."""
+    with timed("db"):
+        pass
+    record("db", 1.0)
+
+
+def test_server_timing_header(app):
+    """Test phases are summed and counted."""
+    with app.test_request_context():
+        record("cache", 0.001)
+        record("cache", 0.002)
+        record("custom", 0.5)
+        header = server_timing_header()
+    assert 'cache;desc="Redis cache x2";dur=3.00' in header
+    assert 'custom;desc="custom";dur=500.00' in header
+
+
+def test_response_carries_server_timing(app, caplog):
+    """Test responses report each phase and the total, and the log line has them."""
+    with caplog.at_level("INFO"):
+        response = app.test_client().get("/slow")
+    header = response.headers["Server-Timing"]
+    assert 'db;desc="Supabase PostgREST x2"' in header
+    assert "template;" in header
+    assert "total;dur=" in header
+
+    completed = [r for r in caplog.records if r.getMessage() == "Request completed"][-1]
+    assert completed.db_ms >= 10
+    assert completed.duration_ms >= completed.db_ms